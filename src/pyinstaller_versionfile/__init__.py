@@ -6,11 +6,17 @@ Functional API for programmatic use.
 
 # pylint: disable=too-many-arguments, too-many-positional-arguments
 
-from typing import Optional
+import os
+from typing import TYPE_CHECKING, Mapping, Optional
 
+from pyinstaller_versionfile import metrics, tracing
+from pyinstaller_versionfile.exceptions import UsageError
 from pyinstaller_versionfile.metadata import MetaData
 from pyinstaller_versionfile.writer import Writer
 
+if TYPE_CHECKING:
+    from pyinstaller_versionfile.remote_cache import RemoteCache
+
 
 def create_versionfile(
     output_file: str,
@@ -28,17 +34,18 @@ def create_versionfile(
     All parameters except output_file are optional and will be replaced with placeholder values
     if not specified.
     """
-    metadata = MetaData(
-        version=version,
-        company_name=company_name,
-        file_description=file_description,
-        internal_name=internal_name,
-        legal_copyright=legal_copyright,
-        original_filename=original_filename,
-        product_name=product_name,
-        translations=translations,
-    )
-    __create(metadata, output_file)
+    with metrics.track_generation(None):
+        metadata = MetaData(
+            version=version,
+            company_name=company_name,
+            file_description=file_description,
+            internal_name=internal_name,
+            legal_copyright=legal_copyright,
+            original_filename=original_filename,
+            product_name=product_name,
+            translations=translations,
+        )
+        __create(metadata, {"pyinstaller": output_file})
 
 
 def create_versionfile_from_input_file(
@@ -52,26 +59,30 @@ def create_versionfile_from_input_file(
     original_filename: Optional[str] = None,
     product_name: Optional[str] = None,
     translations: Optional[list[int]] = None,
+    overlays: Optional[list[str]] = None,
 ) -> None:
     """
     Create a new versionfile from metadata specified in input_file.
     If the version argument is set, the version specified in input_file will be overwritten with the value
     of version.
+    Values from the files in overlays are applied on top of those in input_file.
     """
-    metadata = MetaData.from_file(
-        input_file,
-        version=version,
-        company_name=company_name,
-        file_description=file_description,
-        internal_name=internal_name,
-        legal_copyright=legal_copyright,
-        original_filename=original_filename,
-        product_name=product_name,
-        translations=translations,
-    )
-    if version:
-        metadata.set_version(version)
-    __create(metadata, output_file)
+    with metrics.track_generation("yaml"):
+        metadata = MetaData.from_file(
+            input_file,
+            overlays=overlays,
+            version=version,
+            company_name=company_name,
+            file_description=file_description,
+            internal_name=internal_name,
+            legal_copyright=legal_copyright,
+            original_filename=original_filename,
+            product_name=product_name,
+            translations=translations,
+        )
+        if version:
+            metadata.set_version(version)
+        __create(metadata, {"pyinstaller": output_file})
 
 
 def create_versionfile_from_distribution(
@@ -94,25 +105,112 @@ def create_versionfile_from_distribution(
     This function can be helpful with regard to the automatic versioning of
     packages.
     """
-    metadata = MetaData.from_distribution(
-        distname,
-        version=version,
-        company_name=company_name,
-        file_description=file_description,
-        internal_name=internal_name,
-        legal_copyright=legal_copyright,
-        original_filename=original_filename,
-        product_name=product_name,
-        translations=translations,
-    )
-    if version:
-        metadata.set_version(version)
-    __create(metadata, output_file)
-
-
-def __create(metadata: MetaData, output_file: str) -> None:
-    metadata.validate()
-    metadata.sanitize()
-    writer = Writer(metadata)
-    writer.render()
-    writer.save(output_file)
+    with metrics.track_generation("dist"):
+        metadata = MetaData.from_distribution(
+            distname,
+            version=version,
+            company_name=company_name,
+            file_description=file_description,
+            internal_name=internal_name,
+            legal_copyright=legal_copyright,
+            original_filename=original_filename,
+            product_name=product_name,
+            translations=translations,
+        )
+        if version:
+            metadata.set_version(version)
+        __create(metadata, {"pyinstaller": output_file})
+
+
+def create_versionfiles_from_distributions(
+    output_file_template: str,
+    pattern: str,
+    regex: bool = False,
+    version: Optional[str] = None,
+    company_name: Optional[str] = None,
+    file_description: Optional[str] = None,
+    internal_name: Optional[str] = None,
+    legal_copyright: Optional[str] = None,
+    original_filename: Optional[str] = None,
+    product_name: Optional[str] = None,
+    translations: Optional[list[int]] = None,
+) -> list[str]:
+    """
+    Create a versionfile for each installed distribution whose name matches pattern, a glob pattern like ourcorp-*
+    or, if regex is True, a regular expression (see MetaData.from_distributions).
+    The path of each versionfile is output_file_template with {name} replaced by the distribution name,
+    e.g. "{name}/version_file.txt". Return the paths of the created files.
+    """
+    # pylint: disable=too-many-locals
+    if "{name}" not in output_file_template:
+        raise UsageError("The output file template must contain {name}, so that each distribution gets its own file")
+    output_files = []
+    with metrics.track_failures("dist"):
+        selected = MetaData.from_distributions(
+            pattern,
+            regex,
+            version=version,
+            company_name=company_name,
+            file_description=file_description,
+            internal_name=internal_name,
+            legal_copyright=legal_copyright,
+            original_filename=original_filename,
+            product_name=product_name,
+            translations=translations,
+        )
+    for name, metadata in selected.items():
+        if version:
+            metadata.set_version(version)
+        output_file = output_file_template.format(name=name)
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        __create(metadata, {"pyinstaller": output_file})
+        output_files.append(output_file)
+    return output_files
+
+
+def create_versionfile_from_metadata(
+    output_file: str,
+    metadata: MetaData,
+    output_format: str = "pyinstaller",
+    remote_cache: Optional["RemoteCache"] = None,
+) -> None:
+    """
+    Create a new versionfile from an already loaded MetaData instance.
+    The metadata is validated and sanitized before rendering.
+    output_format selects the kind of file to create and remote_cache is used as in create_output_files.
+    """
+    __create(metadata, {output_format: output_file}, remote_cache)
+
+
+def create_output_files(
+    metadata: MetaData, outputs: Mapping[str, str], remote_cache: Optional["RemoteCache"] = None
+) -> None:
+    """
+    Create one file per output format from the same metadata, which is only validated and sanitized once.
+    outputs maps the output formats to the files to create, e.g. {"pyinstaller": "version_file.txt", "rc": "app.rc"}.
+    Supported output formats are:
+    - pyinstaller: version file for PyInstaller
+    - rc: VERSIONINFO resource script for the Windows resource compiler
+    - nuitka: Nuitka command line options, one per line
+    - cx_freeze: JSON mapping of cx_Freeze setup and executable options
+    If a remote_cache is given, files found in the cache are downloaded instead of being rendered,
+    files rendered locally are uploaded according to its write policy.
+    """
+    __create(metadata, outputs, remote_cache)
+
+
+def __create(metadata: MetaData, outputs: Mapping[str, str], remote_cache: Optional["RemoteCache"] = None) -> None:
+    with metrics.track_generation(metadata.source_format):
+        with tracing.span("validate"):
+            metadata.validate()
+        with tracing.span("sanitize"):
+            metadata.sanitize()
+        if remote_cache is not None:
+            with tracing.span("remote_cache_restore"):
+                outputs = remote_cache.restore(metadata, outputs)
+        for output_format, output_file in outputs.items():
+            writer = Writer(metadata, output_format)
+            writer.render()
+            writer.save(output_file)
+            if remote_cache is not None:
+                remote_cache.store(metadata, output_format, output_file)
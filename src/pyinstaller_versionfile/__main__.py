@@ -2,20 +2,140 @@
 Main file for pyinstaller-versionfile, which is the entrypoint for the command line script.
 """
 
-from typing import Sequence, Optional, Union
+from typing import TYPE_CHECKING, Any, ContextManager, Sequence, Optional, Union
 
 import argparse
+import contextlib
+import os
 from argparse import Namespace
 
 import pyinstaller_versionfile
-from pyinstaller_versionfile import exceptions
+from pyinstaller_versionfile import dependencies, exceptions, lockfile, manifest_cache, metrics, tracing
+from pyinstaller_versionfile.buildnumber import BuildNumberCounter
+from pyinstaller_versionfile.metadata import DEFAULT_ENV_PREFIX, MetaData
+from pyinstaller_versionfile.versions import VersionPolicy
+from pyinstaller_versionfile.writer import OUTPUT_FORMATS
+
+if TYPE_CHECKING:
+    from pyinstaller_versionfile.remote_cache import RemoteCache
 
 
 def make_version(args: Union[Namespace, Optional[Sequence[str]]] = None) -> None:
     if not isinstance(args, Namespace):
         args = parse_args_make_version(args)
 
-    optional_args = {
+    if args.manifest_cache is not None:
+        manifest_cache.enable(args.manifest_cache)
+    if args.metrics:
+        metrics.enable()
+    if args.trace:
+        tracing.enable()
+    try:
+        with tracing.span("pyivf-make_version"):
+            _create_outputs(args)
+    finally:
+        if args.metrics:
+            metrics.REGISTRY.export(args.metrics)
+        if args.trace:
+            tracing.TRACER.export(args.trace)
+
+
+def _profile(args: Namespace, outputs: dict[str, str]) -> ContextManager[None]:
+    """
+    Profile the creation of one target if requested, the profile is named after the first of its outputs.
+    """
+    if not args.profile:
+        return contextlib.nullcontext()
+    from pyinstaller_versionfile import profiling  # pylint: disable=import-outside-toplevel
+
+    return profiling.profile(args.profile, next(iter(outputs.values())))
+
+
+def _track_generation(args: Namespace) -> ContextManager[None]:
+    """
+    Count the target as generated or failed, including loading its metadata. Printing fingerprints generates nothing.
+    """
+    if args.print_fingerprint:
+        return contextlib.nullcontext()
+    return metrics.track_generation("dist" if args.source_format == "distribution" else args.source_format)
+
+
+def _add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="DIR",
+        help=(
+            "Profile the run and save a cProfile profile (.prof) and a report of the largest memory allocations "
+            "(.alloc.txt) to this directory, named after the output file."
+        ),
+    )
+
+
+def _create_outputs(args: Namespace) -> None:
+    with _remote_cache(args) as remote_cache:
+        if not args.select_distributions:
+            with _profile(args, args.outputs), _track_generation(args):
+                _create_target_outputs(args, load_metadata(args), args.outputs, args.depfile, remote_cache)
+            return
+        with metrics.track_failures("dist"):
+            selected = load_selected_metadata(args)
+        if not selected:
+            raise exceptions.InputError(f"No installed distribution matches {args.metadata_source}")
+        for name, metadata in selected.items():
+            outputs = {output_format: path.format(name=name) for output_format, path in args.outputs.items()}
+            if not args.print_fingerprint:
+                for path in outputs.values():
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            depfile = args.depfile.format(name=name) if args.depfile else None
+            with _profile(args, outputs):
+                _create_target_outputs(args, metadata, outputs, depfile, remote_cache, label=f"{name} ")
+
+
+def _create_target_outputs(
+    args: Namespace,
+    metadata: MetaData,
+    outputs: dict[str, str],
+    depfile: Optional[str],
+    remote_cache: Optional["RemoteCache"],
+    label: str = "",
+) -> None:
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    if args.build_number_file and not args.print_fingerprint:
+        metadata.validate()
+        metadata.sanitize(BuildNumberCounter(args.build_number_file))
+    if args.print_fingerprint:
+        metadata.validate()
+        metadata.sanitize()
+        print(label + dependencies.fingerprint(metadata, list(outputs)))
+        return
+    pyinstaller_versionfile.create_output_files(metadata, outputs, remote_cache)
+    if args.verify:
+        from pyinstaller_versionfile import verify  # pylint: disable=import-outside-toplevel
+
+        verify.check_version_file(outputs["pyinstaller"], metadata)
+    if depfile:
+        dependencies.write_depfile(depfile, list(outputs.values()), dependencies.collect(metadata, list(outputs)))
+
+
+def _remote_cache(args: Namespace) -> ContextManager[Optional["RemoteCache"]]:
+    if not args.remote_cache:
+        return contextlib.nullcontext()
+    from pyinstaller_versionfile.remote_cache import (  # pylint: disable=import-outside-toplevel
+        SECRET_ENV,
+        RemoteCache,
+    )
+
+    return RemoteCache(
+        args.remote_cache,
+        args.remote_cache_write,
+        args.remote_cache_timeout,
+        secret=os.environ.get(SECRET_ENV),
+    )
+
+
+def _optional_args(args: Namespace) -> dict[str, Any]:
+    return {
         "version": args.version,
         "company_name": args.company_name,
         "file_description": args.file_description,
@@ -25,23 +145,44 @@ def make_version(args: Union[Namespace, Optional[Sequence[str]]] = None) -> None
         "product_name": args.product_name,
     }
 
+
+def load_metadata(args: Namespace) -> MetaData:
+    """
+    Create the MetaData instance described by the parsed command line arguments of pyivf-make_version.
+    """
+    optional_args = _optional_args(args)
+
     if args.source_format == "yaml":
-        pyinstaller_versionfile.create_versionfile_from_input_file(
-            output_file=args.outfile,
-            input_file=args.metadata_source,
-            **optional_args,
+        metadata = MetaData.from_file(
+            args.metadata_source, overlays=args.overlay, **optional_args
         )
     elif args.source_format in ["distribution", "dist"]:
-        pyinstaller_versionfile.create_versionfile_from_distribution(
-            output_file=args.outfile,
-            distname=args.metadata_source,
-            **optional_args,
+        metadata = MetaData.from_distribution(args.metadata_source, args.version_policy, **optional_args)
+    elif args.source_format == "dist-lock":
+        metadata = MetaData.from_lockfile(
+            args.lockfile, args.metadata_source, args.version_policy, **optional_args
         )
+    elif args.source_format == "env":
+        metadata = MetaData.from_env(args.metadata_source or DEFAULT_ENV_PREFIX, **optional_args)
     else:
-        pyinstaller_versionfile.create_versionfile(
-            output_file=args.outfile,
-            **optional_args,
-        )
+        return MetaData(**optional_args)
+    if args.version:
+        metadata.set_version(args.version)
+    return metadata
+
+
+def load_selected_metadata(args: Namespace) -> dict[str, MetaData]:
+    """
+    Create the MetaData instances of all distributions selected by the pattern given as --metadata-source,
+    keyed by the distribution names.
+    """
+    selected = MetaData.from_distributions(
+        args.metadata_source, args.regex, args.version_policy, **_optional_args(args)
+    )
+    if args.version:
+        for metadata in selected.values():
+            metadata.set_version(args.version)
+    return selected
 
 
 def parse_args_make_version(args: Optional[Sequence[str]]) -> Namespace:
@@ -50,23 +191,87 @@ def parse_args_make_version(args: Optional[Sequence[str]]) -> Namespace:
     )
     parser.add_argument(
         "--metadata-source",
-        help="Required if --source-format is specified. Either path to the input file, or name of the distribution.",
+        help=(
+            "Required if --source-format is specified. Either path to the input file, or name of the distribution. "
+            "For --source-format distribution, a glob pattern like 'ourcorp-*' selects all matching distributions, "
+            "the output paths must then contain {name}, e.g. --outfile '{name}/version_file.txt'. "
+            f"For --source-format env, the prefix of the environment variables (defaults to {DEFAULT_ENV_PREFIX})."
+        ),
     )
     parser.add_argument(
         "--source-format",
-        choices=["yaml", "distribution", "dist"],
-        help="Define the source format expected in --metadata-source.",
+        choices=["yaml", "distribution", "dist", "dist-lock", "env"],
+        help=(
+            "Define the source format expected in --metadata-source. "
+            "dist-lock reads the metadata of the distribution from the lockfile given by --lockfile. "
+            "env reads the metadata from environment variables like PYIVF_VERSION, without parsing any file."
+        ),
+    )
+    parser.add_argument(
+        "--regex",
+        action="store_true",
+        help=(
+            "Treat --metadata-source as a regular expression selecting all installed distributions whose normalized "
+            "names match it, for --source-format distribution."
+        ),
+    )
+    parser.add_argument(
+        "--lockfile",
+        default=lockfile.DEFAULT_LOCKFILE,
+        help=(
+            "Lockfile created by pyivf-snapshot, used with --source-format dist-lock. "
+            f"Defaults to {lockfile.DEFAULT_LOCKFILE}."
+        ),
+    )
+    parser.add_argument(
+        "--version-policy",
+        nargs="+",
+        default=None,
+        metavar="SEGMENT=POLICY",
+        help=(
+            "How to map the pre, post and dev segments of PEP 440 versions of distributions to the Windows version: "
+            "drop, build (use as fourth place) or error. The local segment can be dropped or rejected. "
+            "Defaults to pre=drop post=build dev=drop local=drop."
+        ),
+    )
+    parser.add_argument(
+        "--overlay",
+        action="append",
+        default=None,
+        help=(
+            "YAML file with values to apply on top of the YAML file given as --metadata-source. "
+            "Can be given multiple times, later overlays take precedence."
+        ),
     )
     parser.add_argument(
         "--outfile",
         default="./version_file.txt",
         help="Resulting version file for PyInstaller.",
     )
+    parser.add_argument(
+        "--output-format",
+        nargs="+",
+        default=None,
+        metavar="FORMAT[=PATH]",
+        help=(
+            f"Output formats to create from the same metadata, one of: {', '.join(OUTPUT_FORMATS)}. "
+            "Each format can be followed by '=' and the path of the file to create, "
+            "one format without a path is written to --outfile. Defaults to pyinstaller."
+        ),
+    )
     parser.add_argument(
         "--version",
         default=None,
         help="Override Version information given in metadata file.",
     )
+    parser.add_argument(
+        "--build-number-file",
+        default=None,
+        help=(
+            "Counter file for automatic build numbers. If the version has less than four places, "
+            "the fourth place is set to the next number from this file. Safe to share between parallel jobs."
+        ),
+    )
     parser.add_argument(
         "--company-name",
         default=None,
@@ -109,17 +314,149 @@ def parse_args_make_version(args: Optional[Sequence[str]]) -> Namespace:
         default=None,
         help="Name of the product with which the file is distributed.",
     )
+    parser.add_argument(
+        "--depfile",
+        default=None,
+        help="Write a Makefile-format list of all files the version file depends on to this path.",
+    )
+    parser.add_argument(
+        "--print-fingerprint",
+        action="store_true",
+        help="Print a digest of all effective inputs instead of creating the version file.",
+    )
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        help="Write metrics of the run to this file, as JSON if it ends with '.json', else in Prometheus text format.",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="FILE",
+        help=(
+            "Write a timeline of loading, validating, rendering and saving in the Chrome trace event format to FILE, "
+            "e.g. to open it in ui.perfetto.dev."
+        ),
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help=(
+            "Load the created version file with PyInstaller's parser, convert it to the binary resource and check "
+            "that all values match. Requires PyInstaller (and pefile outside of Windows)."
+        ),
+    )
+    parser.add_argument(
+        "--remote-cache",
+        default=None,
+        metavar="URL",
+        help=(
+            "Base URL of a shared HTTP cache for generated files (GET/PUT <URL>/<fingerprint>). Files found in the "
+            "cache are downloaded instead of rendered, an unavailable cache falls back to local generation."
+        ),
+    )
+    parser.add_argument(
+        "--remote-cache-write",
+        choices=["sync", "async", "never"],
+        default="sync",
+        help=(
+            "How to upload files generated after a cache miss: before continuing (sync, the default), "
+            "in the background (async) or not at all (never)."
+        ),
+    )
+    parser.add_argument(
+        "--remote-cache-timeout",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="Timeout for each request to the remote cache. Defaults to 2 seconds.",
+    )
+    parser.add_argument(
+        "--manifest-cache",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DIR",
+        help=(
+            "Load YAML metadata files from compiled manifests, which are created on the first run and used as long as "
+            "the metadata file does not change. The compiled manifests are stored in DIR, or next to the metadata "
+            "files (as .NAME.pyivfc) if DIR is omitted."
+        ),
+    )
+    _add_profile_argument(parser)
 
     # TODO: idea for translation? Maybe langID=0;charsetID=1200? or just <langID>:<charsetID>?  pylint: disable=fixme
     parsed_args = parser.parse_args(args)
-    if parsed_args.source_format and not parsed_args.metadata_source:
+    if parsed_args.source_format not in (None, "env") and not parsed_args.metadata_source:
         parser.error("--metadata-source is required if --source-format is specified.")
+    parsed_args.outputs = _parse_outputs(parser, parsed_args.output_format, parsed_args.outfile)
+    parsed_args.select_distributions = _selects_distributions(parser, parsed_args)
+    parsed_args.version_policy = _parse_version_policy(parser, parsed_args.version_policy)
+    if parsed_args.verify and "pyinstaller" not in parsed_args.outputs:
+        parser.error("--verify requires the pyinstaller output format.")
+    if parsed_args.remote_cache and not parsed_args.remote_cache.startswith(("http://", "https://")):
+        parser.error("--remote-cache must be an http:// or https:// URL.")
+    if parsed_args.remote_cache and parsed_args.remote_cache.startswith("http://") and not os.environ.get(
+        "PYIVF_REMOTE_CACHE_SECRET"
+    ):
+        parser.error("--remote-cache over plain http requires PYIVF_REMOTE_CACHE_SECRET, or use an https:// URL.")
     return parsed_args
 
 
+def _is_distribution_pattern(parsed_args: Namespace) -> bool:
+    # glob characters are only special in distribution names, in paths of the other formats they are ordinary
+    return parsed_args.source_format in ("distribution", "dist") and any(
+        char in (parsed_args.metadata_source or "") for char in "*?["
+    )
+
+
+def _selects_distributions(parser: argparse.ArgumentParser, parsed_args: Namespace) -> bool:
+    if parsed_args.regex and parsed_args.source_format not in ("distribution", "dist"):
+        parser.error("--regex is only supported with --source-format distribution.")
+    if not (parsed_args.regex or _is_distribution_pattern(parsed_args)):
+        return False
+    paths = [*parsed_args.outputs.values(), *([parsed_args.depfile] if parsed_args.depfile else [])]
+    if not all("{name}" in path for path in paths):
+        parser.error("All output paths must contain {name} when selecting several distributions.")
+    return True
+
+
+def _parse_version_policy(parser: argparse.ArgumentParser, entries: Optional[list[str]]) -> VersionPolicy:
+    policies = dict(entry.partition("=")[::2] for entry in entries or [])
+    try:
+        version_policy = VersionPolicy.from_mapping(policies)
+    except exceptions.UsageError as err:
+        parser.error(str(err))
+    return version_policy
+
+
+def _parse_outputs(
+    parser: argparse.ArgumentParser, output_formats: Optional[list[str]], outfile: str
+) -> dict[str, str]:
+    if not output_formats:
+        return {"pyinstaller": outfile}
+    outputs = {}
+    for entry in output_formats:
+        output_format, _, path = entry.partition("=")
+        if output_format not in OUTPUT_FORMATS:
+            parser.error(f"Unknown output format {output_format}, must be one of: {', '.join(OUTPUT_FORMATS)}")
+        if output_format in outputs:
+            parser.error(f"Output format {output_format} was given more than once.")
+        outputs[output_format] = path or outfile
+    if len(outputs.values()) != len(set(outputs.values())):
+        parser.error("Each output format must be written to a different file.")
+    return outputs
+
+
 def create_version_file(args: Union[Namespace, Optional[Sequence[str]]] = None) -> None:
     if not isinstance(args, Namespace):
         args = parse_args_create_version_file(args)
+    # selected distributions are all profiled together, in a profile named after the --outfile template
+    with _profile(args, {"pyinstaller": args.outfile}):
+        _create_version_file(args)
+
+
+def _create_version_file(args: Namespace) -> None:
     if args.source_format == "yaml":
         # from_yaml
         pyinstaller_versionfile.create_versionfile_from_input_file(
@@ -127,6 +464,14 @@ def create_version_file(args: Union[Namespace, Optional[Sequence[str]]] = None)
             input_file=args.metadata_source,
             version=args.version,
         )
+    elif args.source_format in ["distribution", "dist"] and args.select_distributions:
+        # from_distributions
+        pyinstaller_versionfile.create_versionfiles_from_distributions(
+            output_file_template=args.outfile,
+            pattern=args.metadata_source,
+            regex=args.regex,
+            version=args.version,
+        )
     elif args.source_format in ["distribution", "dist"]:
         # from_distribution
         pyinstaller_versionfile.create_versionfile_from_distribution(
@@ -147,7 +492,11 @@ def parse_args_create_version_file(args: Optional[Sequence[str]]) -> Namespace:
     )
     parser.add_argument(
         "metadata_source",
-        help="Either the path to the YAML metadata file or the name of the installed distribution.",
+        help=(
+            "Either the path to the YAML metadata file or the name of the installed distribution. "
+            "A glob pattern like 'ourcorp-*' selects all matching distributions, "
+            "--outfile must then contain {name}, e.g. '{name}/version_file.txt'."
+        ),
     )
     parser.add_argument(
         "--source-format",
@@ -165,7 +514,20 @@ def parse_args_create_version_file(args: Optional[Sequence[str]]) -> Namespace:
         default=None,
         help="Override Version information given in metadata file",
     )
-    return parser.parse_args(args)
+    parser.add_argument(
+        "--regex",
+        action="store_true",
+        help="Treat metadata_source as a regular expression selecting all matching installed distributions.",
+    )
+    _add_profile_argument(parser)
+    parsed_args = parser.parse_args(args)
+    if parsed_args.regex and parsed_args.source_format == "yaml":
+        parser.error("--regex is only supported with --source-format distribution.")
+    parsed_args.select_distributions = parsed_args.regex or _is_distribution_pattern(parsed_args)
+    if parsed_args.select_distributions:
+        if "{name}" not in parsed_args.outfile:
+            parser.error("--outfile must contain {name} when selecting several distributions.")
+    return parsed_args
 
 
 if __name__ == "__main__":  # pragma: no cover
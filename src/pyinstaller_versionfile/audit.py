@@ -0,0 +1,394 @@
+"""
+Read back the version information of built PE files (.exe, .dll) and compare it with the expected metadata.
+
+PE files are memory-mapped and only the headers and the RT_VERSION resource are read, so even large
+executables can be audited quickly. The implementation is pure Python and works on any platform.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, Optional, Sequence, TypedDict, Union
+
+from pyinstaller_versionfile import exceptions
+from pyinstaller_versionfile.metadata import FIXED_STRINGS, MetaData, string_tables
+
+RT_VERSION = 16
+FIXED_FILE_INFO_SIGNATURE = 0xFEEF04BD
+DEFAULT_EXTENSIONS = (".exe", ".dll")
+STRING_KEYS = {
+    "CompanyName": "company_name",
+    "FileDescription": "file_description",
+    "InternalName": "internal_name",
+    "LegalCopyright": "legal_copyright",
+    "OriginalFilename": "original_filename",
+    "ProductName": "product_name",
+}
+
+VERSION_STRINGS = ("FileVersion", "ProductVersion")
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+class AuditResult(TypedDict, total=False):
+    """Outcome of auditing a single file."""
+
+    path: str
+    status: str  # "ok", "mismatch", "missing" (no version information) or "error"
+    differences: dict[str, dict[str, Any]]
+    error: str
+
+
+def _align(offset: int) -> int:
+    return (offset + 3) & ~3
+
+
+def _parse_headers(data: Buffer) -> tuple[int, list[tuple[int, int, int]]]:
+    """
+    Return the RVA of the resource directory (0 if there is none) and the sections of a PE file.
+    Each section is given as tuple of virtual address, size and file offset.
+    """
+    if data[:2] != b"MZ":
+        raise exceptions.InputError("Not a PE file: missing MZ signature")
+    pe_offset = struct.unpack_from("<I", data, 0x3C)[0]
+    if data[pe_offset:pe_offset + 4] != b"PE\0\0":
+        raise exceptions.InputError("Not a PE file: missing PE signature")
+    number_of_sections, optional_header_size = struct.unpack_from("<H12xH", data, pe_offset + 6)
+    optional_header = pe_offset + 24
+    magic = struct.unpack_from("<H", data, optional_header)[0]
+    if magic not in (0x10B, 0x20B):  # PE32, PE32+
+        raise exceptions.InputError(f"Unknown optional header magic {magic:#x}")
+    directories = optional_header + (96 if magic == 0x10B else 112)
+    resource_rva = 0
+    if struct.unpack_from("<I", data, directories - 4)[0] > 2:  # NumberOfRvaAndSizes
+        resource_rva, resource_size = struct.unpack_from("<II", data, directories + 2 * 8)
+        resource_rva = resource_rva if resource_size else 0
+
+    sections = []
+    for index in range(number_of_sections):
+        virtual_size, virtual_address, raw_size, raw_pointer = struct.unpack_from(
+            "<IIII", data, optional_header + optional_header_size + index * 40 + 8
+        )
+        sections.append((virtual_address, max(virtual_size, raw_size), raw_pointer))
+    return resource_rva, sections
+
+
+def find_version_resource(data: Buffer) -> Optional[bytes]:
+    """
+    Return the raw VS_VERSIONINFO structure stored in the PE file data, or None if there is none.
+    """
+    resource_rva, sections = _parse_headers(data)
+    if not resource_rva:
+        return None
+
+    def rva_to_offset(rva: int) -> int:
+        for virtual_address, size, raw_pointer in sections:
+            if virtual_address <= rva < virtual_address + size:
+                return rva - virtual_address + raw_pointer
+        raise exceptions.InputError(f"RVA {rva:#x} is not part of any section")
+
+    resource_base = rva_to_offset(resource_rva)
+    # The resource tree has three levels: type, name and language. Take the first name and language.
+    entry = _find_resource_entry(data, resource_base, RT_VERSION)
+    for _ in range(2):
+        if entry is None or not entry & 0x80000000:
+            return None
+        entry = _find_resource_entry(data, resource_base + (entry & 0x7FFFFFFF))
+    if entry is None:
+        return None
+    data_rva, data_size = struct.unpack_from("<II", data, resource_base + entry)
+    offset = rva_to_offset(data_rva)
+    return bytes(data[offset:offset + data_size])
+
+
+def _find_resource_entry(data: Buffer, directory: int, resource_id: Optional[int] = None) -> Optional[int]:
+    """
+    Return the offset stored in the entry of the resource directory with the given id, or in the first entry.
+    """
+    named_entries, id_entries = struct.unpack_from("<HH", data, directory + 12)
+    for index in range(named_entries + id_entries):
+        name, offset = struct.unpack_from("<II", data, directory + 16 + index * 8)
+        if resource_id is None or (not name & 0x80000000 and name == resource_id):
+            return offset
+    return None
+
+
+def _parse_node(data: bytes, offset: int) -> tuple[str, bytes, list[Any], int]:
+    """
+    Parse one of the nested structures of VS_VERSIONINFO.
+    Return key, value, child nodes and the offset of the end of the structure.
+    """
+    length, value_length, value_type = struct.unpack_from("<HHH", data, offset)
+    if length < 6:
+        raise exceptions.InputError("Corrupt version information")
+    end = min(offset + length, len(data))
+    key_end = offset + 6
+    while key_end + 1 < end and data[key_end:key_end + 2] != b"\0\0":
+        key_end += 2
+    key = data[offset + 6:key_end].decode("utf-16-le")
+    position = _align(key_end + 2)
+    value_size = value_length * 2 if value_type == 1 else value_length
+    value = data[position:min(position + value_size, end)]
+    position = _align(position + value_size)
+    children = []
+    while position < end:
+        child = _parse_node(data, position)
+        children.append(child)
+        position = _align(child[3])
+    return key, value, children, end
+
+
+def decode_version_info(raw: bytes) -> MetaData:
+    """
+    Decode a raw VS_VERSIONINFO structure into a MetaData instance.
+    """
+    try:
+        return _decode_version_info(raw)
+    except struct.error as err:
+        raise exceptions.InputError("Truncated version information") from err
+
+
+def _decode_version_info(raw: bytes) -> MetaData:
+    key, value, children, _ = _parse_node(raw, 0)
+    if key != "VS_VERSION_INFO":
+        raise exceptions.InputError(f"Unexpected version information root {key}")
+    data: dict[str, Any] = {}
+    if len(value) >= 52:
+        signature, _, file_ms, file_ls = struct.unpack_from("<IIII", value)
+        if signature == FIXED_FILE_INFO_SIGNATURE:
+            data["version"] = f"{file_ms >> 16}.{file_ms & 0xFFFF}.{file_ls >> 16}.{file_ls & 0xFFFF}"
+    for child_key, _, grandchildren, _ in children:
+        if child_key == "StringFileInfo":
+            data.update(_decode_string_file_info(grandchildren))
+        elif child_key == "VarFileInfo":
+            data.update(_decode_var_file_info(grandchildren))
+    return MetaData(**data)
+
+
+def _decode_string_file_info(tables: list[Any]) -> dict[str, Any]:
+    return _decode_string_tables(tables) if tables else {}
+
+
+def _decode_var_file_info(variables: list[Any]) -> dict[str, Any]:
+    data = {}
+    for var_key, var_value, _, _ in variables:
+        if var_key == "Translation":
+            data["translations"] = list(struct.unpack_from(f"<{len(var_value) // 2}H", var_value))
+    return data
+
+
+def _decode_string_tables(tables: list[Any]) -> dict[str, Any]:
+    # the first table provides the values of all tables, the others only the values that differ from it
+    decoded = {
+        table_id.upper(): {key: value.decode("utf-16-le", errors="replace").split("\0")[0] for key, value, _, _ in kids}
+        for table_id, _, kids, _ in tables
+    }
+    first_id, first = next(iter(decoded.items()))
+    fixed_names = {name for name, _ in FIXED_STRINGS}
+    data: dict[str, Any] = {STRING_KEYS[key]: value for key, value in first.items() if key in STRING_KEYS}
+    data["extra_strings"] = {key: value for key, value in first.items() if key not in fixed_names}
+    data["localized_strings"] = {}
+    for table_id, strings in decoded.items():
+        localized = {
+            key: value for key, value in strings.items() if key not in VERSION_STRINGS and first.get(key) != value
+        }
+        if table_id != first_id and localized:
+            data["localized_strings"][table_id] = localized
+    return data
+
+
+def _expand_string_tables(values: dict[str, Any]) -> dict[str, Any]:
+    # extra and localized strings can describe the same tables in different ways, so the tables are compared.
+    # The version strings are left out, differences of the version are already reported for Version.
+    values = dict(values)
+    values["StringTables"] = {
+        table_id: {key: value for key, value in strings if key not in VERSION_STRINGS}
+        for table_id, strings in string_tables(values)
+    }
+    del values["ExtraStrings"], values["LocalizedStrings"]
+    return values
+
+
+def _encode_node(key: str, value: bytes, children: Sequence[bytes], text: bool, value_length: int) -> bytes:
+    body = (key + "\0").encode("utf-16-le")
+    body += b"\0" * (_align(6 + len(body)) - 6 - len(body)) + value
+    if children:
+        body += b"\0" * (_align(6 + len(body)) - 6 - len(body))
+        for child in children:
+            body += child + b"\0" * (_align(len(child)) - len(child))
+    return struct.pack("<HHH", 6 + len(body), value_length, 1 if text else 0) + body
+
+
+def encode_version_info(metadata: MetaData) -> bytes:
+    """
+    Encode metadata as raw VS_VERSIONINFO structure, as it is stored in the RT_VERSION resource.
+    """
+    parts = [int(part) for part in metadata.version.split(".")] + [0, 0, 0]
+    version_ms = parts[0] << 16 | parts[1]
+    version_ls = parts[2] << 16 | parts[3]
+    fixed_file_info = struct.pack(
+        "<13I",
+        FIXED_FILE_INFO_SIGNATURE, 0x10000, version_ms, version_ls, version_ms, version_ls,
+        0x3F, 0, 0x40004, 1, 0, 0, 0,
+    )
+    tables = [
+        _encode_node(
+            table_id,
+            b"",
+            [_encode_node(k, (str(v) + "\0").encode("utf-16-le"), [], True, len(str(v)) + 1) for k, v in strings],
+            True,
+            0,
+        )
+        for table_id, strings in string_tables(metadata.to_dict())
+    ]
+    translation = struct.pack(f"<{len(metadata.translations)}H", *metadata.translations)
+    return _encode_node(
+        "VS_VERSION_INFO",
+        fixed_file_info,
+        [
+            _encode_node("StringFileInfo", b"", tables, True, 0),
+            _encode_node(
+                "VarFileInfo", b"", [_encode_node("Translation", translation, [], False, len(translation))], True, 0
+            ),
+        ],
+        False,
+        len(fixed_file_info),
+    )
+
+
+def read_version_info(filepath: str) -> Optional[MetaData]:
+    """
+    Read the version information of a PE file. Return None if the file has no version information.
+    """
+    with open(filepath, "rb") as file_handle:
+        if os.fstat(file_handle.fileno()).st_size == 0:
+            raise exceptions.InputError("Empty file")
+        with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                raw = find_version_resource(data)
+            except struct.error as err:
+                raise exceptions.InputError("Truncated PE file") from err
+    if raw is None:
+        return None
+    return decode_version_info(raw)
+
+
+def compare(expected: MetaData, actual: MetaData) -> dict[str, dict[str, Any]]:
+    """
+    Return all values that differ between expected and actual metadata.
+    """
+    expected_values = _expand_string_tables(expected.to_dict())
+    actual_values = _expand_string_tables(actual.to_dict())
+    return {
+        key: {"expected": value, "actual": actual_values[key]}
+        for key, value in expected_values.items()
+        if actual_values[key] != value
+    }
+
+
+def audit_file(filepath: str, expected: MetaData) -> AuditResult:
+    """
+    Compare the version information of a single PE file with the expected metadata.
+    """
+    try:
+        actual = read_version_info(filepath)
+    except (OSError, ValueError, exceptions.InputError) as err:
+        return AuditResult(path=filepath, status="error", error=str(err))
+    if actual is None:
+        return AuditResult(path=filepath, status="missing")
+    differences = compare(expected, actual)
+    return AuditResult(path=filepath, status="mismatch" if differences else "ok", differences=differences)
+
+
+def find_files(root: str, extensions: Iterable[str] = DEFAULT_EXTENSIONS) -> Iterator[str]:
+    """
+    Yield all files below root with one of the given extensions.
+    """
+    suffixes = tuple(extension.lower() for extension in extensions)
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if filename.lower().endswith(suffixes):
+                yield os.path.join(dirpath, filename)
+
+
+def audit(
+    root: str,
+    expected: MetaData,
+    workers: Optional[int] = None,
+    extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+) -> Iterator[AuditResult]:
+    """
+    Audit all PE files below root in a process pool and yield the results as they become available.
+    The expected metadata should be validated and sanitized, as it would be for creating a version file.
+    """
+    files = list(find_files(root, extensions))
+    if workers == 1:
+        yield from (audit_file(filepath, expected) for filepath in files)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(audit_file, files, [expected] * len(files), chunksize=16)
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    parsed = parse_args(args)
+    if parsed.source_format == "yaml":
+        expected = MetaData.from_file(parsed.metadata_source)
+    else:
+        expected = MetaData.from_distribution(parsed.metadata_source)
+    if parsed.version:
+        expected.set_version(parsed.version)
+    expected.validate()
+    expected.sanitize()
+
+    output = open(parsed.output, "w", encoding="utf-8") if parsed.output else sys.stdout  # pylint: disable=consider-using-with
+    failed = False
+    try:
+        for result in audit(parsed.root, expected, parsed.workers, parsed.extension):
+            failed = failed or result["status"] != "ok"
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if failed:
+        sys.exit(1)
+
+
+def parse_args(args: Optional[Sequence[str]]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Check that all executables and DLLs below a directory carry the expected version information. "
+            "Results are written as JSON Lines, the exit code is 1 if any file does not match."
+        )
+    )
+    parser.add_argument("root", help="Directory to search for PE files.")
+    parser.add_argument(
+        "--metadata-source",
+        required=True,
+        help="Either path to the YAML file, or name of the distribution with the expected metadata.",
+    )
+    parser.add_argument(
+        "--source-format",
+        choices=["yaml", "distribution", "dist"],
+        default="yaml",
+        help="Define the source format expected in --metadata-source.",
+    )
+    parser.add_argument("--version", default=None, help="Override the expected version.")
+    parser.add_argument(
+        "--extension",
+        nargs="+",
+        default=list(DEFAULT_EXTENSIONS),
+        help="File extensions to audit.",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--output", default=None, help="Write the results to this file instead of stdout.")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,571 @@
+"""
+Generation of many version files in one run (pyivf-batch).
+"""
+
+import argparse
+import collections
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ContextManager, Iterable, NamedTuple, Optional, Sequence, TypedDict, Union
+
+import pyinstaller_versionfile
+from pyinstaller_versionfile import dependencies, exceptions, manifest_cache, metrics, tracing, vcs
+from pyinstaller_versionfile.discovery import DEFAULT_IGNORE, DEFAULT_PATTERN, Index, discover
+from pyinstaller_versionfile.metadata import MetaData
+
+if TYPE_CHECKING:
+    from pyinstaller_versionfile.remote_cache import RemoteCache
+
+DEFAULT_OUTFILE_TEMPLATE = "{parent}/{stem}_version_file.txt"
+
+
+class Target(NamedTuple):
+    """A metadata file and the version file to create from it."""
+
+    source: str
+    outfile: str
+
+
+class BatchResult(TypedDict):
+    """Summary of a batch run."""
+
+    targets: int
+    generated: list[str]
+    skipped: list[str]
+    failed: dict[str, str]
+    walk_seconds: float
+    seconds: float
+
+
+def output_path(source: str, outfile_template: str = DEFAULT_OUTFILE_TEMPLATE) -> str:
+    """
+    Derive the path of the version file from the metadata file path.
+    The template can use {parent} (directory of the metadata file), {name} (its file name) and
+    {stem} (file name up to the first dot).
+    """
+    path = Path(source)
+    return os.path.normpath(
+        outfile_template.format(parent=path.parent, name=path.name, stem=path.name.split(".")[0])
+    )
+
+
+def collect_targets(
+    sources: Sequence[str],
+    pattern: str = DEFAULT_PATTERN,
+    ignore: Sequence[str] = DEFAULT_IGNORE,
+    outfile_template: str = DEFAULT_OUTFILE_TEMPLATE,
+) -> tuple[list[Target], float]:
+    """
+    Create the targets for the given metadata files and all files matching pattern in the given directories.
+    Return the targets and the time needed to walk the directories.
+    """
+    start = time.perf_counter()
+    files = [source for source in sources if not os.path.isdir(source)]
+    files += discover([source for source in sources if os.path.isdir(source)], pattern, ignore)
+    walk_seconds = time.perf_counter() - start
+    return [Target(source, output_path(source, outfile_template)) for source in files], walk_seconds
+
+
+def batch_root(sources: Sequence[str]) -> str:
+    """
+    Return the directory containing all given metadata files and directories.
+    """
+    directories = [os.path.abspath(source if os.path.isdir(source) else os.path.dirname(source)) for source in sources]
+    try:
+        return os.path.commonpath(directories)
+    except ValueError:  # no common directory, e.g. sources on different drives
+        return os.path.abspath(os.curdir)
+
+
+def shard_of(target: Target, shard_count: int, root: str = os.curdir) -> int:
+    """
+    Return the 1-based shard the target is assigned to.
+    The assignment only depends on the output path relative to root, so it does not change when other targets are
+    added or removed, or when the batch is run from another working directory or checkout location.
+    """
+    try:
+        path = os.path.relpath(target.outfile, root)
+    except ValueError:  # on another drive than root
+        path = os.path.abspath(target.outfile)
+    digest = hashlib.sha256(Path(path).as_posix().encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count + 1
+
+
+def select_shard(targets: Sequence[Target], shard: int, shard_count: int, root: str = os.curdir) -> list[Target]:
+    """
+    Return the targets assigned to the given 1-based shard, see shard_of.
+    """
+    return [target for target in targets if shard_of(target, shard_count, root) == shard]
+
+
+def _targets_digest(targets: Iterable[Target]) -> str:
+    outfiles = sorted(Path(target.outfile).as_posix() for target in targets)
+    return hashlib.sha256("\n".join(outfiles).encode("utf-8")).hexdigest()
+
+
+def shard_report(
+    result: BatchResult, all_targets: Sequence[Target], shard: int, shard_count: int
+) -> dict[str, Any]:
+    """
+    Create the report of a shard, which allows to check the coverage of all shards with merge_reports.
+    """
+    return {
+        "shard": shard,
+        "shard_count": shard_count,
+        "total_targets": len(all_targets),
+        "targets_digest": _targets_digest(all_targets),
+        "generated": result["generated"],
+        "skipped": result["skipped"],
+        "failed": result["failed"],
+    }
+
+
+def merge_reports(reports: Sequence[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Combine the reports of all shards and verify that every target was covered by exactly one shard.
+    Raise a UsageError if the reports do not belong to the same set of targets or the coverage is not complete.
+    """
+    if not reports:
+        raise exceptions.UsageError("No shard reports given")
+    first = reports[0]
+    for report in reports:
+        if any(report[key] != first[key] for key in ("shard_count", "total_targets", "targets_digest")):
+            raise exceptions.UsageError(
+                f"Report of shard {report['shard']} was created for a different set of targets or shards"
+            )
+    shards = sorted(report["shard"] for report in reports)
+    if shards != list(range(1, first["shard_count"] + 1)):
+        raise exceptions.UsageError(
+            f"Expected exactly one report for each of the shards 1 to {first['shard_count']}, got: {shards}"
+        )
+    merged: dict[str, Any] = {"generated": [], "skipped": [], "failed": {}}
+    covered: list[str] = []
+    for report in reports:
+        merged["generated"] += report["generated"]
+        merged["skipped"] += report["skipped"]
+        merged["failed"].update(report["failed"])
+        covered += [*report["generated"], *report["skipped"], *report["failed"]]
+    duplicates = sorted(outfile for outfile, count in collections.Counter(covered).items() if count > 1)
+    if duplicates:
+        raise exceptions.UsageError(f"Targets covered by more than one shard: {', '.join(duplicates)}")
+    covered_targets = [Target("", outfile) for outfile in covered]
+    if len(covered) != first["total_targets"] or _targets_digest(covered_targets) != first["targets_digest"]:
+        raise exceptions.UsageError(
+            f"Shards covered {len(covered)} of {first['total_targets']} targets or different targets than expected"
+        )
+    merged["total_targets"] = first["total_targets"]
+    return merged
+
+
+def generate(
+    targets: Sequence[Target],
+    index: Optional[Index] = None,
+    profile_dir: Optional[str] = None,
+    verify: bool = False,
+    remote_cache: Optional["RemoteCache"] = None,
+    workers: int = 1,
+    changed: Optional[set[str]] = None,
+) -> BatchResult:
+    """
+    Create the version files for all targets.
+    If an index is given, targets whose inputs did not change since the last run are skipped.
+    If profile_dir is given, the creation of each version file is profiled (see profiling.profile).
+    If verify is True, each version file is checked with PyInstaller's parser (see verify.check_version_file),
+    targets failing the check are reported as failed.
+    If a remote_cache is given, the cached version files of all targets are requested concurrently before
+    generating them, targets found in the cache are downloaded instead of rendered.
+    With more than one worker, the targets are generated by a pool of that many threads. The index and the result
+    are still only updated by the calling thread, in the order of the targets. Profiling needs a single worker,
+    because only one profiler can be active in a process.
+    If changed files are given (see vcs.changed_files), only targets that depend on one of them or whose version file
+    does not exist are generated, all others are skipped.
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    start = time.perf_counter()
+    result = BatchResult(targets=len(targets), generated=[], skipped=[], failed={}, walk_seconds=0.0, seconds=0.0)
+    pending = []
+    for target in targets:
+        if (changed is not None and not _is_affected(target, changed)) or (
+            index is not None and index.is_up_to_date(target.source, target.outfile)
+        ):
+            metrics.inc("files_skipped_total", source="yaml")
+            result["skipped"].append(target.outfile)
+        else:
+            pending.append(target)
+    if profile_dir and workers > 1:
+        raise exceptions.UsageError("Profiling requires a single worker, only one profiler can be active at a time")
+    if remote_cache is not None:
+        _prefetch(pending, remote_cache)
+    for target, metadata in zip(pending, _run_targets(pending, workers, profile_dir, verify, remote_cache)):
+        if isinstance(metadata, Exception):
+            result["failed"][target.outfile] = _describe(metadata)
+            continue
+        result["generated"].append(target.outfile)
+        if index is not None:
+            index.update(target.source, target.outfile, dependencies.collect(metadata))
+    if index is not None:
+        index.save()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _is_affected(target: Target, changed: set[str]) -> bool:
+    if not os.path.isfile(target.outfile):
+        return True
+    try:
+        metadata = MetaData.from_file(target.source)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return True  # e.g. a deleted base file, the error is reported when the target is generated
+    return vcs.any_changed(dependencies.collect(metadata), changed)
+
+
+def _changed_files(revision: Optional[str]) -> Optional[set[str]]:
+    if not revision:
+        return None
+    try:
+        return vcs.changed_files(revision)
+    except exceptions.InputError as err:
+        print(
+            f"Cannot determine the files changed since {revision} ({err}), generating all targets", file=sys.stderr
+        )
+        return None
+
+
+def _run_targets(
+    targets: Sequence[Target],
+    workers: int,
+    profile_dir: Optional[str],
+    verify: bool,
+    remote_cache: Optional["RemoteCache"],
+) -> Iterable[Union[MetaData, Exception]]:
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def run(target: Target) -> Union[MetaData, Exception]:
+        # any error, e.g. an OSError when saving or a TypeError for a value of the wrong type, only fails its target
+        try:
+            with tracing.span("target", source=target.source, outfile=target.outfile):
+                return _run_target(target, profile_dir, verify, remote_cache)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            return err
+
+    if workers == 1:
+        return map(run, targets)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pyivf-batch") as executor:
+        return list(executor.map(run, targets))
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, (exceptions.InputError, exceptions.ValidationError, exceptions.UsageError)):
+        return str(error)
+    return f"{type(error).__name__}: {error}"
+
+
+def _run_target(
+    target: Target, profile_dir: Optional[str], verify: bool, remote_cache: Optional["RemoteCache"]
+) -> MetaData:
+    if profile_dir:
+        from pyinstaller_versionfile import profiling  # pylint: disable=import-outside-toplevel
+
+        with profiling.profile(profile_dir, target.outfile):
+            metadata = _generate_target(target, remote_cache)
+    else:
+        metadata = _generate_target(target, remote_cache)
+    if verify:
+        from pyinstaller_versionfile import verify as verify_module  # pylint: disable=import-outside-toplevel
+
+        with tracing.span("verify"):
+            verify_module.check_version_file(target.outfile, metadata)
+    return metadata
+
+
+def _generate_target(target: Target, remote_cache: Optional["RemoteCache"] = None) -> MetaData:
+    with metrics.track_generation("yaml"):
+        metadata = MetaData.from_file(target.source)
+        os.makedirs(os.path.dirname(target.outfile) or ".", exist_ok=True)
+        pyinstaller_versionfile.create_versionfile_from_metadata(target.outfile, metadata, remote_cache=remote_cache)
+    return metadata
+
+
+def _prefetch(targets: Sequence[Target], remote_cache: "RemoteCache") -> None:
+    keys = []
+    for target in targets:
+        try:
+            # the parsed YAML files are cached, so loading the metadata again when generating the target is cheap
+            metadata = MetaData.from_file(target.source)
+            metadata.validate()
+            metadata.sanitize()
+        except (exceptions.InputError, exceptions.ValidationError):
+            continue  # reported when the target is generated
+        keys.append(remote_cache.key(metadata, "pyinstaller"))
+    remote_cache.prefetch(keys)
+
+
+def _remote_cache(parsed: Namespace) -> ContextManager[Optional["RemoteCache"]]:
+    if not parsed.remote_cache:
+        return contextlib.nullcontext()
+    from pyinstaller_versionfile.remote_cache import (  # pylint: disable=import-outside-toplevel
+        SECRET_ENV,
+        RemoteCache,
+    )
+
+    return RemoteCache(
+        parsed.remote_cache,
+        parsed.remote_cache_write,
+        parsed.remote_cache_timeout,
+        secret=os.environ.get(SECRET_ENV),
+    )
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    parsed = parse_args(args)
+    if parsed.manifest_cache is not None:
+        manifest_cache.enable(parsed.manifest_cache)
+    targets, walk_seconds = collect_targets(
+        parsed.sources, parsed.pattern, [*DEFAULT_IGNORE, *parsed.ignore], parsed.outfile_template
+    )
+    selected = targets
+    if parsed.shard:
+        shard, shard_count = parsed.shard
+        selected = select_shard(targets, shard, shard_count, batch_root(parsed.sources))
+    if parsed.trace:
+        tracing.enable()
+    try:
+        with _remote_cache(parsed) as remote_cache:
+            result = generate(
+                selected,
+                Index(parsed.index) if parsed.index else None,
+                parsed.profile,
+                parsed.verify,
+                remote_cache,
+                parsed.workers,
+                _changed_files(parsed.since),
+            )
+    finally:
+        if parsed.trace:
+            tracing.TRACER.export(parsed.trace)
+    result["walk_seconds"] = walk_seconds
+    if parsed.report:
+        shard, shard_count = parsed.shard or (1, 1)
+        _write_json(parsed.report, shard_report(result, targets, shard, shard_count))
+    for outfile, error in result["failed"].items():
+        print(f"Failed to create {outfile}: {error}", file=sys.stderr)
+    print(
+        f"Found {result['targets']} metadata files in {walk_seconds:.3f}s: "
+        f"{len(result['generated'])} generated, {len(result['skipped'])} skipped (unchanged), "
+        f"{len(result['failed'])} failed in {result['seconds']:.3f}s"
+    )
+    if result["failed"]:
+        sys.exit(1)
+
+
+def merge_shards(args: Optional[Sequence[str]] = None) -> None:
+    parsed = parse_args_merge_shards(args)
+    reports = []
+    for report_file in parsed.reports:
+        with open(report_file, encoding="utf-8") as infile:
+            reports.append(json.load(infile))
+    try:
+        merged = merge_reports(reports)
+    except exceptions.UsageError as err:
+        print(f"Shard reports are not consistent: {err}", file=sys.stderr)
+        sys.exit(2)
+    if parsed.output:
+        _write_json(parsed.output, merged)
+    print(
+        f"All {merged['total_targets']} targets covered exactly once: {len(merged['generated'])} generated, "
+        f"{len(merged['skipped'])} skipped (unchanged), {len(merged['failed'])} failed"
+    )
+    if merged["failed"]:
+        sys.exit(1)
+
+
+def _write_json(filepath: str, data: dict[str, Any]) -> None:
+    with open(filepath, "w", encoding="utf-8") as file_handle:
+        json.dump(data, file_handle, indent=2)
+
+
+def _parse_shard(value: str) -> tuple[int, int]:
+    try:
+        shard, shard_count = (int(part) for part in value.split("/"))
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"expected INDEX/COUNT, got {value}") from err
+    if not 1 <= shard <= shard_count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and {shard_count}, got {shard}")
+    return shard, shard_count
+
+
+def _parse_workers(value: str) -> int:
+    try:
+        workers = int(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"expected a number, got {value}") from err
+    if workers < 1:
+        raise argparse.ArgumentTypeError(f"at least one worker is needed, got {workers}")
+    return workers
+
+
+def parse_args(args: Optional[Sequence[str]]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        description="Create version files for many YAML metadata files, found in the given files and directories."
+    )
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="YAML metadata files, or directories to search for files matching --pattern.",
+    )
+    parser.add_argument(
+        "--pattern",
+        default=DEFAULT_PATTERN,
+        help=f"File name pattern of metadata files in directories. Defaults to {DEFAULT_PATTERN}.",
+    )
+    parser.add_argument(
+        "--ignore",
+        nargs="+",
+        default=[],
+        help=(
+            "Patterns of file and directory names or paths relative to the searched directory to skip, "
+            f"in addition to {', '.join(DEFAULT_IGNORE)}."
+        ),
+    )
+    parser.add_argument(
+        "--outfile-template",
+        default=DEFAULT_OUTFILE_TEMPLATE,
+        help=(
+            "Path of the version file created for each metadata file. "
+            "Can use {parent}, {name} and {stem} of the metadata file. "
+            f"Defaults to {DEFAULT_OUTFILE_TEMPLATE}."
+        ),
+    )
+    parser.add_argument(
+        "--index",
+        default=None,
+        help="Index file recording the inputs of all version files, to only process new or modified metadata files.",
+    )
+    parser.add_argument(
+        "--since",
+        default=None,
+        metavar="REV",
+        help=(
+            "Only generate the version files whose inputs (metadata files, referenced version files and templates) "
+            "changed in the git repository of the current directory since revision REV, e.g. the base commit of "
+            "a pull request. If the revision is not available, e.g. in a shallow clone, all targets are generated."
+        ),
+    )
+    parser.add_argument(
+        "--shard",
+        type=_parse_shard,
+        default=None,
+        metavar="INDEX/COUNT",
+        help=(
+            "Only process the targets assigned to shard INDEX (starting at 1) of COUNT shards, "
+            "e.g. to split the work across CI nodes. Targets are assigned by a stable hash of their output path."
+        ),
+    )
+    parser.add_argument(
+        "--report",
+        default=None,
+        help="Write a JSON report of the run, which can be combined with pyivf-merge-shards.",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help=(
+            "Check each version file with PyInstaller's parser, targets failing the check are reported as failed. "
+            "Requires PyInstaller (and pefile outside of Windows)."
+        ),
+    )
+    parser.add_argument(
+        "--manifest-cache",
+        metavar="DIR",
+        nargs="?",
+        const="",
+        help=(
+            "Keep the parsed metadata files as compiled manifests in DIR (next to the metadata files without DIR) "
+            "and load unchanged metadata files from them instead of parsing YAML. Without DIR, the option must "
+            "follow the sources."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="DIR",
+        help=(
+            "Profile each generated version file and save a cProfile profile (.prof) and a report of the largest "
+            "memory allocations (.alloc.txt) per target to this directory, named after the output file."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=_parse_workers,
+        default=1,
+        metavar="N",
+        help=(
+            "Generate the version files with a pool of N threads. On free-threaded Python builds the threads run in "
+            "parallel, otherwise they mainly overlap file and network I/O. Cannot be combined with --profile. "
+            "Defaults to 1."
+        ),
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="FILE",
+        help=(
+            "Write a timeline of the run in the Chrome trace event format to FILE, with a span per target and its "
+            "steps on the thread that ran it. Open it in ui.perfetto.dev or chrome://tracing."
+        ),
+    )
+    parser.add_argument(
+        "--remote-cache",
+        default=None,
+        metavar="URL",
+        help=(
+            "Base URL of a shared HTTP cache for version files (GET/PUT <URL>/<fingerprint>). The cached files of all "
+            "targets are requested concurrently, an unavailable cache falls back to local generation."
+        ),
+    )
+    parser.add_argument(
+        "--remote-cache-write",
+        choices=["sync", "async", "never"],
+        default="sync",
+        help=(
+            "Upload policy for version files generated after a cache miss: sync waits for each upload (default), "
+            "async uploads in the background while the next targets are generated, never only reads."
+        ),
+    )
+    parser.add_argument(
+        "--remote-cache-timeout",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="Seconds to wait for each request to the remote cache before generating locally. Defaults to 2.",
+    )
+    parsed = parser.parse_args(args)
+    if parsed.profile and parsed.workers > 1:
+        parser.error("--profile requires a single worker, only one profiler can be active at a time")
+    if parsed.remote_cache and parsed.remote_cache.startswith("http://") and not os.environ.get(
+        "PYIVF_REMOTE_CACHE_SECRET"
+    ):
+        parser.error("a --remote-cache URL with http:// requires PYIVF_REMOTE_CACHE_SECRET, use https:// otherwise")
+    return parsed
+
+
+def parse_args_merge_shards(args: Optional[Sequence[str]]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Combine the reports of all shards of a pyivf-batch run and verify that every target was covered "
+            "exactly once. The exit code is 2 if the coverage is not complete and 1 if any target failed."
+        )
+    )
+    parser.add_argument("reports", nargs="+", help="Reports written by pyivf-batch --report.")
+    parser.add_argument("--output", default=None, help="Write the combined report to this file.")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,531 @@
+"""
+Throughput and scaling harness for the command line entry points (pyivf-bench).
+
+Synthesizes metadata sources, runs the real entry points in-process (in worker processes or threads) or as
+subprocesses with a varying number of workers and reports throughput, latency percentiles, interpreter startup share
+and peak memory usage. The threads mode shows how the API scales with threads, which depends on whether the
+interpreter has a GIL (run it with a free-threaded build like python3.13t to compare).
+"""
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional, Sequence, TypedDict
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore  # not available on Windows
+
+ENTRY_POINTS = ("pyivf-make_version", "create-version-file")
+SOURCE_FORMATS = ("yaml", "dist")
+MODES = ("inprocess", "threads", "subprocess")
+DEFAULT_MODES = ("inprocess", "subprocess")
+
+
+class BenchmarkResult(TypedDict):
+    """Measurements of a single benchmark scenario."""
+
+    entry_point: str
+    source_format: str
+    mode: str
+    gil_enabled: bool
+    workers: int
+    files: int
+    seconds: float
+    files_per_second: float
+    p50_ms: float
+    p99_ms: float
+    startup_share: float
+    peak_rss_kb: Optional[int]
+
+
+def synthesize_yaml(directory: Path, count: int) -> list[str]:
+    """
+    Create count YAML metadata files in directory.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    sources = []
+    for index in range(count):
+        source = directory / f"app{index}.yml"
+        source.write_text(
+            f"Version: 1.2.{index}.0\n"
+            "CompanyName: Benchmark Company\n"
+            f"FileDescription: Benchmark App {index}\n"
+            f"InternalName: app{index}\n"
+            "LegalCopyright: © Benchmark Company. All rights reserved.\n"
+            f"OriginalFilename: app{index}.exe\n"
+            "ProductName: Benchmark Product\n",
+            encoding="utf-8",
+        )
+        sources.append(str(source))
+    return sources
+
+
+def synthesize_distributions(directory: Path, count: int) -> list[str]:
+    """
+    Create count dist-info directories in directory, which must be on the path to be found.
+    Return the distribution names.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    names = []
+    for index in range(count):
+        name = f"pyivf_bench_app{index}"
+        dist_info = directory / f"{name}-1.2.{index}.dist-info"
+        dist_info.mkdir(exist_ok=True)
+        (dist_info / "METADATA").write_text(
+            "Metadata-Version: 2.1\n"
+            f"Name: {name}\n"
+            f"Version: 1.2.{index}\n"
+            f"Summary: Benchmark App {index}\n"
+            "Author: Benchmark Company\n"
+            "License: MIT\n",
+            encoding="utf-8",
+        )
+        names.append(name)
+    return names
+
+
+def _arguments(entry_point: str, source_format: str, source: str, outfile: str) -> list[str]:
+    if entry_point == "create-version-file":
+        return [source, "--source-format", source_format, "--outfile", outfile]
+    return ["--source-format", source_format, "--metadata-source", source, "--outfile", outfile]
+
+
+def _run_in_process(entry_point: str, arguments: list[str], path: Optional[str]) -> float:
+    # pylint: disable=import-outside-toplevel
+    from pyinstaller_versionfile.__main__ import create_version_file, make_version
+
+    if path and path not in sys.path:
+        sys.path.insert(0, path)
+    start = time.perf_counter()
+    if entry_point == "create-version-file":
+        create_version_file(arguments)
+    else:
+        make_version(arguments)
+    return time.perf_counter() - start
+
+
+def _run_subprocess(entry_point: str, arguments: list[str], path: Optional[str]) -> float:
+    function = "create_version_file" if entry_point == "create-version-file" else "make_version"
+    command = [
+        sys.executable,
+        "-c",
+        f"from pyinstaller_versionfile.__main__ import {function}; {function}()",
+        *arguments,
+    ]
+    env = dict(os.environ)
+    if path:
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [path, env.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    subprocess.run(command, check=True, env=env)
+    return time.perf_counter() - start
+
+
+def measure_startup(repetitions: int = 5) -> float:
+    """
+    Return the median time needed to start an interpreter and import the command line module.
+    """
+    command = [sys.executable, "-c", "import pyinstaller_versionfile.__main__"]
+    timings = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        subprocess.run(command, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+FIRST_RENDER_SCRIPT = """
+import io, sys, time
+from pyinstaller_versionfile import writer
+from pyinstaller_versionfile.metadata import MetaData
+if sys.argv[1] == "runtime":
+    writer._load_compiled_template = lambda *args: None
+start = time.perf_counter()
+version_writer = writer.Writer(MetaData())
+version_writer.render()
+version_writer.write(io.StringIO())
+print(time.perf_counter() - start)
+"""
+
+
+def measure_first_render(precompiled: bool = True, repetitions: int = 5) -> float:
+    """
+    Return the median latency of rendering the first version file in a new interpreter, which includes loading
+    the template. With precompiled False, the template is compiled at runtime instead of using the precompiled module.
+    """
+    command = [sys.executable, "-c", FIRST_RENDER_SCRIPT, "precompiled" if precompiled else "runtime"]
+    timings = []
+    for _ in range(repetitions):
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        timings.append(float(result.stdout))
+    return statistics.median(timings)
+
+
+def gil_enabled() -> bool:
+    """
+    Return whether the interpreter runs with a GIL, which is always the case before Python 3.13.
+    """
+    return bool(getattr(sys, "_is_gil_enabled", lambda: True)())
+
+
+def synthesize_manifest(filepath: Path, entries: int) -> None:
+    """
+    Create a metadata file with entries custom strings, like a large manifest shared by many executables.
+    """
+    lines = ["Version: 1.2.3.4", "CompanyName: Benchmark Company", "ExtraStrings:"]
+    lines += [f"  String{index}: Benchmark value {index}" for index in range(entries)]
+    filepath.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def measure_manifest_load(entries: int, repetitions: int = 5) -> tuple[float, float]:
+    """
+    Return the median time needed to load a metadata file with entries custom strings by parsing the YAML file and
+    from its compiled manifest. The in-process cache of parsed files is cleared before each load, so that every load
+    is like the first one of a new build.
+    """
+    # pylint: disable=import-outside-toplevel, protected-access
+    from pyinstaller_versionfile import manifest_cache, metadata
+
+    timings: dict[bool, list[float]] = {False: [], True: []}
+    with tempfile.TemporaryDirectory(prefix="pyivf-bench-") as tempdir:
+        manifest = Path(tempdir) / "manifest.yml"
+        synthesize_manifest(manifest, entries)
+        manifest_cache.enable(str(Path(tempdir) / "compiled"))
+        try:
+            metadata.MetaData.from_file(str(manifest))  # creates the compiled manifest
+            for _ in range(repetitions):
+                for compiled in (False, True):
+                    if not compiled:
+                        manifest_cache.disable()
+                    metadata._load_yaml_cached.cache_clear()
+                    start = time.perf_counter()
+                    metadata.MetaData.from_file(str(manifest))
+                    timings[compiled].append(time.perf_counter() - start)
+                    manifest_cache.enable(str(Path(tempdir) / "compiled"))
+        finally:
+            manifest_cache.disable()
+    return statistics.median(timings[False]), statistics.median(timings[True])
+
+
+SHARED_METADATA = (
+    "Version: 1.2.3.4\n"
+    "CompanyName: Benchmark Company\n"
+    "LegalCopyright: © Benchmark Company. All rights reserved.\n"
+    "ProductName: Benchmark Product\n"
+    "Translation:\n  - langID: 1033\n    charsetID: 1200\n  - langID: 1031\n    charsetID: 1200\n"
+)
+
+
+def synthesize_product(directory: Path, count: int, extends: bool) -> list[str]:
+    """
+    Create the metadata files of a product with count executables in directory: per-executable files extending a
+    shared base file if extends is True, otherwise complete files repeating the shared values.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    if extends:
+        (directory / "product.yml").write_text(SHARED_METADATA, encoding="utf-8")
+    sources = []
+    for index in range(count):
+        source = directory / f"app{index}.yml"
+        source.write_text(
+            ("Extends: product.yml\n" if extends else SHARED_METADATA)
+            + f"FileDescription: Benchmark App {index}\nInternalName: app{index}\nOriginalFilename: app{index}.exe\n",
+            encoding="utf-8",
+        )
+        sources.append(str(source))
+    return sources
+
+
+def measure_overlays(count: int, repetitions: int = 5) -> dict[str, dict[str, float]]:
+    """
+    Return the median time needed to load and validate the metadata and to create the version files of a product
+    with count executables in one process, for per-executable files extending a shared base file ("extends") and for
+    complete files ("complete"). The in-process caches of parsed and resolved files are cleared before each run, so
+    that every run is like a new build.
+    """
+    # pylint: disable=import-outside-toplevel, protected-access
+    import pyinstaller_versionfile
+    from pyinstaller_versionfile import metadata
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="pyivf-bench-") as tempdir:
+        for variant in ("extends", "complete"):
+            sources = synthesize_product(Path(tempdir) / variant, count, variant == "extends")
+            load_timings, total_timings = [], []
+            for _ in range(repetitions):
+                metadata._load_yaml_cached.cache_clear()
+                metadata._resolved_bases.clear()
+                load_seconds = 0.0
+                start = time.perf_counter()
+                for source in sources:
+                    load_start = time.perf_counter()
+                    loaded = metadata.MetaData.from_file(source)
+                    loaded.validate()
+                    load_seconds += time.perf_counter() - load_start
+                    pyinstaller_versionfile.create_versionfile_from_metadata(f"{source}.txt", loaded)
+                total_timings.append(time.perf_counter() - start)
+                load_timings.append(load_seconds)
+            results[variant] = {"load": statistics.median(load_timings), "total": statistics.median(total_timings)}
+    return results
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """
+    Return the peak RSS of this process and its terminated subprocesses during their whole lifetime.
+    """
+    if resource is None:  # pragma: no cover
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+
+def run_scenario(
+    entry_point: str,
+    source_format: str,
+    mode: str,
+    workers: int,
+    sources: list[str],
+    output_dir: Path,
+    path: Optional[str] = None,
+    startup: float = 0.0,
+) -> BenchmarkResult:
+    """
+    Create a version file for each of the sources and measure the run.
+    path is added to the module search path, e.g. to find synthesized distributions.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    task = _run_subprocess if mode == "subprocess" else _run_in_process
+    if path and path not in sys.path:
+        sys.path.insert(0, path)  # before starting any threads, which only read the search path
+    jobs = [
+        _arguments(entry_point, source_format, source, str(output_dir / f"version_file{index}.txt"))
+        for index, source in enumerate(sources)
+    ]
+    start = time.perf_counter()
+    if workers == 1:
+        latencies = [task(entry_point, arguments, path) for arguments in jobs]
+    else:
+        executor: Executor
+        if mode == "inprocess":
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            # in subprocess mode the work happens in the subprocesses, in threads mode in the threads themselves
+            executor = ThreadPoolExecutor(max_workers=workers)
+        with executor:
+            latencies = list(
+                executor.map(task, [entry_point] * len(jobs), jobs, [path] * len(jobs))
+            )
+    seconds = time.perf_counter() - start
+    p50 = _percentile(latencies, 50)
+    return BenchmarkResult(
+        entry_point=entry_point,
+        source_format=source_format,
+        mode=mode,
+        gil_enabled=gil_enabled(),
+        workers=workers,
+        files=len(jobs),
+        seconds=seconds,
+        files_per_second=len(jobs) / seconds,
+        p50_ms=p50 * 1000,
+        p99_ms=_percentile(latencies, 99) * 1000,
+        startup_share=min(1.0, startup / p50) if mode == "subprocess" else 0.0,
+        peak_rss_kb=_peak_rss_kb(),
+    )
+
+
+def run_isolated_scenario(*args: Any, **kwargs: Any) -> BenchmarkResult:
+    """
+    Run run_scenario in a new interpreter, so that the reported peak RSS is the one of this scenario and not the
+    maximum of all scenarios run before in the benchmarking process.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_scenario, *args, **kwargs).result()
+
+
+def run(
+    count: int,
+    entry_points: Sequence[str] = ENTRY_POINTS,
+    source_formats: Sequence[str] = SOURCE_FORMATS,
+    modes: Sequence[str] = DEFAULT_MODES,
+    workers: Sequence[int] = (1,),
+) -> list[BenchmarkResult]:
+    """
+    Run all combinations of the given scenarios on count synthesized metadata sources.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="pyivf-bench-") as tempdir:
+        workdir = Path(tempdir)
+        site_dir = workdir / "site"
+        sources = {
+            "yaml": synthesize_yaml(workdir / "yaml", count),
+            "dist": synthesize_distributions(site_dir, count),
+        }
+        startup = measure_startup() if "subprocess" in modes else 0.0
+        for entry_point in entry_points:
+            for source_format in source_formats:
+                for mode in modes:
+                    for worker_count in workers:
+                        results.append(
+                            run_isolated_scenario(
+                                entry_point,
+                                source_format,
+                                mode,
+                                worker_count,
+                                sources[source_format],
+                                workdir / f"out-{entry_point}-{source_format}-{mode}-{worker_count}",
+                                path=str(site_dir),
+                                startup=startup,
+                            )
+                        )
+    return results
+
+
+def format_table(results: list[BenchmarkResult]) -> str:
+    """
+    Format the results as plain text table.
+    """
+    columns: list[tuple[str, str, Any]] = [
+        ("entry point", "<20", lambda r: r["entry_point"]),
+        ("source", "<6", lambda r: r["source_format"]),
+        ("mode", "<10", lambda r: r["mode"]),
+        ("workers", ">7", lambda r: r["workers"]),
+        ("files", ">6", lambda r: r["files"]),
+        ("files/s", ">9", lambda r: f"{r['files_per_second']:.1f}"),
+        ("p50 ms", ">8", lambda r: f"{r['p50_ms']:.1f}"),
+        ("p99 ms", ">8", lambda r: f"{r['p99_ms']:.1f}"),
+        ("startup", ">7", lambda r: f"{r['startup_share']:.0%}"),
+        ("peak RSS KiB", ">12", lambda r: r["peak_rss_kb"] if r["peak_rss_kb"] is not None else "n/a"),
+    ]
+    lines = [" ".join(f"{title:{spec}}" for title, spec, _ in columns)]
+    for result in results:
+        lines.append(" ".join(f"{str(value(result)):{spec}}" for _, spec, value in columns))
+    return "\n".join(lines)
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    parsed = parse_args(args)
+    if parsed.cold_start:
+        precompiled = measure_first_render(True, parsed.cold_start)
+        runtime = measure_first_render(False, parsed.cold_start)
+        print(
+            f"First render in a new interpreter: {precompiled * 1000:.1f} ms with the precompiled template, "
+            f"{runtime * 1000:.1f} ms when compiling it at runtime"
+        )
+        return
+    if parsed.manifest:
+        parsed_seconds, compiled_seconds = measure_manifest_load(parsed.manifest)
+        print(
+            f"Loading a manifest with {parsed.manifest} entries: {parsed_seconds * 1000:.1f} ms parsing YAML, "
+            f"{compiled_seconds * 1000:.1f} ms from the compiled manifest"
+        )
+        return
+    if parsed.overlays:
+        timings = measure_overlays(parsed.overlays)
+        print(f"Creating {parsed.overlays} version files of one product (load and validate / total):")
+        for variant, description in [
+            ("extends", "from files extending a shared base file"), ("complete", "from complete files")
+        ]:
+            print(
+                f"  {timings[variant]['load'] * 1000:.1f} ms / {timings[variant]['total'] * 1000:.1f} ms "
+                + description
+            )
+        return
+    results = run(
+        parsed.count,
+        entry_points=parsed.entry_point,
+        source_formats=parsed.source_format,
+        modes=parsed.mode,
+        workers=parsed.workers,
+    )
+    print(f"Python {sys.version.split()[0]}, {'GIL enabled' if gil_enabled() else 'free-threaded'}")
+    print(format_table(results))
+    if parsed.json:
+        with open(parsed.json, "w", encoding="utf-8") as file_handle:
+            json.dump(results, file_handle, indent=2)
+
+
+def parse_args(args: Optional[Sequence[str]]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure throughput and scaling of the pyinstaller-versionfile command line entry points."
+    )
+    parser.add_argument(
+        "--count", type=int, default=100, help="Number of metadata sources to synthesize per scenario."
+    )
+    parser.add_argument(
+        "--entry-point", nargs="+", choices=ENTRY_POINTS, default=list(ENTRY_POINTS), help="Entry points to run."
+    )
+    parser.add_argument(
+        "--source-format",
+        nargs="+",
+        choices=SOURCE_FORMATS,
+        default=list(SOURCE_FORMATS),
+        help="Metadata source formats to synthesize.",
+    )
+    parser.add_argument(
+        "--mode",
+        nargs="+",
+        choices=MODES,
+        default=list(DEFAULT_MODES),
+        help=(
+            "Run the entry points in worker processes of the benchmarking process (inprocess), in its threads "
+            "(threads) or as separate processes (subprocess). Defaults to inprocess and subprocess."
+        ),
+    )
+    parser.add_argument("--workers", nargs="+", type=int, default=[1], help="Worker counts to sweep.")
+    parser.add_argument(
+        "--cold-start",
+        type=int,
+        default=0,
+        metavar="REPETITIONS",
+        help=(
+            "Instead of the throughput scenarios, measure the latency of the first render in new interpreters, "
+            "with the precompiled template and with compiling it at runtime."
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        type=int,
+        default=0,
+        metavar="ENTRIES",
+        help=(
+            "Instead of the throughput scenarios, measure loading a metadata file with this many custom strings by "
+            "parsing YAML and from its compiled manifest (see --manifest-cache)."
+        ),
+    )
+    parser.add_argument(
+        "--overlays",
+        type=int,
+        default=0,
+        metavar="EXECUTABLES",
+        help=(
+            "Instead of the throughput scenarios, measure creating the version files of a product with this many "
+            "executables from files extending a shared base file and from complete files."
+        ),
+    )
+    parser.add_argument("--json", default=None, help="Additionally write the results to this JSON file.")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,102 @@
+"""
+Automatic build numbers for the fourth version component, backed by a local counter file.
+
+The counter file is protected by an OS level lock on a separate lock file and replaced atomically,
+so any number of processes can draw build numbers concurrently without getting duplicates.
+"""
+
+import contextlib
+import os
+import threading
+import time
+from typing import Iterator
+
+from pyinstaller_versionfile import exceptions
+from pyinstaller_versionfile.versions import MAX_VERSION_COMPONENT
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore  # not available on Windows, msvcrt is used instead
+
+MAX_BUILD_NUMBER = MAX_VERSION_COMPONENT
+
+
+@contextlib.contextmanager
+def _locked(lock_file: str) -> Iterator[None]:
+    with open(lock_file, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:  # pragma: no cover
+            import msvcrt  # pylint: disable=import-outside-toplevel,import-error
+
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)  # type: ignore
+                    break
+                except OSError:  # LK_LOCK gives up after 10 seconds
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:  # pragma: no cover
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)  # type: ignore
+
+
+class BuildNumberCounter:
+    """
+    Monotonically increasing build numbers shared by all processes using the same counter file.
+
+    With a batch_size greater than one, blocks of numbers are reserved at once and handed out from memory,
+    which reduces the lock traffic when many numbers are needed. Numbers of a block that are not used
+    before the process ends are skipped, so the build numbers are unique and increasing but may have gaps.
+    """
+
+    def __init__(self, filepath: str, batch_size: int = 1) -> None:
+        if batch_size < 1:
+            raise exceptions.UsageError("The batch size for build numbers must be at least 1")
+        self.filepath = filepath
+        self.batch_size = batch_size
+        self.lock_acquisitions = 0
+        self.lock_wait_seconds = 0.0
+        self._reserved: Iterator[int] = iter(())
+        self._thread_lock = threading.Lock()
+
+    def reserve(self, count: int) -> range:
+        """
+        Atomically reserve the next count build numbers.
+        """
+        start = time.perf_counter()
+        with _locked(self.filepath + ".lock"):
+            self.lock_wait_seconds += time.perf_counter() - start
+            self.lock_acquisitions += 1
+            try:
+                with open(self.filepath, encoding="utf-8") as infile:
+                    current = int(infile.read().strip() or 0)
+            except FileNotFoundError:
+                current = 0
+            except ValueError as err:
+                raise exceptions.InputError(f"Build number file {self.filepath} is corrupt") from err
+            if current + count > MAX_BUILD_NUMBER:
+                raise exceptions.ValidationError(
+                    f"Build number {current + count} exceeds the maximum of {MAX_BUILD_NUMBER}"
+                )
+            temp_file = f"{self.filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as file_handle:
+                file_handle.write(str(current + count))
+            os.replace(temp_file, self.filepath)
+        return range(current + 1, current + count + 1)
+
+    def next(self) -> int:
+        """
+        Return the next build number.
+        """
+        with self._thread_lock:
+            for number in self._reserved:
+                return number
+            self._reserved = iter(self.reserve(self.batch_size))
+            return next(self._reserved)
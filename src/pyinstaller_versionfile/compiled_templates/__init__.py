@@ -0,0 +1,4 @@
+"""
+Bundled templates compiled ahead of time, so that a new process does not need to compile them before rendering.
+The modules are generated with 'python -m pyinstaller_versionfile.precompile', do not edit them.
+"""
@@ -0,0 +1,43 @@
+# Generated from cx_freeze_options_template.json by 'python -m pyinstaller_versionfile.precompile', do not edit.
+# pylint: skip-file
+# mypy: ignore-errors
+SOURCE_SHA256 = '84b5c4b9130c7ecc3d1abf05b3531f288ccc9b7ae514b42b8a7aef132df364b4'
+JINJA_VERSION = '3.1.6'
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'cx_freeze_options_template.json'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_ProductName = resolve('ProductName')
+    l_0_Version = resolve('Version')
+    l_0_FileDescription = resolve('FileDescription')
+    l_0_CompanyName = resolve('CompanyName')
+    l_0_OriginalFilename = resolve('OriginalFilename')
+    l_0_LegalCopyright = resolve('LegalCopyright')
+    try:
+        t_1 = environment.filters['tojson']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'tojson' found.")
+    pass
+    yield '{\n  "name": '
+    yield str(t_1(context.eval_ctx, (undefined(name='ProductName') if l_0_ProductName is missing else l_0_ProductName)))
+    yield ',\n  "version": '
+    yield str(t_1(context.eval_ctx, (undefined(name='Version') if l_0_Version is missing else l_0_Version)))
+    yield ',\n  "description": '
+    yield str(t_1(context.eval_ctx, (undefined(name='FileDescription') if l_0_FileDescription is missing else l_0_FileDescription)))
+    yield ',\n  "author": '
+    yield str(t_1(context.eval_ctx, (undefined(name='CompanyName') if l_0_CompanyName is missing else l_0_CompanyName)))
+    yield ',\n  "executable": {\n    "target_name": '
+    yield str(t_1(context.eval_ctx, (undefined(name='OriginalFilename') if l_0_OriginalFilename is missing else l_0_OriginalFilename)))
+    yield ',\n    "copyright": '
+    yield str(t_1(context.eval_ctx, (undefined(name='LegalCopyright') if l_0_LegalCopyright is missing else l_0_LegalCopyright)))
+    yield '\n  }\n}\n'
+
+blocks = {}
+debug_info = '2=24&3=26&4=28&5=30&7=32&8=34'
@@ -0,0 +1,36 @@
+# Generated from nuitka_options_template.txt by 'python -m pyinstaller_versionfile.precompile', do not edit.
+# pylint: skip-file
+# mypy: ignore-errors
+SOURCE_SHA256 = 'ae0701ce40e073dff925d7e0cf183898d22599ea990c7b802ce768b1246eed81'
+JINJA_VERSION = '3.1.6'
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'nuitka_options_template.txt'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_CompanyName = resolve('CompanyName')
+    l_0_ProductName = resolve('ProductName')
+    l_0_Version = resolve('Version')
+    l_0_FileDescription = resolve('FileDescription')
+    l_0_LegalCopyright = resolve('LegalCopyright')
+    pass
+    yield '--company-name='
+    yield str((undefined(name='CompanyName') if l_0_CompanyName is missing else l_0_CompanyName))
+    yield '\n--product-name='
+    yield str((undefined(name='ProductName') if l_0_ProductName is missing else l_0_ProductName))
+    yield '\n--file-version='
+    yield str((undefined(name='Version') if l_0_Version is missing else l_0_Version))
+    yield '\n--product-version='
+    yield str((undefined(name='Version') if l_0_Version is missing else l_0_Version))
+    yield '\n--file-description='
+    yield str((undefined(name='FileDescription') if l_0_FileDescription is missing else l_0_FileDescription))
+    yield '\n--copyright='
+    yield str((undefined(name='LegalCopyright') if l_0_LegalCopyright is missing else l_0_LegalCopyright))
+    yield '\n'
+
+blocks = {}
+debug_info = '1=17&2=19&3=21&4=23&5=25&6=27'
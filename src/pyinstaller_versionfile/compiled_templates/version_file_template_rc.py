@@ -0,0 +1,52 @@
+# Generated from version_file_template.rc by 'python -m pyinstaller_versionfile.precompile', do not edit.
+# pylint: skip-file
+# mypy: ignore-errors
+SOURCE_SHA256 = '3e7ad864a7b7c3c8007539e96882cda9efc00a868c67fab00be62ae4605e60ca'
+JINJA_VERSION = '3.1.6'
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'version_file_template.rc'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_Version = resolve('Version')
+    l_0_StringTables = resolve('StringTables')
+    l_0_Translation = resolve('Translation')
+    try:
+        t_1 = environment.filters['join']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'join' found.")
+    pass
+    yield '// UTF-8\n//\n// VERSIONINFO resource, see:\n// https://learn.microsoft.com/en-us/windows/win32/menurc/versioninfo-resource\n\n#include <winver.h>\n\nVS_VERSION_INFO VERSIONINFO\n FILEVERSION '
+    yield str(context.call(environment.getattr((undefined(name='Version') if l_0_Version is missing else l_0_Version), 'replace'), '.', ','))
+    yield '\n PRODUCTVERSION '
+    yield str(context.call(environment.getattr((undefined(name='Version') if l_0_Version is missing else l_0_Version), 'replace'), '.', ','))
+    yield '\n FILEFLAGSMASK 0x3fL\n FILEFLAGS 0x0L\n FILEOS 0x40004L\n FILETYPE 0x1L\n FILESUBTYPE 0x0L\nBEGIN\n    BLOCK "StringFileInfo"\n    BEGIN'
+    for (l_1_table_id, l_1_strings) in (undefined(name='StringTables') if l_0_StringTables is missing else l_0_StringTables):
+        _loop_vars = {}
+        pass
+        yield '\n        BLOCK "'
+        yield str(l_1_table_id)
+        yield '"\n        BEGIN'
+        for (l_2_name, l_2_value) in l_1_strings:
+            _loop_vars = {}
+            pass
+            yield '\n            VALUE "'
+            yield str(l_2_name)
+            yield '", "'
+            yield str(context.call(environment.getattr(l_2_value, 'replace'), '"', '""', _loop_vars=_loop_vars))
+            yield '"'
+        l_2_name = l_2_value = missing
+        yield '\n        END'
+    l_1_table_id = l_1_strings = missing
+    yield '\n    END\n    BLOCK "VarFileInfo"\n    BEGIN\n        VALUE "Translation", '
+    yield str(t_1(context.eval_ctx, (undefined(name='Translation') if l_0_Translation is missing else l_0_Translation), ', '))
+    yield '\n    END\nEND\n'
+
+blocks = {}
+debug_info = '9=21&10=23&19=25&20=29&22=31&23=35&30=43'
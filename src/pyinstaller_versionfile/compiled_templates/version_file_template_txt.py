@@ -0,0 +1,66 @@
+# Generated from version_file_template.txt by 'python -m pyinstaller_versionfile.precompile', do not edit.
+# pylint: skip-file
+# mypy: ignore-errors
+SOURCE_SHA256 = '044265bacb535ea72663beed2f7ec0427b3fc4884688acebc54349e256d7f3e6'
+JINJA_VERSION = '3.1.6'
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'version_file_template.txt'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_Version = resolve('Version')
+    l_0_StringTables = resolve('StringTables')
+    l_0_Translation = resolve('Translation')
+    try:
+        t_1 = environment.filters['join']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'join' found.")
+    try:
+        t_2 = environment.filters['python_string']
+    except KeyError:
+        @internalcode
+        def t_2(*unused):
+            raise TemplateRuntimeError("No filter named 'python_string' found.")
+    pass
+    yield "# UTF-8\n#\n# For more details about fixed file info 'ffi' see:\n# http://msdn.microsoft.com/en-us/library/ms646997.aspx\n\nVSVersionInfo(\n  ffi=FixedFileInfo(\n    # filevers and prodvers should be always a tuple with four items: (1, 2, 3, 4)\n    # Set not needed items to zero 0. Must always contain 4 elements.\n    filevers="
+    yield str((('(' + context.call(environment.getattr((undefined(name='Version') if l_0_Version is missing else l_0_Version), 'replace'), '.', ',')) + ')'))
+    yield ',\n    prodvers='
+    yield str((('(' + context.call(environment.getattr((undefined(name='Version') if l_0_Version is missing else l_0_Version), 'replace'), '.', ',')) + ')'))
+    yield ",\n    # Contains a bitmask that specifies the valid bits 'flags'r\n    mask=0x3f,\n    # Contains a bitmask that specifies the Boolean attributes of the file.\n    flags=0x0,\n    # The operating system for which this file was designed.\n    # 0x4 - NT and there is no need to change it.\n    OS=0x40004,\n    # The general type of file.\n    # 0x1 - the file is an application.\n    fileType=0x1,\n    # The function of the file.\n    # 0x0 - the function is not defined for this fileType\n    subtype=0x0,\n    # Creation date and time stamp.\n    date=(0, 0)\n    ),\n  kids=[\n    StringFileInfo(\n      ["
+    l_1_loop = missing
+    for (l_1_table_id, l_1_strings), l_1_loop in LoopContext((undefined(name='StringTables') if l_0_StringTables is missing else l_0_StringTables), undefined):
+        _loop_vars = {}
+        pass
+        if (not environment.getattr(l_1_loop, 'first')):
+            pass
+            yield ','
+        yield "\n      StringTable(\n        u'"
+        yield str(l_1_table_id)
+        yield "',\n        ["
+        l_2_loop = missing
+        for (l_2_name, l_2_value), l_2_loop in LoopContext(l_1_strings, undefined):
+            _loop_vars = {}
+            pass
+            if (not environment.getattr(l_2_loop, 'first')):
+                pass
+                yield ',\n        '
+            yield "StringStruct(u'"
+            yield str(t_2(l_2_name))
+            yield "', u'"
+            yield str(t_2(l_2_value))
+            yield "')"
+        l_2_loop = l_2_name = l_2_value = missing
+        yield '])'
+    l_1_loop = l_1_table_id = l_1_strings = missing
+    yield "\n      ]),\n    VarFileInfo([VarStruct(u'Translation', ["
+    yield str(t_1(context.eval_ctx, (undefined(name='Translation') if l_0_Translation is missing else l_0_Translation), ', '))
+    yield '])])\n  ]\n)\n'
+
+blocks = {}
+debug_info = '10=27&11=29&31=32&33=39&34=42&35=49&38=57'
@@ -0,0 +1,65 @@
+"""
+Dependency information for build systems: Makefile-style depfiles and input fingerprints.
+"""
+
+import codecs
+import functools
+import hashlib
+import json
+from typing import Sequence
+
+from pyinstaller_versionfile import metrics
+from pyinstaller_versionfile.metadata import MetaData
+from pyinstaller_versionfile.writer import OUTPUT_FORMATS
+
+
+def collect(metadata: MetaData, output_formats: Sequence[str] = ("pyinstaller",)) -> list[str]:
+    """
+    Return all files the outputs generated from metadata in the given formats depend on.
+    """
+    return [*metadata.source_files, *(OUTPUT_FORMATS[fmt] for fmt in output_formats)]
+
+
+def write_depfile(depfile: str, targets: Sequence[str], dependencies: Sequence[str]) -> None:
+    """
+    Write a Makefile-format dependency list for targets, as understood by Make and Ninja.
+    """
+    lines = [" ".join(map(_escape, targets)) + ":"] + [f" {_escape(dep)}" for dep in dependencies]
+    with codecs.open(depfile, "w", encoding="utf-8") as file_handle:
+        file_handle.write(" \\\n".join(lines) + "\n")
+
+
+def _escape(path: str) -> str:
+    return path.replace("\\", "/").replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
+
+
+def fingerprint(metadata: MetaData, output_formats: Sequence[str] = ("pyinstaller",)) -> str:
+    """
+    Return a stable digest of everything that influences the rendered outputs, without rendering them.
+    The metadata should already be validated and sanitized, so that equivalent inputs produce the same digest.
+    """
+    template_digests = {}
+    for output_format in output_formats:
+        with open(OUTPUT_FORMATS[output_format], "rb") as infile:
+            template_digests[output_format] = hashlib.sha256(infile.read()).hexdigest()
+    inputs = {
+        "metadata": metadata.to_dict(),
+        "templates": template_digests,
+        "package_version": _package_version(),
+    }
+    serialized = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _package_version() -> str:
+    # looking up the version scans sys.path for the distribution, which is far more expensive than the fingerprint
+    from importlib.metadata import PackageNotFoundError, version  # pylint: disable=import-outside-toplevel
+
+    try:
+        return version("pyinstaller_versionfile")
+    except PackageNotFoundError:  # pragma: no cover
+        return "unknown"
+
+
+metrics.register_cache("package_version", _package_version)
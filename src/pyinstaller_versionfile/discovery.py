@@ -0,0 +1,123 @@
+"""
+Discovery of metadata files in large source trees and an index to skip unchanged ones.
+"""
+
+import fnmatch
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Iterable, Optional, Sequence
+
+DEFAULT_PATTERN = "*.versionfile.yml"
+DEFAULT_IGNORE = (".git", ".hg", ".svn", ".tox", ".nox", ".venv", "venv", "node_modules", "__pycache__")
+INDEX_VERSION = 1
+
+
+def _is_ignored(name: str, relative_path: str, ignore: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(relative_path, p) for p in ignore)
+
+
+def _scan(directory: str, root: str, pattern: str, ignore: Sequence[str]) -> tuple[list[str], list[str]]:
+    """
+    Scan a single directory. Return the matching files and the subdirectories to scan.
+    """
+    files: list[str] = []
+    subdirectories: list[str] = []
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return files, subdirectories
+    for entry in entries:
+        relative_path = os.path.relpath(entry.path, root).replace(os.sep, "/")
+        if _is_ignored(entry.name, relative_path, ignore):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            subdirectories.append(entry.path)
+        elif entry.is_file() and fnmatch.fnmatch(entry.name, pattern):
+            files.append(entry.path)
+    return files, subdirectories
+
+
+def discover(
+    roots: Iterable[str],
+    pattern: str = DEFAULT_PATTERN,
+    ignore: Sequence[str] = DEFAULT_IGNORE,
+    workers: Optional[int] = None,
+) -> list[str]:
+    """
+    Find all files matching pattern below the given root directories.
+    Directories are scanned in parallel. Files and directories whose name or path relative to the root matches
+    one of the ignore patterns are skipped. The result is sorted.
+    """
+    found: list[str] = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: set[Future[tuple[list[str], list[str]]]] = set()
+        roots_of: dict[Future[tuple[list[str], list[str]]], str] = {}
+        for root in roots:
+            future = executor.submit(_scan, root, root, pattern, ignore)
+            pending.add(future)
+            roots_of[future] = root
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                root = roots_of.pop(future)
+                files, subdirectories = future.result()
+                found.extend(files)
+                for subdirectory in subdirectories:
+                    new_future = executor.submit(_scan, subdirectory, root, pattern, ignore)
+                    pending.add(new_future)
+                    roots_of[new_future] = root
+    return sorted(found)
+
+
+def _stat(path: str) -> Optional[list[int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class Index:
+    """
+    Persistent record of the inputs and output of each generated version file.
+    A metadata file only needs to be processed again if one of its inputs changed or the output is missing.
+    """
+
+    def __init__(self, filepath: Optional[str] = None) -> None:
+        self.filepath = filepath
+        self.entries: dict[str, dict[str, Any]] = {}
+        if filepath and os.path.isfile(filepath):
+            try:
+                with open(filepath, encoding="utf-8") as infile:
+                    data = json.load(infile)
+            except (OSError, ValueError):
+                data = {}  # a broken index only means that everything is generated again
+            if data.get("version") == INDEX_VERSION:
+                self.entries = data.get("entries", {})
+
+    def is_up_to_date(self, source: str, output: str) -> bool:
+        """
+        Check if output was generated from source and none of the inputs changed since.
+        """
+        entry = self.entries.get(os.path.abspath(source))
+        if not entry or entry["output"] != os.path.abspath(output) or not os.path.isfile(output):
+            return False
+        return all(_stat(path) == stat for path, stat in entry["inputs"].items())
+
+    def update(self, source: str, output: str, inputs: Iterable[str]) -> None:
+        """
+        Record that output was generated from source, reading the given input files.
+        """
+        self.entries[os.path.abspath(source)] = {
+            "output": os.path.abspath(output),
+            "inputs": {os.path.abspath(path): _stat(path) for path in inputs},
+        }
+
+    def save(self) -> None:
+        if not self.filepath:
+            return
+        temp_file = f"{self.filepath}.{os.getpid()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as file_handle:
+            json.dump({"version": INDEX_VERSION, "entries": self.entries}, file_handle, indent=1, sort_keys=True)
+        os.replace(temp_file, self.filepath)
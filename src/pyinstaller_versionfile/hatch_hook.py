@@ -0,0 +1,85 @@
+"""
+Hatch build hook creating version files from the metadata of the project being built.
+
+Enable it in pyproject.toml with pyinstaller-versionfile in the requirements of the build system and a
+[tool.hatch.build.hooks.pyinstaller-versionfile] table (see README). The metadata is taken from the core metadata
+hatchling creates for the wheel, so no separate process is started and the project does not need to be installed.
+"""
+
+import os
+from pathlib import Path
+from typing import Any
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface  # pylint: disable=import-error
+from hatchling.plugin import hookimpl  # pylint: disable=import-error
+
+import pyinstaller_versionfile
+from pyinstaller_versionfile import exceptions, metrics
+from pyinstaller_versionfile.metadata import MetaData
+from pyinstaller_versionfile.versions import VersionPolicy
+from pyinstaller_versionfile.writer import OUTPUT_FORMATS
+
+DEFAULT_OUTFILE = "version_file.txt"
+
+
+class VersionFileBuildHook(BuildHookInterface):  # type: ignore[misc]
+    """
+    Create version files before a build, configured by the options of the hook:
+    outfile (version file for PyInstaller relative to the project root, defaults to version_file.txt),
+    output-formats (table of additional output formats and their paths), version-policy (table of PEP 440 version
+    segments and their policies), metadata (table of MetaData arguments overriding the project metadata, e.g.
+    company_name) and artifacts (whether to include the created files in the build, defaults to false).
+    """
+
+    PLUGIN_NAME = "pyinstaller-versionfile"
+
+    def outputs(self) -> dict[str, str]:
+        """
+        Return the absolute paths of the files to create per output format.
+        """
+        outputs = {"pyinstaller": self.config.get("outfile", DEFAULT_OUTFILE), **self.config.get("output-formats", {})}
+        for output_format in outputs:
+            if output_format not in OUTPUT_FORMATS:
+                raise exceptions.UsageError(
+                    f"Unknown output format {output_format}, must be one of: {', '.join(OUTPUT_FORMATS)}"
+                )
+        return {output_format: os.path.join(self.root, path) for output_format, path in outputs.items()}
+
+    def version_file_metadata(self) -> MetaData:
+        """
+        Return the metadata of the project being built, as from_distribution would return it once installed.
+        """
+        core = self.metadata.core
+        # the same fields hatchling writes to the core metadata of the wheel
+        core_metadata = {
+            "Name": core.raw_name,
+            "Version": self.metadata.version,
+            "Summary": core.description,
+            "Author": ", ".join(core.authors_data["name"]),
+            "Author-email": ", ".join(core.authors_data["email"]),
+            "Maintainer": ", ".join(core.maintainers_data["name"]),
+            "Maintainer-email": ", ".join(core.maintainers_data["email"]),
+            "License": core.license or core.license_expression,
+        }
+        return MetaData.from_core_metadata(
+            core_metadata,
+            VersionPolicy.from_mapping(self.config.get("version-policy", {})),
+            **self.config.get("metadata", {}),
+        )
+
+    def initialize(self, version: str, build_data: dict[str, Any]) -> None:
+        outputs = self.outputs()
+        for path in outputs.values():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with metrics.track_generation("build"):
+            pyinstaller_versionfile.create_output_files(self.version_file_metadata(), outputs)
+        if self.config.get("artifacts", False):
+            # artifacts are gitignore-style patterns, anchored at the project root with a leading slash
+            build_data["artifacts"].extend(
+                "/" + Path(os.path.relpath(path, self.root)).as_posix() for path in outputs.values()
+            )
+
+
+@hookimpl  # type: ignore[misc]
+def hatch_register_build_hook() -> type[VersionFileBuildHook]:
+    return VersionFileBuildHook
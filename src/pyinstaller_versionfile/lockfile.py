@@ -0,0 +1,118 @@
+"""
+Snapshot lockfiles of distribution metadata, for builds without the distributions installed.
+
+A lockfile stores the core metadata fields used by MetaData.from_distribution for a set of
+distributions, so that version files can be created from it in hermetic build environments
+without querying importlib.metadata.
+"""
+
+import argparse
+import functools
+import json
+import os
+import re
+from argparse import Namespace
+from typing import Any, Iterable, Optional, Sequence
+
+from pyinstaller_versionfile import exceptions
+
+LOCKFILE_VERSION = 1
+DEFAULT_LOCKFILE = "pyivf-dist.lock"
+DISTRIBUTION_FIELDS = (
+    "Name",
+    "Version",
+    "Summary",
+    "Author",
+    "Author-email",
+    "Maintainer",
+    "Maintainer-email",
+    "Home-page",
+    "License",
+)
+
+
+def normalize_name(distname: str) -> str:
+    """
+    Normalize a distribution name as defined in PEP 503, so that lookups are independent of the spelling.
+    """
+    return re.sub(r"[-_.]+", "-", distname).lower()
+
+
+def snapshot(distnames: Iterable[str]) -> dict[str, Any]:
+    """
+    Record the metadata fields of the given installed distributions.
+    """
+    from importlib.metadata import PackageNotFoundError, distribution  # pylint: disable=import-outside-toplevel
+
+    distributions = {}
+    for distname in distnames:
+        try:
+            meta = distribution(distname).metadata
+        except PackageNotFoundError as err:
+            raise exceptions.InputError(f"Distribution {distname} not found") from err
+        distributions[normalize_name(distname)] = {
+            field: meta[field] for field in DISTRIBUTION_FIELDS if meta.get(field) is not None  # type: ignore
+        }
+    return {"version": LOCKFILE_VERSION, "distributions": dict(sorted(distributions.items()))}
+
+
+def write(filepath: str, data: dict[str, Any]) -> None:
+    with open(filepath, "w", encoding="utf-8") as file_handle:
+        json.dump(data, file_handle, indent=1, ensure_ascii=False)
+        file_handle.write("\n")
+
+
+def load(filepath: str) -> dict[str, dict[str, str]]:
+    """
+    Load the distributions stored in a lockfile, indexed by their normalized names.
+    The lockfile is only read once per process as long as it is not modified.
+    """
+    try:
+        stat = os.stat(filepath)
+        return _load_cached(os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError as err:
+        raise exceptions.InputError(f"Lockfile {filepath} does not exist") from err
+    except (OSError, ValueError) as err:
+        raise exceptions.InputError(f"Failed to read lockfile {filepath}") from err
+
+
+@functools.lru_cache(maxsize=16)
+def _load_cached(filepath: str, mtime_ns: int, size: int) -> dict[str, dict[str, str]]:  # pylint: disable=unused-argument
+    with open(filepath, encoding="utf-8") as infile:
+        data = json.load(infile)
+    if not isinstance(data, dict) or data.get("version") != LOCKFILE_VERSION:
+        raise exceptions.InputError(f"Unsupported lockfile format in {filepath}")
+    return data["distributions"]
+
+
+def lookup(filepath: str, distname: str) -> dict[str, str]:
+    """
+    Return the metadata fields of a distribution stored in a lockfile.
+    """
+    try:
+        return load(filepath)[normalize_name(distname)]
+    except KeyError as err:
+        raise exceptions.InputError(f"Distribution {distname} not found in lockfile {filepath}") from err
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    parsed = parse_args(args)
+    write(parsed.output, snapshot(parsed.distributions))
+
+
+def parse_args(args: Optional[Sequence[str]]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Record the metadata of installed distributions in a lockfile, "
+            "for use with pyivf-make_version --source-format dist-lock."
+        )
+    )
+    parser.add_argument("distributions", nargs="+", help="Names of the distributions to record.")
+    parser.add_argument(
+        "--output", default=DEFAULT_LOCKFILE, help=f"Lockfile to write. Defaults to {DEFAULT_LOCKFILE}."
+    )
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,133 @@
+"""
+Compiled manifests: the parsed and key-converted content of YAML metadata files in compact JSON, so that unchanged
+metadata files are loaded on later runs without parsing YAML.
+
+JSON only holds plain data (mappings, lists, strings and numbers), so loading a compiled manifest never runs code,
+and the json module parses it in C much faster than YAML. Manifests with values JSON cannot represent exactly, e.g.
+dates or mappings with numeric keys, are not cached. A compiled manifest records the path, modification time, size
+and SHA-256 digest of the metadata file it was compiled from: if modification time and size are unchanged, it is used
+without reading the metadata file. Otherwise, e.g. after a fresh checkout, the metadata file is read and the compiled
+manifest is still used if the digest matches. Compiled manifests with a different content are replaced, the ones that
+cannot be read or parsed are ignored.
+
+The cache is disabled by default. It is enabled per process with enable(), for a directory holding the compiled
+manifests of all metadata files or with compiled manifests stored next to each metadata file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from pyinstaller_versionfile import metrics
+
+FORMAT_VERSION = 2
+SUFFIX = ".pyivfc"
+
+_location: Optional[str] = None  # None if disabled, "" to store compiled manifests next to the metadata files
+
+
+def enable(directory: str = "") -> None:
+    """
+    Load metadata files from compiled manifests in directory, or next to each metadata file if directory is empty.
+    """
+    global _location  # pylint: disable=global-statement
+    _location = os.path.abspath(directory) if directory else ""
+
+
+def disable() -> None:
+    global _location  # pylint: disable=global-statement
+    _location = None
+
+
+def is_enabled() -> bool:
+    return _location is not None
+
+
+def compiled_path(filepath: str) -> Optional[str]:
+    """
+    Return the path of the compiled manifest of a metadata file, or None if the cache is disabled.
+    """
+    if _location is None:
+        return None
+    filepath = os.path.abspath(filepath)
+    if not _location:
+        directory, name = os.path.split(filepath)
+        return os.path.join(directory, f".{name}{SUFFIX}")
+    digest = hashlib.sha256(os.path.normcase(filepath).encode("utf-8")).hexdigest()[:32]
+    return os.path.join(_location, f"{digest}{SUFFIX}")
+
+
+def load(filepath: str, compile_manifest: Callable[[str], dict[str, Any]]) -> dict[str, Any]:
+    """
+    Return the compiled manifest of a metadata file, calling compile_manifest(filepath) to create it if the cache is
+    disabled, or if there is no usable compiled manifest for the current content of the file.
+    """
+    cache_file = compiled_path(filepath)
+    if cache_file is None:
+        return compile_manifest(filepath)
+    path = os.path.abspath(filepath)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return compile_manifest(filepath)  # reports the missing or unreadable file
+    cached = _read(cache_file, path)
+    if cached is not None and (cached["mtime_ns"], cached["size"]) == (stat.st_mtime_ns, stat.st_size):
+        metrics.inc("manifest_cache_requests_total", result="hit")
+        return cached["manifest"]  # type: ignore[no-any-return]
+    with open(path, "rb") as infile:
+        digest = hashlib.sha256(infile.read()).hexdigest()
+    if cached is not None and cached["digest"] == digest:
+        metrics.inc("manifest_cache_requests_total", result="hit")
+        manifest = cached["manifest"]
+    else:
+        metrics.inc("manifest_cache_requests_total", result="miss")
+        manifest = compile_manifest(filepath)
+    record = {
+        "format": FORMAT_VERSION,
+        "path": path,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "digest": digest,
+        "manifest": manifest,
+    }
+    _write(cache_file, record)
+    return manifest  # type: ignore[no-any-return]
+
+
+def _read(cache_file: str, filepath: str) -> Optional[dict[str, Any]]:
+    """
+    Return the record stored in the compiled manifest of filepath,
+    or None if there is none, it cannot be parsed, or it was written for another file or format.
+    """
+    try:
+        with open(cache_file, "rb") as infile:
+            record = json.loads(infile.read())
+    except (OSError, ValueError):  # including JSONDecodeError and UnicodeDecodeError
+        return None
+    if not isinstance(record, dict) or record.get("format") != FORMAT_VERSION or record.get("path") != filepath:
+        return None
+    if not {"mtime_ns", "size", "digest", "manifest"} <= record.keys():
+        return None
+    return record
+
+
+def _write(cache_file: str, record: dict[str, Any]) -> None:
+    try:
+        content = json.dumps(record, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    except (TypeError, ValueError):
+        return  # values YAML can represent but JSON cannot, e.g. dates, are not cached
+    if json.loads(content)["manifest"] != record["manifest"]:
+        return  # values JSON changes, e.g. numeric keys that become strings, are not cached
+    temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(temp_file, "w", encoding="utf-8") as file_handle:
+            file_handle.write(content)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        pass  # e.g. a read-only source tree, the metadata file is parsed again next time
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
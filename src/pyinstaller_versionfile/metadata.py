@@ -5,23 +5,162 @@ Author: Andreas Finkler
 # pylint: disable=too-many-arguments, too-many-positional-arguments
 from __future__ import annotations
 from collections import UserDict
-from typing import Optional, Union, TypedDict, Any
+from typing import TYPE_CHECKING, Callable, Optional, Union, TypedDict, Any, Iterator, Mapping, Sequence, cast
 
 import codecs
+import functools
+import os
 import re
 import itertools
 from pathlib import Path
 
-from importlib.metadata import PackageNotFoundError, distribution
+from pyinstaller_versionfile import exceptions, manifest_cache, metrics, tracing
+from pyinstaller_versionfile.buildnumber import BuildNumberCounter
+from pyinstaller_versionfile.versions import DEFAULT_VERSION_POLICY, VersionPolicy, check_places, to_windows_version
 
-import yaml
+if TYPE_CHECKING:
+    from importlib.metadata import Distribution
 
-try:
-    from yaml import CLoader as Loader
-except ImportError:  # pragma: no cover
-    from yaml import Loader  # type: ignore
+# yaml and importlib.metadata are imported where they are needed, because importing them takes longer than
+# creating a version file from the environment (see MetaData.from_env).
 
-from pyinstaller_versionfile import exceptions
+
+def _core_metadata(message: Any) -> Mapping[str, Any]:
+    """
+    Return the core metadata of a distribution, an email message, as read-only mapping of its fields.
+    The type stubs of importlib.metadata.PackageMetadata lack get, which email messages have.
+    """
+    return cast(Mapping[str, Any], message)
+
+
+def _load_yaml(filepath: str) -> dict[Any, Any]:
+    """
+    Load the mapping stored in a YAML file.
+    Parsed files are cached as long as they are not modified, so that a base file shared by many metadata files is
+    only parsed once.
+    """
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    try:
+        stat = os.stat(filepath)
+        data = _load_yaml_cached(os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+    except IsADirectoryError as err:
+        raise exceptions.InputError(
+            f"Specified filepath {filepath} is a directory, not a file"
+        ) from err
+    except FileNotFoundError as err:
+        raise exceptions.InputError(f"File {filepath} does not exist") from err
+    except IOError as err:
+        raise exceptions.InputError("Failed to read input from file") from err
+    except yaml.scanner.ScannerError as err:
+        raise exceptions.InputError(
+            "Failed to read YAML data due to scanner error"
+        ) from err
+    if not isinstance(data, dict):
+        raise exceptions.InputError(
+            f"Input file must contain a mapping, but is: {type(data)}"
+        )
+    return data
+
+
+def _name_matcher(pattern: str, regex: bool) -> Callable[[str], bool]:
+    """
+    Return a function checking if a normalized distribution name matches the glob pattern or regular expression.
+    """
+    if not regex:
+        import fnmatch  # pylint: disable=import-outside-toplevel
+
+        from pyinstaller_versionfile.lockfile import normalize_name  # pylint: disable=import-outside-toplevel
+
+        return functools.partial(fnmatch.fnmatchcase, pat=normalize_name(pattern))
+    try:
+        compiled = re.compile(pattern, re.IGNORECASE)
+    except re.error as err:
+        raise exceptions.UsageError(f"Invalid regular expression {pattern}: {err}") from err
+    return lambda name: compiled.fullmatch(name) is not None
+
+
+@functools.lru_cache(maxsize=128)
+def _load_yaml_cached(filepath: str, mtime_ns: int, size: int) -> Any:  # pylint: disable=unused-argument
+    # mtime_ns and size are only part of the signature to invalidate the cache when the file changes
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    try:
+        from yaml import CLoader as Loader  # pylint: disable=import-outside-toplevel
+    except ImportError:  # pragma: no cover
+        from yaml import Loader  # type: ignore  # pylint: disable=import-outside-toplevel
+
+    with codecs.open(filepath, encoding="utf-8") as infile:
+        return yaml.load(infile, Loader=Loader)
+
+
+metrics.register_cache("yaml", _load_yaml_cached)
+
+# Base files named with 'Extends', resolved (including the files they extend) and validated once, keyed by their
+# absolute path. Each entry holds the modification time and size of all files read to resolve the base file, it is
+# only used as long as none of them changed.
+_resolved_bases: dict[str, tuple[tuple[tuple[str, int, int], ...], "MetaData"]] = {}
+
+
+def _stamps(files: Sequence[str]) -> tuple[tuple[str, int, int], ...]:
+    stamps = []
+    for file in files:
+        stat = os.stat(file)
+        stamps.append((file, stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+def _unchanged(stamps: tuple[tuple[str, int, int], ...]) -> bool:
+    try:
+        return _stamps([file for file, _, _ in stamps]) == stamps
+    except OSError:
+        return False
+
+
+DEFAULT_ENV_PREFIX = "PYIVF_"
+
+
+def string_table_ids(translations: Sequence[int]) -> list[str]:
+    """
+    Return the StringTable ids (language and charset as 8 hex digits) for a flat list of translations.
+    """
+    table_ids = [f"{lang:04X}{charset:04X}" for lang, charset in zip(translations[::2], translations[1::2])]
+    return list(dict.fromkeys(table_ids))
+
+
+FIXED_STRINGS = (
+    ("CompanyName", "CompanyName"),
+    ("FileDescription", "FileDescription"),
+    ("FileVersion", "Version"),
+    ("InternalName", "InternalName"),
+    ("LegalCopyright", "LegalCopyright"),
+    ("OriginalFilename", "OriginalFilename"),
+    ("ProductName", "ProductName"),
+    ("ProductVersion", "Version"),
+)  # name of the StringStruct and of the parameter providing its value
+
+
+def string_tables(data: Mapping[str, Any]) -> Iterator[tuple[str, Iterator[tuple[str, str]]]]:
+    """
+    Yield the id and the StringStructs of each StringTable for the values returned by MetaData.to_dict().
+    Everything is created while the template is rendered, so large tables are never held in memory completely.
+    """
+    localized = data.get("LocalizedStrings") or {}
+    for table_id in string_table_ids(data.get("Translation") or MetaData.default_translations):
+        yield table_id, _strings(data, localized.get(table_id, {}))
+
+
+def _strings(data: Mapping[str, Any], overrides: Mapping[str, str]) -> Iterator[tuple[str, str]]:
+    extra = data.get("ExtraStrings") or {}
+    for name, parameter in FIXED_STRINGS:
+        yield name, overrides.get(name, data[parameter])
+    fixed_names = {name for name, _ in FIXED_STRINGS}
+    for name, value in extra.items():
+        if name not in fixed_names:
+            yield name, overrides.get(name, value)
+    for name, value in overrides.items():
+        if name not in fixed_names and name not in extra:
+            yield name, value
 
 
 class KwargsDict(UserDict):
@@ -46,15 +185,17 @@ class MetadataKwargs(TypedDict, total=False):
     original_filename: Optional[str]
     product_name: Optional[str]
     translations: Optional[list[int]]
+    extra_strings: Optional[dict[str, str]]
+    localized_strings: Optional[dict[str, dict[str, str]]]
 
 
-class MetaData:
+class MetaData:  # pylint: disable=too-many-instance-attributes
     """
     Read and validate the metadata provided for versionfile generation.
     """
 
     placeholder_value = ""  # value to use if nothing was specified
-    default_translations = [1033, 1200]
+    default_translations = (1033, 1200)  # immutable, every instance gets its own list
     key_conversion = {
         "Version": "version",
         "CompanyName": "company_name",
@@ -64,7 +205,10 @@ class MetaData:
         "OriginalFilename": "original_filename",
         "ProductName": "product_name",
         "Translation": "translations",
+        "ExtraStrings": "extra_strings",
+        "LocalizedStrings": "localized_strings",
     }
+    mapping_keys = ("extra_strings", "localized_strings")  # parameters that take a mapping instead of a string
 
     def __init__(
         self,
@@ -76,6 +220,8 @@ class MetaData:
         original_filename: Optional[str] = None,
         product_name: Optional[str] = None,
         translations: Optional[list[int]] = None,
+        extra_strings: Optional[dict[str, str]] = None,
+        localized_strings: Optional[dict[str, dict[str, str]]] = None,
     ) -> None:
         self.version = version or "0.0.0.0"
         self.company_name = company_name or self.placeholder_value
@@ -84,20 +230,154 @@ class MetaData:
         self.legal_copyright = legal_copyright or self.placeholder_value
         self.original_filename = original_filename or self.placeholder_value
         self.product_name = product_name or self.placeholder_value
-        self.translations = translations or self.default_translations
+        # The lists and mappings are copied, because parsed YAML files are cached and shared between instances.
+        self.translations = list(translations or self.default_translations)
+        # additional StringStructs, added to every StringTable
+        self.extra_strings = dict(extra_strings) if isinstance(extra_strings, Mapping) else extra_strings or {}
+        # values of single StringTables, keyed by the table id (language and charset as 8 hex digits, e.g. 040704B0)
+        self.localized_strings = {
+            str(table_id).upper(): dict(strings) if isinstance(strings, Mapping) else strings
+            for table_id, strings in (localized_strings or {}).items()
+        }
+        self._source_files: list[str] = []
+        # looks up further source files on first access, see source_files
+        self._lookup_source_files: Optional[Callable[[], list[str]]] = None
+        self._validated: dict[str, Any] = {}  # values that passed validation, by parameter name (see validate)
+        # "yaml", "dist", "dist-lock", "build" or "env" if created by a factory method
+        self.source_format: Optional[str] = None
+
+    @property
+    def source_files(self) -> list[str]:
+        """
+        Files read to build this instance. Locating the metadata file of a distribution requires reading its RECORD,
+        which is only done once the files are needed, e.g. for a depfile or to check if a target is up to date.
+        """
+        if self._lookup_source_files is not None:
+            lookup, self._lookup_source_files = self._lookup_source_files, None
+            self._source_files[:0] = lookup()
+        return self._source_files
+
+    @source_files.setter
+    def source_files(self, source_files: list[str]) -> None:
+        self._lookup_source_files = None
+        self._source_files = source_files
 
     @classmethod
+    @metrics.timed("load_seconds", source="dist")
+    @tracing.traced("from_distribution")
     # better type hint for typing.Unpack[MetadataKwargs] requires at least Python 3.11
-    def from_distribution(cls, distname: str, **kwargs: Any) -> MetaData:
+    def from_distribution(
+        cls, distname: str, version_policy: VersionPolicy = DEFAULT_VERSION_POLICY, **kwargs: Any
+    ) -> MetaData:
         """
         Factory method to extract metadata from installed packages.
+        The PEP 440 version of the distribution is mapped to a Windows version according to version_policy.
         """
+        from importlib.metadata import PackageNotFoundError, distribution  # pylint: disable=import-outside-toplevel
+
         try:
             dist = distribution(distname)
-            meta = dist.metadata
+            meta = _core_metadata(dist.metadata)
         except PackageNotFoundError as err:  # pragma: no cover
             raise exceptions.InputError(f"Distribution {distname} not found") from err
 
+        return cls._from_distribution_object(dist, meta, version_policy, **kwargs)
+
+    @classmethod
+    @metrics.timed("load_seconds", source="dist")
+    @tracing.traced("from_distributions")
+    def from_distributions(
+        cls,
+        pattern: str,
+        regex: bool = False,
+        version_policy: VersionPolicy = DEFAULT_VERSION_POLICY,
+        **kwargs: Any,
+    ) -> dict[str, MetaData]:
+        """
+        Factory method to extract the metadata of all installed distributions whose names match pattern, a glob
+        pattern like ourcorp-* or, if regex is True, a regular expression. Names are compared in their normalized
+        form (PEP 503), case-insensitively. The installed distributions are enumerated only once.
+        Return the metadata keyed by the distribution names, sorted by name.
+        """
+        # pylint: disable=import-outside-toplevel
+        from importlib.metadata import distributions
+
+        from packaging.utils import canonicalize_name
+
+        matches = _name_matcher(pattern, regex)
+        selected: dict[str, MetaData] = {}
+        found = set()
+        for dist in distributions():
+            meta = _core_metadata(dist.metadata)
+            name = meta["Name"]
+            if not name:
+                continue
+            canonical_name = canonicalize_name(name)
+            if canonical_name in found or not matches(canonical_name):
+                continue
+            found.add(canonical_name)  # the first distribution on sys.path wins, like for from_distribution
+            selected[name] = cls._from_distribution_object(dist, meta, version_policy, **kwargs)
+        return dict(sorted(selected.items(), key=lambda item: canonicalize_name(item[0])))
+
+    @classmethod
+    def _from_distribution_object(
+        cls, dist: Distribution, meta: Mapping[str, Any], version_policy: VersionPolicy, **kwargs: Any
+    ) -> MetaData:
+        metadata = cls._from_distribution_fields(meta, version_policy, **kwargs)
+        metadata._lookup_source_files = functools.partial(  # pylint: disable=protected-access
+            cls._get_distribution_files, dist
+        )
+        metadata.source_format = "dist"
+        return metadata
+
+    @classmethod
+    @metrics.timed("load_seconds", source="dist-lock")
+    @tracing.traced("from_lockfile")
+    def from_lockfile(
+        cls, lockfile: str, distname: str, version_policy: VersionPolicy = DEFAULT_VERSION_POLICY, **kwargs: Any
+    ) -> MetaData:
+        """
+        Factory method to extract metadata of a distribution from a snapshot lockfile (see lockfile.snapshot),
+        without needing the distribution to be installed.
+        The PEP 440 version of the distribution is mapped to a Windows version according to version_policy.
+        """
+        from pyinstaller_versionfile import lockfile as lockfile_module  # pylint: disable=import-outside-toplevel
+
+        metadata = cls._from_distribution_fields(lockfile_module.lookup(lockfile, distname), version_policy, **kwargs)
+        metadata.source_files.append(str(lockfile))
+        metadata.source_format = "dist-lock"
+        return metadata
+
+    @classmethod
+    @metrics.timed("load_seconds", source="build")
+    @tracing.traced("from_core_metadata")
+    def from_core_metadata(
+        cls,
+        core_metadata: Union[str, Mapping[str, Any]],
+        version_policy: VersionPolicy = DEFAULT_VERSION_POLICY,
+        **kwargs: Any,
+    ) -> MetaData:
+        """
+        Factory method to extract metadata from the text of a core metadata file (METADATA or PKG-INFO), e.g. as
+        created by a build backend for the project being built, which does not need to be installed, or from a
+        mapping of the core metadata fields (like Name, Version, Summary, Author and License) to their values.
+        The values are the same as from_distribution returns for the installed distribution.
+        """
+        if isinstance(core_metadata, str):
+            from email.parser import HeaderParser  # pylint: disable=import-outside-toplevel
+
+            core_metadata = _core_metadata(HeaderParser().parsestr(core_metadata))
+        metadata = cls._from_distribution_fields(core_metadata, version_policy, **kwargs)
+        metadata.source_format = "build"
+        return metadata
+
+    @classmethod
+    def _from_distribution_fields(
+        cls, meta: Mapping[str, Any], version_policy: VersionPolicy, **kwargs: Any
+    ) -> MetaData:
+        """
+        Map the core metadata fields of a distribution (see lockfile.DISTRIBUTION_FIELDS) to the MetaData parameters.
+        """
         meta_fields = [
             meta.get("Author", None),
             meta.get("Author-email", None),
@@ -109,7 +389,8 @@ class MetaData:
 
         keywords = KwargsDict(kwargs)
 
-        keywords.setdefault("version", meta.get("Version", None))
+        if kwargs.get("version") is None and meta.get("Version"):
+            keywords["version"] = to_windows_version(meta["Version"], version_policy)
         keywords.setdefault("company_name", company)
         keywords.setdefault("file_description", meta.get("Summary", None))
         keywords.setdefault("internal_name", meta.get("Name", None))
@@ -120,67 +401,257 @@ class MetaData:
 
         return cls(**keywords)
 
+    @staticmethod
+    def _get_distribution_files(dist: Distribution) -> list[str]:
+        # The metadata file itself is the only file read by importlib.metadata when accessing dist.metadata.
+        for file in dist.files or []:
+            if file.name in ("METADATA", "PKG-INFO") and file.parent.name.endswith(
+                (".dist-info", ".egg-info")
+            ):
+                return [str(dist.locate_file(file))]
+        return []
+
     @classmethod
-    def from_file(cls, filepath: str, **kwargs: Any) -> MetaData:
+    @metrics.timed("load_seconds", source="yaml")
+    @tracing.traced("from_file")
+    def from_file(
+        cls, filepath: str, overlays: Optional[list[str]] = None, **kwargs: Any
+    ) -> MetaData:
         """
         Factory method to create a MetaData instance from a file.
+        The file may name a base file with the 'Extends' key, which provides all values not given in the file itself.
+        The files given in overlays are applied on top in the given order, e.g. to set per-executable values on top of
+        product-wide metadata.
         """
-        try:
-            with codecs.open(filepath, encoding="utf-8") as infile:
-                data = yaml.load(infile, Loader=Loader)
-        except IsADirectoryError as err:
-            raise exceptions.InputError(
-                f"Specified filepath {filepath} is a directory, not a file"
-            ) from err
-        except FileNotFoundError as err:
-            raise exceptions.InputError(f"File {filepath} does not exist") from err
-        except IOError as err:
-            raise exceptions.InputError("Failed to read input from file") from err
-        except yaml.scanner.ScannerError as err:
-            raise exceptions.InputError(
-                "Failed to read YAML data due to scanner error"
-            ) from err
-        if not isinstance(data, dict):
-            raise exceptions.InputError(
-                f"Input file must contain a mapping, but is: {type(data)}"
+        if overlays:
+            # the file is shared by all executables, their overlays only provide the values specific to them
+            data: dict[str, Any] = {}
+            source_files: list[str] = []
+            base_metadata: Optional[MetaData] = cls._resolved_base(os.path.abspath(filepath))
+        else:
+            data, source_files, base = cls._read_manifest(filepath)
+            base_metadata = (
+                cls._resolved_base(os.path.abspath(os.path.join(os.path.dirname(filepath), base)), filepath)
+                if base
+                else None
             )
+        if base_metadata:
+            source_files.extend(base_metadata.source_files)
+        for overlay in overlays or []:
+            overlay_data, overlay_files = cls._read_file(overlay)
+            data.update(overlay_data)
+            source_files.extend(overlay_files)
+        data.update({k: v for k, v in kwargs.items() if v is not None})
+
+        # version files named in metadata files are already read relative to the file naming them
+        version = kwargs.get("version")
+        if isinstance(version, str) and (Path(filepath).parent / version).is_file():
+            path = Path(filepath).parent / version
+            data["version"] = path.read_text().strip()
+            source_files.append(str(path))
+        if "translations" in data or base_metadata is None:
+            data["translations"] = cls._get_translations(data.get("translations"))
 
+        metadata = base_metadata.derive(data) if base_metadata else cls(**data)
+        metadata.source_files.extend(source_files)
+        metadata.source_format = "yaml"
+        return metadata
+
+    @classmethod
+    @metrics.timed("load_seconds", source="env")
+    @tracing.traced("from_env")
+    def from_env(
+        cls, prefix: str = DEFAULT_ENV_PREFIX, environ: Optional[Mapping[str, str]] = None, **kwargs: Any
+    ) -> MetaData:
+        """
+        Factory method to create a MetaData instance from environment variables, e.g. set by a CI job.
+        Each parameter is read from the variable named by the prefix and the upper case parameter name,
+        e.g. PYIVF_VERSION or PYIVF_COMPANY_NAME. Translations are given as comma separated pairs of language and
+        charset, e.g. PYIVF_TRANSLATIONS=1033:1200,1031:1252 (hexadecimal values need the 0x prefix).
+        Unset or empty variables are treated as not given.
+        """
+        environ = os.environ if environ is None else environ
+        data: dict[str, Any] = {}
+        for key in cls.key_conversion.values():
+            if key in cls.mapping_keys:
+                continue
+            value = environ.get(prefix + key.upper())
+            if value:
+                data[key] = value
+        data.update({k: v for k, v in kwargs.items() if v is not None})
+        if isinstance(data.get("translations"), str):
+            data["translations"] = cls._parse_translations(data["translations"])
+
+        metadata = cls(**data)
+        metadata.source_format = "env"
+        return metadata
+
+    @staticmethod
+    def _parse_translations(value: str) -> list[int]:
+        translations = []
+        for pair in value.split(","):
+            try:
+                lang, charset = pair.split(":")
+                translations += [int(lang, 0), int(charset, 0)]
+            except ValueError as err:
+                raise exceptions.InputError(
+                    f"Translation {pair.strip()!r} is not valid, expected LANG:CHARSET, e.g. 1033:1200"
+                ) from err
+        return translations
+
+    @classmethod
+    def _compile_manifest(cls, filepath: str) -> dict[str, Any]:
+        """
+        Parse a metadata file and return the values with converted keys ("values") and the base file it extends, if
+        any ("extends").
+        """
+        raw_data = _load_yaml(filepath)
         data = {
-            cls.key_conversion[k]: v for k, v in data.items() if k in cls.key_conversion
+            cls.key_conversion[k]: v for k, v in raw_data.items() if k in cls.key_conversion
         }
-        data.update({k: v for k, v in kwargs.items() if v is not None})
+        return {"values": data, "extends": raw_data.get("Extends")}
 
-        version = data.get("version", "0.0.0.0")
-        path = Path(filepath).parent / version
-        if path.is_file():
-            version = path.read_text().strip()
-            data["version"] = version
+    @classmethod
+    def _read_manifest(cls, filepath: str) -> tuple[dict[str, Any], list[str], Optional[str]]:
+        """
+        Read a single metadata file, without the file it extends.
+        Return the values with converted keys, the list of files that were read and the base file it extends, if any.
+        """
+        manifest = manifest_cache.load(filepath, cls._compile_manifest)
+        data, base = manifest["values"], manifest["extends"]
+        source_files = [str(filepath)]
+        version = data.get("version")
+        if isinstance(version, str) and (Path(filepath).parent / version).is_file():
+            path = Path(filepath).parent / version
+            data["version"] = path.read_text().strip()
+            source_files.append(str(path))
+        return data, source_files, base
+
+    @classmethod
+    def _read_file(
+        cls, filepath: str, parents: tuple[Path, ...] = ()
+    ) -> tuple[dict[str, Any], list[str]]:
+        """
+        Read a metadata file including the files it extends.
+        Return the values with converted keys and the list of files that were read.
+        """
+        data, source_files, base = cls._read_manifest(filepath)
+        if base:
+            base_path = Path(filepath).parent / base
+            if base_path.resolve() in parents:
+                raise exceptions.InputError(f"Circular 'Extends' reference to {base_path}")
+            base_data, base_files = cls._read_file(
+                str(base_path), parents + (Path(filepath).resolve(),)
+            )
+            base_data.update(data)
+            data = base_data
+            source_files.extend(base_files)
+        return data, source_files
+
+    @classmethod
+    def _resolved_base(cls, base_path: str, extended_by: Optional[str] = None) -> MetaData:
+        """
+        Return the metadata of a base file, given as absolute path, as validated MetaData instance.
+        A base file shared by many metadata files is only read, resolved and validated once, as long as none of the
+        files it consists of changes.
+        """
+        cached = _resolved_bases.get(base_path)
+        if cached is not None and _unchanged(cached[0]):
+            metrics.inc("base_cache_requests_total", result="hit")
+            return cached[1]
+        metrics.inc("base_cache_requests_total", result="miss")
+        data, source_files = cls._read_file(base_path, (Path(extended_by).resolve(),) if extended_by else ())
         data["translations"] = cls._get_translations(data.get("translations"))
+        metadata = cls(**data)
+        metadata.source_files = source_files
+        try:
+            metadata.validate()
+        except exceptions.ValidationError:
+            pass  # only valid together with the values of the files extending it, which are all validated then
+        try:
+            _resolved_bases[base_path] = (_stamps(source_files), metadata)
+        except OSError:  # pragma: no cover  # removed while reading it
+            pass
+        return metadata
 
-        return cls(**data)
+    def derive(self, values: Mapping[str, Any]) -> MetaData:
+        """
+        Return a new instance with the given parameter values on top of the values of this instance.
+        Values taken over from this instance, which were already validated, are not validated again.
+        """
+        parameters = {key: getattr(self, key) for key in self.key_conversion.values()}
+        parameters.update(values)
+        metadata = type(self)(**parameters)
+        metadata._validated = {  # pylint: disable=protected-access
+            key: getattr(metadata, key) for key in self._validated if key not in values
+        }
+        return metadata
 
     @classmethod
     def _get_translations(cls, data: Optional[list[dict[str, int]]]) -> list[int]:
         if not data:
-            return cls.default_translations
+            return list(cls.default_translations)
         # The version file requires a flat list, where the first two values form the first
         # pair of language and charset, the third and fourth form the second pair, and so on.
         # For better readability the metadata file uses a list of dictionaries here, so we have
         # to flatten it first
         return list(itertools.chain(*[(d["langID"], d["charsetID"]) for d in data]))
 
-    def set_version(self, version_string: str) -> None:
+    def set_version(
+        self, version_string: str, build_numbers: Optional[BuildNumberCounter] = None
+    ) -> None:
         """
         Explicitly set the version. Overwrites the existing version if already set.
+        If build_numbers is given and the version has less than four places, the fourth place is set to the
+        next build number.
         """
         self.__validate_version(version_string)
         self.version = version_string
+        if build_numbers is not None:
+            self.__apply_build_number(build_numbers)
 
     def validate(self) -> None:
         """
         Check if the supplied parameters are correct and understandable by PyInstaller.
+        Values that already passed validation and were not replaced since, e.g. the values taken over from a base
+        file, are not checked again.
         """
-        self.__validate_version(self.version)
+        if not self.__is_validated("version"):
+            self.__validate_version(self.version)
+            self._validated["version"] = self.version
+        if not self.__is_validated("extra_strings"):
+            self.__validate_strings(self.extra_strings)
+            self._validated["extra_strings"] = self.extra_strings
+        if self.__is_validated("localized_strings") and self.__is_validated("translations"):
+            return
+        table_ids = set(self.string_table_ids())
+        for table_id, strings in self.localized_strings.items():
+            if table_id not in table_ids:
+                raise exceptions.ValidationError(
+                    f"Localized strings given for {table_id}, which is not one of the translations: "
+                    f"{', '.join(sorted(table_ids))}"
+                )
+            if not self.__is_validated("localized_strings"):
+                self.__validate_strings(strings)
+        self._validated.update(translations=self.translations, localized_strings=self.localized_strings)
+
+    def __is_validated(self, key: str) -> bool:
+        return key in self._validated and self._validated[key] is getattr(self, key)
+
+    @staticmethod
+    def __validate_strings(strings: Any) -> None:
+        if not isinstance(strings, dict) or not all(
+            isinstance(key, str) and isinstance(value, str) for key, value in strings.items()
+        ):
+            raise exceptions.ValidationError(
+                f"Extra and localized strings must map names to string values, got: {strings!r}"
+            )
+
+    def string_table_ids(self) -> list[str]:
+        """
+        Return the ids of the StringTables, one for each pair of language and charset in translations.
+        """
+        return string_table_ids(self.translations)
 
     @staticmethod
     def __validate_version(version: str) -> None:
@@ -190,22 +661,30 @@ class MetaData:
                 f"Provided version {version} is not valid. "
                 "Valid versions must contain four places with only digits."
             )
+        check_places([int(place) for place in version.split(".")], version)
+
+    def __apply_build_number(self, build_numbers: BuildNumberCounter) -> None:
+        places = self.version.split(".")
+        if len(places) < 4:
+            self.version = ".".join(places + ["0"] * (3 - len(places)) + [str(build_numbers.next())])
 
-    def sanitize(self) -> None:
+    def sanitize(self, build_numbers: Optional[BuildNumberCounter] = None) -> None:
         """
         Convert valid but insufficient input (e.g. too short version number) and perform some aesthetic work like
         stripping trailing whitespace.
+        If build_numbers is given, a version with less than four places gets the next build number as fourth place.
         """
+        if build_numbers is not None:
+            self.__apply_build_number(build_numbers)
+        # All sanitized values are computed from one snapshot and assigned at once, so that several threads
+        # sanitizing the same instance can only ever store fully sanitized values.
         required_length = 4
-        version_length = len(self.version.split("."))
-        if version_length < required_length:
-            missing_places = required_length - version_length
-            self.version += ".0" * missing_places
-        for key, value in self.__dict__.items():
-            if isinstance(value, str):
-                setattr(self, key, value.strip())
+        values = {key: value.strip() for key, value in list(vars(self).items()) if isinstance(value, str)}
+        places = values["version"].split(".")
+        values["version"] = ".".join(places + ["0"] * (required_length - len(places)))
+        vars(self).update(values)
 
-    def to_dict(self) -> dict[str, Union[str, list[int]]]:
+    def to_dict(self) -> dict[str, Union[str, list[int], dict[str, str], dict[str, dict[str, str]]]]:
         """
         Return all values necessary for rendering the template as dictionary.
         """
@@ -218,4 +697,6 @@ class MetaData:
             "OriginalFilename": self.original_filename,
             "ProductName": self.product_name,
             "Translation": self.translations,
+            "ExtraStrings": self.extra_strings,
+            "LocalizedStrings": self.localized_strings,
         }
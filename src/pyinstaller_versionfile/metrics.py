@@ -0,0 +1,296 @@
+"""
+Lightweight operational metrics for long-running processes generating many version files.
+
+Collection is disabled by default. While disabled, all recording functions return immediately,
+so the functional API and the command line interface do not pay for metrics nobody reads.
+"""
+
+import bisect
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+PREFIX = "pyivf_"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+F = TypeVar("F", bound=Callable[..., Any])
+Labels = tuple[tuple[str, str], ...]
+
+
+class Counter:  # pylint: disable=too-few-public-methods
+    """
+    Monotonically increasing value per label set.
+    """
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Histogram:  # pylint: disable=too-few-public-methods
+    """
+    Distribution of observed values in fixed buckets per label set.
+    """
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.counts: dict[Labels, list[int]] = {}
+        self.sums: dict[Labels, float] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        counts = self.counts.setdefault(labels, [0] * (len(self.buckets) + 1))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[labels] = self.sums.get(labels, 0.0) + value
+
+
+class Registry:
+    """
+    Holds all metrics of the process and exports them on demand.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.counters: dict[str, Counter] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self.caches: dict[str, Callable[[], Any]] = {}
+        self._cache_offsets: dict[str, tuple[int, int]] = {}
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self.counters.setdefault(name, Counter(name, description))
+
+    def histogram(self, name: str, description: str) -> Histogram:
+        return self.histograms.setdefault(name, Histogram(name, description))
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        with self._lock:
+            self.counters[name].inc(_labels(labels), amount)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self.histograms[name].observe(_labels(labels), value)
+
+    def reset(self) -> None:
+        """
+        Set all metrics back to zero. The registered caches keep their content, only their statistics start over.
+        """
+        with self._lock:
+            for counter in self.counters.values():
+                counter.values.clear()
+            for histogram in self.histograms.values():
+                histogram.counts.clear()
+                histogram.sums.clear()
+            for cache_name, cache_info in self.caches.items():
+                info = cache_info()
+                self._cache_offsets[cache_name] = (info.hits, info.misses)
+
+    def _cache_counters(self) -> list[Counter]:
+        hits = Counter("cache_hits_total", "Number of cache lookups answered from the cache.")
+        misses = Counter("cache_misses_total", "Number of cache lookups that required new work.")
+        for cache_name, cache_info in self.caches.items():
+            info = cache_info()
+            hits_offset, misses_offset = self._cache_offsets.get(cache_name, (0, 0))
+            hits.inc((("cache", cache_name),), _since(info.hits, hits_offset))
+            misses.inc((("cache", cache_name),), _since(info.misses, misses_offset))
+        return [hits, misses]
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Return all metrics as a JSON serializable dictionary.
+        """
+        with self._lock:
+            result: dict[str, Any] = {}
+            for counter in [*self.counters.values(), *self._cache_counters()]:
+                result[counter.name] = [
+                    {"labels": dict(labels), "value": value} for labels, value in counter.values.items()
+                ]
+            for histogram in self.histograms.values():
+                result[histogram.name] = [
+                    {
+                        "labels": dict(labels),
+                        "buckets": dict(zip([*map(str, histogram.buckets), "+Inf"], counts)),
+                        "sum": histogram.sums[labels],
+                        "count": sum(counts),
+                    }
+                    for labels, counts in histogram.counts.items()
+                ]
+            return result
+
+    def to_prometheus(self) -> str:
+        """
+        Return all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for counter in [*self.counters.values(), *self._cache_counters()]:
+                name = PREFIX + counter.name
+                lines += [f"# HELP {name} {counter.description}", f"# TYPE {name} counter"]
+                lines += [f"{name}{_format(labels)} {value:g}" for labels, value in counter.values.items()]
+            for histogram in self.histograms.values():
+                name = PREFIX + histogram.name
+                lines += [f"# HELP {name} {histogram.description}", f"# TYPE {name} histogram"]
+                for labels, counts in histogram.counts.items():
+                    cumulative = 0
+                    for bound, count in zip([*map(str, histogram.buckets), "+Inf"], counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format(labels)} {histogram.sums[labels]:g}")
+                    lines.append(f"{name}_count{_format(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, filepath: str) -> None:
+        """
+        Write all metrics to filepath, as JSON if the file name ends with '.json' and in Prometheus text format
+        otherwise. The file is replaced atomically, as required by the textfile collector of the node exporter.
+        """
+        if filepath.endswith(".json"):
+            content = json.dumps(self.to_dict(), indent=2)
+        else:
+            content = self.to_prometheus()
+        temp_file = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as file_handle:
+            file_handle.write(content)
+        os.replace(temp_file, filepath)
+
+
+def _since(value: int, offset: int) -> int:
+    # the statistics of a cache start over as well when the cache is cleared after the last reset
+    return value - offset if value >= offset else value
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+REGISTRY = Registry()
+REGISTRY.counter("files_generated_total", "Number of version files generated.")
+REGISTRY.counter("files_skipped_total", "Number of version files skipped because they were up to date.")
+REGISTRY.counter("files_failed_total", "Number of version files that could not be generated.")
+REGISTRY.counter("bytes_written_total", "Number of bytes written to version files.")
+REGISTRY.counter("remote_cache_requests_total", "Number of lookups in the remote cache, by result (hit or miss).")
+REGISTRY.counter("remote_cache_uploads_total", "Number of generated files uploaded to the remote cache.")
+REGISTRY.counter("remote_cache_errors_total", "Number of failed requests to the remote cache, by operation.")
+REGISTRY.counter(
+    "manifest_cache_requests_total", "Number of metadata files looked up in the compiled manifest cache, by result."
+)
+REGISTRY.counter(
+    "base_cache_requests_total", "Number of base files looked up in the cache of resolved base files, by result."
+)
+REGISTRY.histogram("generation_seconds", "Time needed to load, validate, render and save a version file.")
+REGISTRY.histogram("load_seconds", "Time needed to load the metadata.")
+REGISTRY.histogram("save_seconds", "Time needed to write a version file to disk.")
+
+
+def enable() -> None:
+    REGISTRY.enabled = True
+
+
+def disable() -> None:
+    REGISTRY.enabled = False
+
+
+def is_enabled() -> bool:
+    return REGISTRY.enabled
+
+
+def register_cache(name: str, cached_function: Any) -> None:
+    """
+    Report hits and misses of a functools.lru_cache decorated function.
+    """
+    REGISTRY.caches[name] = cached_function.cache_info
+
+
+def inc(name: str, amount: float = 1, **labels: str) -> None:
+    if REGISTRY.enabled:
+        REGISTRY.inc(name, amount, **labels)
+
+
+_tracking = threading.local()
+
+
+@contextlib.contextmanager
+def _track_generation(source: str) -> Iterator[None]:
+    if getattr(_tracking, "source", None) is not None:
+        # nested in the tracking of the whole generation, which now knows the source format of the loaded metadata
+        _tracking.source = source
+        yield
+        return
+    _tracking.source = source
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        REGISTRY.inc("files_failed_total", source=_tracking.source)
+        raise
+    else:
+        REGISTRY.observe("generation_seconds", time.perf_counter() - start, source=_tracking.source)
+        REGISTRY.inc("files_generated_total", source=_tracking.source)
+    finally:
+        _tracking.source = None
+
+
+def track_generation(source: Optional[str]) -> contextlib.AbstractContextManager[None]:
+    """
+    Count the generation of a version file from the given source format as generated or failed and record its latency.
+    Wrap the whole generation, starting with loading the metadata, so that invalid input is counted as failed as well.
+    Nested calls are counted once, by the outermost one, and only update the source format.
+    """
+    if not REGISTRY.enabled:
+        return contextlib.nullcontext()
+    return _track_generation(source or "none")
+
+
+@contextlib.contextmanager
+def _track_failures(source: str) -> Iterator[None]:
+    try:
+        yield
+    except Exception:
+        REGISTRY.inc("files_failed_total", source=source)
+        raise
+
+
+def track_failures(source: str) -> contextlib.AbstractContextManager[None]:
+    """
+    Count a version file as failed if the wrapped code raises, e.g. when loading metadata shared by several files.
+    """
+    if not REGISTRY.enabled:
+        return contextlib.nullcontext()
+    return _track_failures(source)
+
+
+def timed(histogram: str, **labels: str) -> Callable[[F], F]:
+    """
+    Decorator recording the duration of each call in the given histogram.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not REGISTRY.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                REGISTRY.observe(histogram, time.perf_counter() - start, **labels)
+
+        return wrapper  # type: ignore
+
+    return decorator
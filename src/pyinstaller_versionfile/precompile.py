@@ -0,0 +1,69 @@
+"""
+Ahead-of-time compilation of the bundled templates into Python modules.
+
+Run 'python -m pyinstaller_versionfile.precompile' after changing a template. The modules are shipped with the
+package and compiled to bytecode on installation, so Writer can use them without running the Jinja compiler.
+"""
+
+import argparse
+import hashlib
+import os
+from argparse import Namespace
+from typing import Optional, Sequence
+
+import jinja2
+
+from pyinstaller_versionfile.writer import ENVIRONMENT, OUTPUT_FORMATS, TEMPLATE_DIR, compiled_module_name
+
+COMPILED_TEMPLATES_DIR = os.path.join(TEMPLATE_DIR, "compiled_templates")
+
+
+def compile_template(template_file: str) -> str:
+    """
+    Return the source code of the module the template is compiled into.
+    """
+    with open(template_file, "rb") as infile:
+        source = infile.read()
+    name = os.path.basename(template_file)
+    code = ENVIRONMENT.compile(source.decode("utf-8"), name=name, raw=True, defer_init=True)
+    return (
+        f"# Generated from {name} by 'python -m pyinstaller_versionfile.precompile', do not edit.\n"
+        "# pylint: skip-file\n"
+        "# mypy: ignore-errors\n"
+        f"SOURCE_SHA256 = {hashlib.sha256(source).hexdigest()!r}\n"
+        f"JINJA_VERSION = {jinja2.__version__!r}\n"
+        f"{code}\n"
+    )
+
+
+def precompile(directory: str = COMPILED_TEMPLATES_DIR) -> list[str]:
+    """
+    Compile all bundled templates into modules in directory. Return the paths of the modules.
+    """
+    modules = []
+    for template_file in OUTPUT_FORMATS.values():
+        module = os.path.join(directory, compiled_module_name(template_file) + ".py")
+        with open(module, "w", encoding="utf-8", newline="\n") as file_handle:
+            file_handle.write(compile_template(template_file))
+        modules.append(module)
+    return modules
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    parsed = parse_args(args)
+    for module in precompile(parsed.directory):
+        print(f"Compiled {module}")
+
+
+def parse_args(args: Optional[Sequence[str]]) -> Namespace:
+    parser = argparse.ArgumentParser(description="Compile the bundled templates into Python modules.")
+    parser.add_argument(
+        "--directory",
+        default=COMPILED_TEMPLATES_DIR,
+        help="Directory to write the modules to. Defaults to the compiled_templates package.",
+    )
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
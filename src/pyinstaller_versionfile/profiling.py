@@ -0,0 +1,71 @@
+"""
+Deep profiling of single targets, to find out why creating a version file is slow or needs much memory.
+
+For each profiled target, a cProfile profile (<name>.prof, e.g. for snakeviz or pstats) and a report of the
+largest memory allocations recorded by tracemalloc (<name>.alloc.txt) are saved. Nothing is traced outside of
+the profiled blocks.
+"""
+
+import contextlib
+import cProfile
+import os
+import re
+import tracemalloc
+from typing import Iterator
+
+DEFAULT_TOP = 25
+
+
+def profile_name(output_path: str) -> str:
+    """
+    Derive the base name of the profiling files from the path of the created file, e.g. build_app_version_file.txt
+    for build/app/version_file.txt. Paths outside the working directory are used as absolute paths.
+    """
+    path = os.path.abspath(output_path)
+    relative_path = os.path.relpath(path)
+    if not relative_path.startswith(os.pardir):
+        path = relative_path
+    return re.sub(r"[\\/:]+", "_", path).strip("_")
+
+
+@contextlib.contextmanager
+def profile(directory: str, output_path: str, top: int = DEFAULT_TOP) -> Iterator[None]:
+    """
+    Profile the code run in the with block, which creates output_path, and save the results in directory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+        basename = os.path.join(directory, profile_name(output_path))
+        profiler.dump_stats(basename + ".prof")
+        write_allocation_report(basename + ".alloc.txt", snapshot, peak, top)
+
+
+def write_allocation_report(filepath: str, snapshot: tracemalloc.Snapshot, peak: int, top: int = DEFAULT_TOP) -> None:
+    """
+    Write the top allocations of a tracemalloc snapshot, grouped by source line, as plain text.
+    """
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    statistics = snapshot.statistics("lineno")
+    lines = [
+        f"Peak traced memory: {peak / 1024:.1f} KiB",
+        f"Allocated at the end: {sum(stat.size for stat in statistics) / 1024:.1f} KiB",
+        f"Top {min(top, len(statistics))} allocations by line:",
+    ]
+    for index, stat in enumerate(statistics[:top], start=1):
+        frame = stat.traceback[0]
+        lines.append(f"{index:>3}. {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+    with open(filepath, "w", encoding="utf-8") as file_handle:
+        file_handle.write("\n".join(lines) + "\n")
@@ -0,0 +1,244 @@
+"""
+Cache of generated files shared by many build agents, on a server speaking a minimal HTTP cache protocol.
+
+Each generated file is stored under the fingerprint of all its inputs (see dependencies.fingerprint): the effective
+metadata, the template and the version of pyinstaller-versionfile. GET <url>/<key> returns the content or 404,
+PUT <url>/<key> stores it, like e.g. the Gradle HTTP build cache or a WebDAV enabled web server expect.
+
+The remote cache is only an optimization: a server that cannot be reached, answers with an error or does not answer
+within the timeout is treated as a cache miss and the file is generated locally. After a connection problem, the
+server is not contacted again for the rest of the run, so an unavailable server costs at most one timeout.
+
+Downloaded files are used as version files, which PyInstaller evaluates as Python code. The cache and everyone who
+can write to it must therefore be trusted. With a shared secret, every entry is stored with an HMAC of its key and
+content, and entries that were not uploaded by a client knowing the secret are ignored. Without a secret, only https
+URLs are accepted, so that at least the connection cannot be tampered with.
+"""
+
+import hashlib
+import hmac
+import http.client
+import os
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Iterable, Mapping, Optional
+
+from pyinstaller_versionfile import dependencies, exceptions, metrics
+from pyinstaller_versionfile.metadata import MetaData
+
+WRITE_POLICIES = ("sync", "async", "never")
+SECRET_ENV = "PYIVF_REMOTE_CACHE_SECRET"
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_MAX_WORKERS = 8
+
+
+class RemoteCache:  # pylint: disable=too-many-instance-attributes
+    """
+    Client for a remote cache of generated files.
+
+    The write policy defines how files generated locally after a cache miss are uploaded:
+    "sync" uploads them before continuing, "async" uploads them in the background (close() waits for all uploads)
+    and "never" only reads from the cache, e.g. for builds that must not populate a shared cache.
+    If a secret is given, entries are authenticated with it (see module documentation), which is required for http URLs.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        write_policy: str = "sync",
+        timeout: float = DEFAULT_TIMEOUT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        secret: Optional[str] = None,
+    ) -> None:
+        # pylint: disable=too-many-arguments, too-many-positional-arguments
+        if write_policy not in WRITE_POLICIES:
+            raise exceptions.UsageError(
+                f"Invalid write policy {write_policy}, must be one of: {', '.join(WRITE_POLICIES)}"
+            )
+        if not url.startswith(("http://", "https://")):
+            raise exceptions.UsageError(f"The remote cache URL must start with http:// or https://, got {url}")
+        if url.startswith("http://") and not secret:
+            raise exceptions.UsageError(
+                f"A remote cache over plain http requires a secret to authenticate its entries (set {SECRET_ENV}), "
+                "or use https"
+            )
+        self.secret = secret.encode("utf-8") if secret else None
+        self.url = url.rstrip("/")
+        self.write_policy = write_policy
+        self.timeout = timeout
+        self.available = True
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.uploads = 0
+        self._fetched: dict[str, Optional[bytes]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pyivf-remote-cache")
+        self._pending_uploads: list[Future[None]] = []
+
+    def __enter__(self) -> "RemoteCache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    @staticmethod
+    def key(metadata: MetaData, output_format: str) -> str:
+        """
+        Return the cache key of the file created from the validated and sanitized metadata in the given format.
+        """
+        return dependencies.fingerprint(metadata, [output_format])
+
+    def prefetch(self, keys: Iterable[str]) -> None:
+        """
+        Download the entries for all keys concurrently. The results are kept until they are used by restore().
+        """
+        with self._lock:
+            missing = list(dict.fromkeys(key for key in keys if key not in self._fetched))
+        for key, content in zip(missing, self._executor.map(self._get, missing)):
+            with self._lock:
+                self._fetched[key] = content
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return the cached content for key, or None if it is not in the cache or the cache is not available.
+        """
+        self.prefetch([key])
+        with self._lock:
+            fetched = key in self._fetched
+            content = self._fetched.pop(key, None)
+        if not fetched:
+            # another thread restoring the same file used the prefetched entry first
+            content = self._get(key)
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.inc("remote_cache_requests_total", result="miss" if content is None else "hit")
+        return content
+
+    def restore(self, metadata: MetaData, outputs: Mapping[str, str]) -> dict[str, str]:
+        """
+        Write all outputs that are in the cache, reading them concurrently.
+        Return the outputs that were not found and have to be generated.
+        """
+        keys = {output_format: self.key(metadata, output_format) for output_format in outputs}
+        self.prefetch(keys.values())
+        remaining = {}
+        for output_format, output_file in outputs.items():
+            content = self.get(keys[output_format])
+            if content is None:
+                remaining[output_format] = output_file
+            else:
+                _write_atomic(output_file, content)
+        return remaining
+
+    def store(self, metadata: MetaData, output_format: str, output_file: str) -> None:
+        """
+        Upload the generated output_file according to the write policy.
+        """
+        if self.write_policy == "never" or not self.available:
+            return
+        with open(output_file, "rb") as infile:
+            content = infile.read()
+        key = self.key(metadata, output_format)
+        if self.write_policy == "async":
+            with self._lock:
+                self._pending_uploads.append(self._executor.submit(self._put, key, content))
+        else:
+            self._put(key, content)
+
+    def close(self) -> None:
+        """
+        Wait for all uploads in the background and release the worker threads.
+        """
+        with self._lock:
+            pending, self._pending_uploads = self._pending_uploads, []
+        for upload in pending:
+            upload.result()
+        self._executor.shutdown()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        if not self.available:
+            return None
+        try:
+            with urllib.request.urlopen(f"{self.url}/{key}", timeout=self.timeout) as response:
+                return self._unseal(key, response.read())
+        except urllib.error.HTTPError as err:
+            if err.code != 404:
+                self._record_error("get", disable=False)
+        except (urllib.error.URLError, http.client.HTTPException, OSError):
+            self._record_error("get", disable=True)
+        return None
+
+    def _seal(self, key: str, content: bytes) -> bytes:
+        if self.secret is None:
+            return content
+        return _signature(self.secret, key, content) + b"\n" + content
+
+    def _unseal(self, key: str, payload: bytes) -> Optional[bytes]:
+        if self.secret is None:
+            return payload
+        signature, _, content = payload.partition(b"\n")
+        if not hmac.compare_digest(signature, _signature(self.secret, key, content)):
+            self._record_error("verify", disable=False)
+            return None
+        return content
+
+    def _put(self, key: str, content: bytes) -> None:
+        if not self.available:
+            return
+        request = urllib.request.Request(
+            f"{self.url}/{key}",
+            data=self._seal(key, content),
+            method="PUT",
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except urllib.error.HTTPError:
+            self._record_error("put", disable=False)
+            return
+        except (urllib.error.URLError, http.client.HTTPException, OSError):
+            self._record_error("put", disable=True)
+            return
+        with self._lock:
+            self.uploads += 1
+        metrics.inc("remote_cache_uploads_total")
+
+    def _record_error(self, operation: str, disable: bool) -> None:
+        with self._lock:
+            self.errors += 1
+            if disable:
+                self.available = False
+        metrics.inc("remote_cache_errors_total", operation=operation)
+
+
+def _signature(secret: bytes, key: str, content: bytes) -> bytes:
+    # the key is signed as well, so that a valid entry cannot be served for another key
+    return hmac.new(secret, key.encode("ascii") + b"\n" + content, hashlib.sha256).hexdigest().encode("ascii")
+
+
+def _write_atomic(filepath: str, content: bytes) -> None:
+    if os.path.isdir(filepath):
+        raise exceptions.UsageError(
+            "You must specify a file to save the output. Received a directory name instead."
+        )
+    temp_file = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_file, "wb") as file_handle:
+            file_handle.write(content)
+        os.replace(temp_file, filepath)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
@@ -0,0 +1,86 @@
+"""
+setuptools command creating version files from the metadata of the project being built (build_versionfile).
+
+The metadata is taken from the setuptools distribution in memory, so no separate process is started and the project
+does not need to be installed. To create the version file as part of every build, add the command to the
+sub commands of build in setup.py (see README).
+"""
+
+import io
+import os
+from typing import Optional
+
+from setuptools import Command  # type: ignore[import-untyped]  # pylint: disable=import-error
+
+import pyinstaller_versionfile
+from pyinstaller_versionfile import exceptions, metrics
+from pyinstaller_versionfile.metadata import MetaData
+from pyinstaller_versionfile.versions import VersionPolicy
+from pyinstaller_versionfile.writer import OUTPUT_FORMATS
+
+DEFAULT_OUTFILE = "version_file.txt"
+
+
+def parse_entries(value: Optional[str]) -> dict[str, str]:
+    """
+    Parse a list of KEY=VALUE entries separated by commas or whitespace, as used in setup.cfg and on the command line.
+    """
+    entries = (value or "").replace(",", " ").split()
+    return dict(entry.partition("=")[::2] for entry in entries)
+
+
+class BuildVersionFile(Command):
+    """
+    Create a version file from the metadata of the distribution being built.
+    """
+
+    description = "create version files from the project metadata"
+    user_options = [
+        ("outfile=", "o", f"PyInstaller version file, relative to the build directory [default: {DEFAULT_OUTFILE}]"),
+        ("output-formats=", None, "additional output formats as FORMAT=PATH, separated by commas"),
+        ("version-policy=", None, "mapping of PEP 440 version segments as SEGMENT=POLICY, separated by commas"),
+    ]
+
+    def initialize_options(self) -> None:
+        # pylint: disable=attribute-defined-outside-init
+        self.outfile: Optional[str] = None
+        self.output_formats: Optional[str] = None
+        self.version_policy: Optional[str] = None
+        self.build_base: Optional[str] = None
+
+    def finalize_options(self) -> None:
+        self.set_undefined_options("build", ("build_base", "build_base"))
+
+    def outputs(self) -> dict[str, str]:
+        """
+        Return the files to create per output format, relative paths are resolved against the build directory.
+        """
+        outputs = {"pyinstaller": self.outfile or DEFAULT_OUTFILE, **parse_entries(self.output_formats)}
+        for output_format in outputs:
+            if output_format not in OUTPUT_FORMATS:
+                raise exceptions.UsageError(
+                    f"Unknown output format {output_format}, must be one of: {', '.join(OUTPUT_FORMATS)}"
+                )
+        return {
+            output_format: os.path.join(self.build_base or "", path) for output_format, path in outputs.items()
+        }
+
+    def metadata(self) -> MetaData:
+        """
+        Return the metadata of the distribution being built, as from_distribution would return it once installed.
+        """
+        core_metadata = io.StringIO()
+        self.distribution.metadata.write_pkg_file(core_metadata)
+        return MetaData.from_core_metadata(
+            core_metadata.getvalue(), VersionPolicy.from_mapping(parse_entries(self.version_policy))
+        )
+
+    def run(self) -> None:
+        outputs = self.outputs()
+        for path in outputs.values():
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with metrics.track_generation("build"):
+            pyinstaller_versionfile.create_output_files(self.metadata(), outputs)
+
+    def get_outputs(self) -> list[str]:
+        return list(self.outputs().values())
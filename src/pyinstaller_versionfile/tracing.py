@@ -0,0 +1,124 @@
+"""
+Timeline of a generation run in the Chrome trace event format, for trace viewers like Perfetto (ui.perfetto.dev)
+or chrome://tracing.
+
+Every traced step is recorded as a complete event with the process and thread that ran it. Steps running inside
+other steps, e.g. loading the template while saving a version file, are shown nested below them, and the version
+files generated by parallel workers are shown side by side, one row per thread.
+Tracing is disabled by default; while it is disabled, spans cost a single attribute lookup.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Tracer:
+    """
+    Records the spans of all threads of the process and exports them on demand.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.events: list[dict[str, Any]] = []
+        self.thread_names: dict[int, str] = {}
+
+    def add(self, name: str, start_ns: int, end_ns: int, args: dict[str, Any]) -> None:
+        thread_id = threading.get_native_id()
+        event = {
+            "name": name,
+            "cat": "pyivf",
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": thread_id,
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+            self.thread_names.setdefault(thread_id, threading.current_thread().name)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.events.clear()
+            self.thread_names.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Return the recorded spans as trace event JSON object, including the names of the threads.
+        """
+        with self._lock:
+            metadata_events = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread_id, "args": {"name": name}}
+                for thread_id, name in self.thread_names.items()
+            ]
+            events = sorted(self.events, key=lambda event: (event["tid"], event["ts"], -event["dur"]))
+        return {"traceEvents": metadata_events + events, "displayTimeUnit": "ms"}
+
+    def export(self, filepath: str) -> None:
+        """
+        Write the trace to filepath, replacing it atomically.
+        """
+        temp_file = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as file_handle:
+            json.dump(self.to_dict(), file_handle)
+        os.replace(temp_file, filepath)
+
+
+TRACER = Tracer()
+
+
+def enable() -> None:
+    TRACER.enabled = True
+
+
+def disable() -> None:
+    TRACER.enabled = False
+
+
+def is_enabled() -> bool:
+    return TRACER.enabled
+
+
+@contextlib.contextmanager
+def _span(name: str, args: dict[str, Any]) -> Iterator[None]:
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        TRACER.add(name, start, time.perf_counter_ns(), args)
+
+
+def span(name: str, **args: Any) -> contextlib.AbstractContextManager[None]:
+    """
+    Record the enclosed code as a span with the given name, args are shown with the span in the trace viewer.
+    """
+    if not TRACER.enabled:
+        return contextlib.nullcontext()
+    return _span(name, args)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """
+    Decorator recording each call as a span with the given name.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with _span(name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
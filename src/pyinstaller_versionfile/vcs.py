@@ -0,0 +1,49 @@
+"""
+Files changed in the local git repository since a revision, to only regenerate the affected version files.
+"""
+
+import os
+import subprocess
+from typing import Iterable
+
+from pyinstaller_versionfile import exceptions
+
+
+def _git(directory: str, *args: str) -> str:
+    try:
+        result = subprocess.run(
+            ["git", "-C", directory, *args], check=True, capture_output=True, text=True, encoding="utf-8"
+        )
+    except FileNotFoundError as err:
+        raise exceptions.InputError("git is not installed") from err
+    except subprocess.CalledProcessError as err:
+        raise exceptions.InputError(err.stderr.strip() or f"git {args[0]} failed") from err
+    return result.stdout
+
+
+def normalize_path(path: str) -> str:
+    """
+    Return the canonical form of path used to compare it with the changed files.
+    """
+    return os.path.normcase(os.path.realpath(path))
+
+
+def changed_files(revision: str, directory: str = ".") -> set[str]:
+    """
+    Return the normalized paths of all files that differ between revision and the working tree of the git repository
+    containing directory: committed, staged and unstaged changes, deleted and renamed files (old and new path) and
+    untracked files that are not ignored.
+    Raise an InputError if git is not available, directory is not in a git repository or the revision is not known,
+    e.g. in a shallow clone.
+    """
+    root = _git(directory, "rev-parse", "--show-toplevel").strip()
+    changed = _git(directory, "diff", "--name-only", "--no-renames", "-z", revision, "--")
+    untracked = _git(directory, "ls-files", "--others", "--exclude-standard", "-z", "--full-name", ":/")
+    return {normalize_path(os.path.join(root, path)) for path in f"{changed}{untracked}".split("\0") if path}
+
+
+def any_changed(paths: Iterable[str], changed: set[str]) -> bool:
+    """
+    Check if any of the paths is one of the changed files.
+    """
+    return any(normalize_path(path) in changed for path in paths)
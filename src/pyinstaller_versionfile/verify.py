@@ -0,0 +1,93 @@
+"""
+Verification of version files with PyInstaller's own parser, without building an executable.
+
+The version file is loaded by PyInstaller's versioninfo module like PyInstaller does with --version-file, serialized
+to the binary VS_VERSIONINFO resource and decoded again (see audit.decode_version_info). Every field is then compared
+with the MetaData the file was created from. This works on any platform, PyInstaller and pefile must be installed.
+"""
+
+import contextlib
+import struct
+import threading
+from types import ModuleType
+from typing import Any, Iterator
+
+from pyinstaller_versionfile import audit, exceptions
+from pyinstaller_versionfile.metadata import MetaData
+
+
+_import_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _win32api_placeholder(compat: ModuleType) -> Iterator[None]:
+    """
+    Provide PyInstaller.compat.win32api while the versioninfo module is imported, and restore PyInstaller.compat then.
+    win32api is only defined on Windows, versioninfo imports it for reading and writing executables but does not need it
+    for parsing.
+    """
+    if hasattr(compat, "win32api"):
+        yield
+        return
+    compat.win32api = None  # type: ignore[attr-defined]
+    try:
+        yield
+    finally:
+        del compat.win32api
+
+
+def _import_versioninfo() -> ModuleType:
+    # pylint: disable=import-outside-toplevel
+    try:
+        from PyInstaller import compat  # type: ignore[import-untyped]
+    except ImportError as err:
+        raise exceptions.UsageError(
+            "Verification requires PyInstaller, install it with: pip install pyinstaller"
+        ) from err
+    try:
+        with _import_lock, _win32api_placeholder(compat):
+            from PyInstaller.utils.win32 import versioninfo  # type: ignore[import-untyped]
+    except ImportError as err:
+        raise exceptions.UsageError(
+            f"Could not import PyInstaller's versioninfo module ({err}), outside of Windows it requires pefile: "
+            "pip install pefile"
+        ) from err
+    return versioninfo
+
+
+def read_version_file(filepath: str) -> MetaData:
+    """
+    Load a version file with PyInstaller and return the metadata of the resulting binary resource.
+    Raise a ValidationError if PyInstaller cannot load the file.
+    """
+    versioninfo = _import_versioninfo()
+    try:
+        info = versioninfo.load_version_info_from_text_file(filepath)
+    except (ValueError, AssertionError) as err:
+        raise exceptions.ValidationError(f"PyInstaller cannot load the version file {filepath}: {err}") from err
+    metadata = audit.decode_version_info(info.toRaw())
+    if struct.calcsize("L") != 4:
+        # PyInstaller packs FixedFileInfo with the native size of unsigned long, which is only 4 bytes on Windows
+        version_ms, version_ls = info.ffi.fileVersionMS, info.ffi.fileVersionLS
+        metadata.version = f"{version_ms >> 16}.{version_ms & 0xFFFF}.{version_ls >> 16}.{version_ls & 0xFFFF}"
+    return metadata
+
+
+def verify_version_file(filepath: str, expected: MetaData) -> dict[str, dict[str, Any]]:
+    """
+    Return all values that differ between the expected metadata and the version file as PyInstaller reads it.
+    The expected metadata must be validated and sanitized, as it is after creating the version file from it.
+    """
+    return audit.compare(expected, read_version_file(filepath))
+
+
+def check_version_file(filepath: str, expected: MetaData) -> None:
+    """
+    Raise a ValidationError if PyInstaller reads different values from the version file than expected.
+    """
+    differences = verify_version_file(filepath, expected)
+    if differences:
+        details = ", ".join(
+            f"{key}: expected {value['expected']!r}, got {value['actual']!r}" for key, value in differences.items()
+        )
+        raise exceptions.ValidationError(f"Verification of {filepath} failed, {details}")
@@ -0,0 +1,130 @@
+"""
+Mapping of PEP 440 versions, as used by distributions, to the four-part versions of Windows version information.
+
+A Windows version consists of up to four numbers between 0 and 65535. The release segment of a PEP 440 version
+(e.g. 2.1.0) is used as is, pre-, post- and development releases and local version labels are handled according to
+a VersionPolicy: they can be dropped, stored in the fourth place (the build number) or rejected.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, Mapping, NamedTuple
+
+from pyinstaller_versionfile import exceptions, metrics
+
+if TYPE_CHECKING:
+    from packaging.version import Version
+
+MAX_VERSION_COMPONENT = 0xFFFF  # the places of the version are stored as 16 bit values in FixedFileInfo
+POLICIES = ("drop", "build", "error")
+
+
+class VersionPolicy(NamedTuple):
+    """
+    How to handle the segments of a PEP 440 version that have no place in a Windows version.
+    pre, post and dev can be "drop" (ignore the segment), "build" (use its number as fourth place) or "error".
+    local can be "drop" or "error", as local version labels are not numeric.
+    """
+
+    pre: str = "drop"
+    post: str = "build"
+    dev: str = "drop"
+    local: str = "drop"
+
+    @classmethod
+    def from_mapping(cls, policies: Mapping[str, str]) -> VersionPolicy:
+        """
+        Create a validated policy from a mapping of segments to policies, e.g. {"post": "error"}.
+        Segments that are not given keep their default policy.
+        """
+        for segment in policies:
+            if segment not in cls._fields:
+                raise exceptions.UsageError(
+                    f"Unknown version segment {segment}, must be one of: {', '.join(cls._fields)}"
+                )
+        version_policy = cls(**policies)
+        version_policy.validate()
+        return version_policy
+
+    def validate(self) -> None:
+        """
+        Raise a UsageError if any of the policies is not known.
+        """
+        for segment, policy in zip(("pre", "post", "dev", "local"), self):
+            allowed = ("drop", "error") if segment == "local" else POLICIES
+            if policy not in allowed:
+                raise exceptions.UsageError(
+                    f"Invalid policy {policy} for {segment}, must be one of: {', '.join(allowed)}"
+                )
+
+
+DEFAULT_VERSION_POLICY = VersionPolicy()
+
+
+@functools.lru_cache(maxsize=1024)
+def parse(version_string: str) -> Version:
+    """
+    Parse a PEP 440 version. The results are cached, as distributions of the same project share their versions.
+    """
+    # pylint: disable=import-outside-toplevel
+    from packaging.version import InvalidVersion, Version
+
+    try:
+        return Version(version_string)
+    except InvalidVersion as err:
+        raise exceptions.ValidationError(f"Version {version_string} is not a valid PEP 440 version") from err
+
+
+metrics.register_cache("version", parse)
+
+
+@functools.lru_cache(maxsize=1024)
+def to_windows_version(version_string: str, policy: VersionPolicy = DEFAULT_VERSION_POLICY) -> str:
+    """
+    Map a PEP 440 version to a Windows version with up to four places, e.g. 1.0.post3 to 1.0.0.3.
+    Raise a ValidationError if the version cannot be mapped with the given policy, or a place exceeds 65535.
+    """
+    policy.validate()
+    version = parse(version_string)
+    segments = {
+        "pre": version.pre[1] if version.pre else None,
+        "post": version.post,
+        "dev": version.dev,
+        "local": version.local,
+    }
+    build_numbers: list[int] = []
+    for segment, value in segments.items():
+        if value is None:
+            continue
+        if getattr(policy, segment) == "error":
+            raise exceptions.ValidationError(f"Version {version_string} is not allowed to have a {segment} segment")
+        if getattr(policy, segment) == "build":
+            build_numbers.append(int(value))  # local is a string, but it is never used as build number
+
+    places = list(version.release)
+    if len(build_numbers) > 1:
+        raise exceptions.ValidationError(
+            f"Version {version_string} has more than one segment that should be used as build number"
+        )
+    if build_numbers:
+        if len(places) > 3:
+            raise exceptions.ValidationError(
+                f"Version {version_string} has no place left for the build number {build_numbers[0]}"
+            )
+        places = places + [0] * (3 - len(places)) + build_numbers
+    check_places(places, version_string)
+    return ".".join(str(place) for place in places)
+
+
+def check_places(places: list[int], version_string: str) -> None:
+    """
+    Raise a ValidationError if the version has more than four places or a place exceeds 65535.
+    """
+    if len(places) > 4:
+        raise exceptions.ValidationError(f"Version {version_string} has more than four places")
+    for place in places:
+        if place > MAX_VERSION_COMPONENT:
+            raise exceptions.ValidationError(
+                f"Version {version_string} cannot be stored, {place} exceeds the maximum of {MAX_VERSION_COMPONENT}"
+            )
@@ -3,22 +3,91 @@ Logic for writing the output file.
 """
 
 import codecs
+import functools
+import hashlib
+import importlib
 import os
+import threading
+from typing import Any, Optional, TextIO
 
-from jinja2 import Template
+import jinja2
+from jinja2 import Environment, Template
 from jinja2.exceptions import UndefinedError
 
+from pyinstaller_versionfile import metrics, tracing
 from pyinstaller_versionfile.exceptions import InternalUsageError, UsageError
-from pyinstaller_versionfile.metadata import MetaData
+from pyinstaller_versionfile.metadata import MetaData, string_tables
 
-TEMPLATE_FILE = os.path.join(
-    os.path.abspath(os.path.dirname(__file__)), "version_file_template.txt"
-)
+TEMPLATE_DIR = os.path.abspath(os.path.dirname(__file__))
+TEMPLATE_FILE = os.path.join(TEMPLATE_DIR, "version_file_template.txt")
+OUTPUT_FORMATS = {
+    "pyinstaller": TEMPLATE_FILE,  # version file for PyInstaller's --version-file
+    "rc": os.path.join(TEMPLATE_DIR, "version_file_template.rc"),  # VERSIONINFO resource script
+    "nuitka": os.path.join(TEMPLATE_DIR, "nuitka_options_template.txt"),  # Nuitka command line options
+    "cx_freeze": os.path.join(TEMPLATE_DIR, "cx_freeze_options_template.json"),  # cx_Freeze setup options
+}
+
+
+def _python_string(text: str) -> str:
+    """
+    Escape text for a single-quoted Python string literal, as PyInstaller evaluates its version files as Python code.
+    """
+    return text.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n").replace("\r", "\\r")
+
+
+ENVIRONMENT = Environment(keep_trailing_newline=True)
+ENVIRONMENT.filters["python_string"] = _python_string
+COMPILED_TEMPLATES_PACKAGE = "pyinstaller_versionfile.compiled_templates"
+
+
+@functools.lru_cache(maxsize=None)
+def load_template(template_file: str) -> Template:
+    """
+    Load and compile a template.
+    The bundled templates are loaded from the modules precompiled by pyinstaller_versionfile.precompile, as long as
+    these match the template. Other templates are compiled at runtime.
+    The template is cached, so rendering many version files only loads it once.
+    """
+    with open(template_file, "rb") as infile:
+        source = infile.read()
+    template = _load_compiled_template(template_file, source)
+    if template is None:
+        template = ENVIRONMENT.from_string(source.decode("utf-8"))
+    return template
+
+
+def compiled_module_name(template_file: str) -> str:
+    """
+    Return the name of the module the template is precompiled into.
+    """
+    return os.path.basename(template_file).replace(".", "_")
+
+
+def _load_compiled_template(template_file: str, source: bytes) -> Optional[Template]:
+    if os.path.dirname(os.path.abspath(template_file)) != TEMPLATE_DIR:
+        return None
+    try:
+        module = importlib.import_module(f"{COMPILED_TEMPLATES_PACKAGE}.{compiled_module_name(template_file)}")
+    except ImportError:  # not precompiled, or compiled by an incompatible version of Jinja
+        return None
+    if module.SOURCE_SHA256 != hashlib.sha256(source).hexdigest() or _minor_version(module.JINJA_VERSION) != (
+        _minor_version(jinja2.__version__)
+    ):
+        return None
+    return Template.from_module_dict(ENVIRONMENT, vars(module), ENVIRONMENT.make_globals(None))
+
+
+def _minor_version(version: str) -> list[str]:
+    return version.split(".")[:2]
+
+
+metrics.register_cache("template", load_template)
 
 
 class Writer:
     """
     Creates the output file.
+    An instance must not be shared between threads, but any number of instances can save files at the same time.
     """
 
     NECESSARY_PARAMETERS = (
@@ -31,34 +100,53 @@ class Writer:
         "ProductName",
     )
 
-    def __init__(self, metadata: MetaData):
+    def __init__(self, metadata: MetaData, output_format: str = "pyinstaller"):
+        if output_format not in OUTPUT_FORMATS:
+            raise UsageError(
+                f"Unknown output format {output_format}, must be one of: {', '.join(OUTPUT_FORMATS)}"
+            )
         self.metadata = metadata
-        self._content = ""
+        self.output_format = output_format
+        self._data: Optional[dict[str, Any]] = None
 
     def render(self) -> None:
         """
-        Render the content of the output file.
+        Prepare rendering the content of the output file.
+        The content itself is only created while it is written by save() or write(), piece by piece.
         """
         data = self.metadata.to_dict()
         if any(param not in data for param in self.NECESSARY_PARAMETERS):
             raise InternalUsageError(
                 "Not all necessary parameters provided by MetaData.to_dict()"
             )
+        self._data = data
 
-        with codecs.open(TEMPLATE_FILE, encoding="utf-8") as infile:
-            template: Template = Template(infile.read(), keep_trailing_newline=True)
+    def write(self, file_handle: TextIO) -> None:
+        """
+        Render the content of the output file into an open text file.
+        """
+        if self._data is None:
+            raise InternalUsageError(
+                "Called Writer.write() before calling Writer.render()"
+            )
+        with tracing.span("template_load", output_format=self.output_format):
+            template = load_template(OUTPUT_FORMATS[self.output_format])
         try:
-            self._content = template.render(**data)
+            with tracing.span("render", output_format=self.output_format):
+                for chunk in template.generate(**self._data, StringTables=string_tables(self._data)):
+                    file_handle.write(chunk)
         except UndefinedError as err:
             raise InternalUsageError(
                 "Could not render template because parameters are missing (jinja2 UndefinedError)."
             ) from err
 
+    @metrics.timed("save_seconds")
+    @tracing.traced("save")
     def save(self, filepath: str) -> None:
         """
         Save the rendered outfile to disk.
         """
-        if not self._content:
+        if self._data is None:
             raise InternalUsageError(
                 "Called Writer.save() before calling Writer.render()"
             )
@@ -66,5 +154,14 @@ class Writer:
             raise UsageError(
                 "You must specify a file to save the output. Received a directory name instead."
             )
-        with codecs.open(filepath, "w", encoding="utf-8") as file_handle:
-            file_handle.write(self._content)
+        # the content is written while it is rendered, so a failure must not leave a partial file behind
+        temp_file = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with codecs.open(temp_file, "w", encoding="utf-8") as file_handle:
+                self.write(file_handle)
+            os.replace(temp_file, filepath)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        if metrics.is_enabled():
+            metrics.inc("bytes_written_total", os.path.getsize(filepath))
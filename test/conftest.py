@@ -2,10 +2,30 @@
 Global fixtures for test scripts.
 """
 
+import importlib.metadata
+import re
 from pathlib import Path
+from unittest import mock
+
 import pytest
 
 
 @pytest.fixture()
 def temp_version_file(tmp_path: Path) -> Path:
     return tmp_path / "version_file.txt"
+
+
+@pytest.fixture(name="installed_distributions")
+def fixture_installed_distributions(tmp_path):
+    """Fake environment with some distributions, patched into importlib.metadata.distributions."""
+    distributions = []
+    for name, version in [("OurCorp.Plugin_A", "1.2.0"), ("ourcorp-plugin-b", "2.0.post1"), ("other", "3.0")]:
+        dist_info = tmp_path / "site-packages" / f"{re.sub(r'[-_.]+', '_', name)}-{version}.dist-info"
+        dist_info.mkdir(parents=True)
+        (dist_info / "METADATA").write_text(
+            f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\nSummary: {name} summary\n", encoding="utf-8"
+        )
+        (dist_info / "RECORD").write_text(f"{dist_info.name}/METADATA,,\n", encoding="utf-8")
+        distributions.append(importlib.metadata.PathDistribution(dist_info))
+    with mock.patch("importlib.metadata.distributions", return_value=distributions) as patched:
+        yield patched
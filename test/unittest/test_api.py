@@ -3,9 +3,15 @@ Author: Andreas Finkler
 
 Unit tests for the functional API of pyinstaller_versionfile.
 """
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import pytest
+
 import pyinstaller_versionfile
+from pyinstaller_versionfile import exceptions
+from pyinstaller_versionfile.metadata import MetaData
 
 TEST_DATA = Path(__file__).parent.parent / "resources"
 INPUT_METADATA_FILE = TEST_DATA / "acceptancetest_metadata.yml"
@@ -58,3 +64,83 @@ def test_create_versionfile_from_input_file_overwrite_version(tmpdir):
     )
 
     assert "filevers=(9,8,7,6)" in output_file.read_text(encoding="utf8")
+
+
+def test_create_output_files(tmpdir):
+    """
+    One metadata instance can be written in several output formats at once.
+    """
+    metadata = pyinstaller_versionfile.MetaData.from_file(INPUT_METADATA_FILE)
+    outputs = {
+        "pyinstaller": tmpdir / "versionfile.txt",
+        "rc": tmpdir / "version.rc",
+        "nuitka": tmpdir / "nuitka.txt",
+        "cx_freeze": tmpdir / "cx_freeze.json",
+    }
+    pyinstaller_versionfile.create_output_files(metadata, outputs)
+
+    assert outputs["pyinstaller"].read_text(encoding="utf8") == EXPECTED_VERSIONFILE.read_text(
+        encoding="utf8"
+    )
+    assert "FILEVERSION 4,7,1,1" in outputs["rc"].read_text(encoding="utf8")
+    assert "--product-version=4.7.1.1" in outputs["nuitka"].read_text(encoding="utf8")
+    assert '"version": "4.7.1.1"' in outputs["cx_freeze"].read_text(encoding="utf8")
+
+
+def test_create_versionfiles_from_distributions(tmp_path, installed_distributions):
+    created = pyinstaller_versionfile.create_versionfiles_from_distributions(
+        str(tmp_path / "out" / "{name}" / "version_file.txt"), "ourcorp-*", version="9.8.7"
+    )
+    assert created == [
+        str(tmp_path / "out" / "OurCorp.Plugin_A" / "version_file.txt"),
+        str(tmp_path / "out" / "ourcorp-plugin-b" / "version_file.txt"),
+    ]
+    for output_file in created:
+        assert "filevers=(9,8,7,0)" in Path(output_file).read_text(encoding="utf-8")
+    installed_distributions.assert_called_once_with()
+
+
+def test_create_versionfiles_from_distributions_requires_name_in_template(tmp_path):
+    with pytest.raises(exceptions.UsageError):
+        pyinstaller_versionfile.create_versionfiles_from_distributions(str(tmp_path / "version_file.txt"), "*")
+
+
+def test_create_functions_are_thread_safe(tmp_path):
+    """
+    Many threads creating version files at once, partly from the same MetaData instance and into the same file,
+    must all get complete and correct files and must not leave temporary files behind.
+    """
+    threads, iterations = 16, 20
+    shared = MetaData(version="4.7", internal_name=" Shared ", translations=[1031, 1200])
+    barrier = threading.Barrier(threads)
+
+    def hammer(thread: int) -> None:
+        barrier.wait()
+        for iteration in range(iterations):
+            name = f"{thread}-{iteration}"
+            pyinstaller_versionfile.create_versionfile(
+                str(tmp_path / f"{name}.txt"), version=f"1.{thread}.{iteration}", internal_name=name
+            )
+            pyinstaller_versionfile.create_versionfile_from_metadata(str(tmp_path / f"{name}-shared.txt"), shared)
+            pyinstaller_versionfile.create_versionfile_from_metadata(str(tmp_path / "common.txt"), shared)
+            pyinstaller_versionfile.create_output_files(
+                shared, {"rc": str(tmp_path / f"{name}.rc"), "nuitka": str(tmp_path / f"{name}-nuitka.txt")}
+            )
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(hammer, range(threads)))
+
+    assert not list(tmp_path.glob("*.tmp"))
+    assert len(list(tmp_path.iterdir())) == threads * iterations * 4 + 1
+    expected_shared = (tmp_path / "0-0-shared.txt").read_text(encoding="utf-8")
+    assert "filevers=(4,7,0,0)" in expected_shared and "'Shared'" in expected_shared
+    assert (tmp_path / "common.txt").read_text(encoding="utf-8") == expected_shared
+    for thread in range(threads):
+        for iteration in range(iterations):
+            name = f"{thread}-{iteration}"
+            content = (tmp_path / f"{name}.txt").read_text(encoding="utf-8")
+            assert f"filevers=(1,{thread},{iteration},0)" in content and f"'{name}'" in content
+            assert (tmp_path / f"{name}-shared.txt").read_text(encoding="utf-8") == expected_shared
+            assert "FILEVERSION 4,7,0,0" in (tmp_path / f"{name}.rc").read_text(encoding="utf-8")
+    assert shared.version == "4.7.0.0"
+    assert shared.translations == [1031, 1200]
@@ -0,0 +1,144 @@
+"""
+Unit tests for pyinstaller_versionfile.audit
+"""
+import json
+import struct
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from pyinstaller_versionfile import audit, exceptions
+from pyinstaller_versionfile.metadata import MetaData
+
+TEST_DATA = Path(__file__).parent.parent / "resources"
+SECTION_RVA = 0x1000
+SECTION_OFFSET = 0x200
+
+
+def build_pe(version_info: Optional[bytes], pe32plus: bool = True) -> bytes:
+    """
+    Build a minimal PE file with a single .rsrc section containing version_info as RT_VERSION resource.
+    """
+    resources = b""
+    if version_info is not None:
+
+        def directory(entry_id: int, offset: int) -> bytes:
+            return struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", entry_id, offset)
+
+        # root (type) at 0, name directory at 24, language directory at 48, data entry at 72, data at 88
+        resources = (
+            directory(audit.RT_VERSION, 0x80000000 | 24)
+            + directory(1, 0x80000000 | 48)
+            + directory(1033, 72)
+            + struct.pack("<IIII", SECTION_RVA + 88, len(version_info), 0, 0)
+            + version_info
+        )
+    optional_header_size = 240 if pe32plus else 224
+    optional_header = bytearray(optional_header_size)
+    struct.pack_into("<H", optional_header, 0, 0x20B if pe32plus else 0x10B)
+    directories = 112 if pe32plus else 96
+    struct.pack_into("<I", optional_header, directories - 4, 16)
+    if resources:
+        struct.pack_into("<II", optional_header, directories + 16, SECTION_RVA, len(resources))
+    section = b".rsrc\0\0\0" + struct.pack("<IIII", len(resources), SECTION_RVA, len(resources), SECTION_OFFSET)
+    section += bytes(40 - len(section))
+
+    headers = bytearray(b"MZ" + bytes(0x3A) + struct.pack("<I", 0x40))
+    headers += b"PE\0\0" + struct.pack("<HHIIIHH", 0x8664, 1, 0, 0, 0, optional_header_size, 0x22)
+    headers += optional_header + section
+    return bytes(headers) + bytes(SECTION_OFFSET - len(headers)) + resources
+
+
+@pytest.fixture(name="expected_metadata")
+def fixture_expected_metadata():
+    metadata = MetaData.from_file(TEST_DATA / "acceptancetest_metadata.yml")
+    metadata.validate()
+    metadata.sanitize()
+    return metadata
+
+
+def test_encode_decode_roundtrip(expected_metadata):
+    decoded = audit.decode_version_info(audit.encode_version_info(expected_metadata))
+    assert decoded.to_dict() == expected_metadata.to_dict()
+
+
+def test_encode_decode_roundtrip_extra_and_localized_strings():
+    expected = MetaData.from_file(TEST_DATA / "metadata_with_extra_strings.yml")
+    decoded = audit.decode_version_info(audit.encode_version_info(expected))
+    assert decoded.to_dict() == expected.to_dict()
+    assert not audit.compare(expected, decoded)
+
+
+def test_compare_reports_differing_localized_strings():
+    expected = MetaData.from_file(TEST_DATA / "metadata_with_extra_strings.yml")
+    actual = MetaData.from_file(TEST_DATA / "metadata_with_extra_strings.yml")
+    actual.localized_strings["040704B0"]["Comments"] = "Anders"
+    assert list(audit.compare(expected, actual)) == ["StringTables"]
+
+
+@pytest.mark.parametrize("pe32plus", [True, False])
+def test_read_version_info(tmp_path, expected_metadata, pe32plus):
+    exe = tmp_path / "app.exe"
+    exe.write_bytes(build_pe(audit.encode_version_info(expected_metadata), pe32plus))
+    assert audit.read_version_info(str(exe)).to_dict() == expected_metadata.to_dict()
+
+
+def test_read_version_info_without_resource(tmp_path):
+    exe = tmp_path / "app.exe"
+    exe.write_bytes(build_pe(None))
+    assert audit.read_version_info(str(exe)) is None
+
+
+@pytest.mark.parametrize("length", [4, -36])
+def test_truncated_version_resource_is_reported_as_error(tmp_path, expected_metadata, length):
+    exe = tmp_path / "app.exe"
+    exe.write_bytes(build_pe(audit.encode_version_info(expected_metadata)[:length]))
+    with pytest.raises(exceptions.InputError, match="Truncated version information"):
+        audit.read_version_info(str(exe))
+    result = audit.audit_file(str(exe), expected_metadata)
+    assert (result["status"], result["error"]) == ("error", "Truncated version information")
+
+
+@pytest.mark.parametrize("content", [b"", b"not a PE file at all", b"MZ" + bytes(100)])
+def test_read_version_info_invalid_file_raises_input_error(tmp_path, content):
+    exe = tmp_path / "app.exe"
+    exe.write_bytes(content)
+    with pytest.raises(exceptions.InputError):
+        audit.read_version_info(str(exe))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_audit_reports_status_per_file(tmp_path, expected_metadata, workers):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "good.exe").write_bytes(build_pe(audit.encode_version_info(expected_metadata)))
+    other = MetaData.from_file(TEST_DATA / "acceptancetest_metadata.yml", version="9.9.9.9")
+    (tmp_path / "sub" / "wrong.dll").write_bytes(build_pe(audit.encode_version_info(other)))
+    (tmp_path / "sub" / "none.exe").write_bytes(build_pe(None))
+    (tmp_path / "sub" / "broken.exe").write_bytes(b"garbage")
+    (tmp_path / "ignored.txt").write_bytes(b"garbage")
+
+    results = {Path(r["path"]).name: r for r in audit.audit(str(tmp_path), expected_metadata, workers)}
+
+    assert {name: r["status"] for name, r in results.items()} == {
+        "good.exe": "ok",
+        "wrong.dll": "mismatch",
+        "none.exe": "missing",
+        "broken.exe": "error",
+    }
+    assert results["wrong.dll"]["differences"] == {"Version": {"expected": "4.7.1.1", "actual": "9.9.9.9"}}
+
+
+def test_main_writes_json_lines_and_fails_on_mismatch(tmp_path, expected_metadata):
+    build_dir = tmp_path / "dist"
+    build_dir.mkdir()
+    (build_dir / "good.exe").write_bytes(build_pe(audit.encode_version_info(expected_metadata)))
+    output = tmp_path / "audit.jsonl"
+    args = [str(build_dir), "--metadata-source", str(TEST_DATA / "acceptancetest_metadata.yml"),
+            "--workers", "1", "--output", str(output)]
+
+    audit.main(args)
+    assert json.loads(output.read_text(encoding="utf-8"))["status"] == "ok"
+
+    with pytest.raises(SystemExit):
+        audit.main(args + ["--version", "1.0.0.0"])
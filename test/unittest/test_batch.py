@@ -0,0 +1,182 @@
+"""
+Unit tests for pyinstaller_versionfile.batch
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from pyinstaller_versionfile import batch, exceptions
+from pyinstaller_versionfile.discovery import Index
+
+
+@pytest.fixture(name="metadata_files")
+def fixture_metadata_files(tmp_path: Path) -> list[Path]:
+    files = []
+    for name in ["a", "b", "c"]:
+        path = tmp_path / "packages" / name / f"{name}.versionfile.yml"
+        path.parent.mkdir(parents=True)
+        path.write_text(f"Version: 1.2.3\nInternalName: {name}\n", encoding="utf-8")
+        files.append(path)
+    return files
+
+
+@pytest.mark.parametrize(
+    "template, expected",
+    [
+        (batch.DEFAULT_OUTFILE_TEMPLATE, "dir/app_version_file.txt"),
+        ("out/{name}.txt", "out/app.versionfile.yml.txt"),
+    ],
+)
+def test_output_path(template, expected):
+    assert Path(batch.output_path("dir/app.versionfile.yml", template)) == Path(expected)
+
+
+def test_generate_skips_unchanged_targets(tmp_path, metadata_files):
+    targets, _ = batch.collect_targets([str(tmp_path)])
+    assert len(targets) == 3
+
+    first = batch.generate(targets, Index(str(tmp_path / "index.json")))
+    assert len(first["generated"]) == 3
+    assert all(Path(t.outfile).is_file() for t in targets)
+
+    metadata_files[1].write_text("Version: 1.2.4\nInternalName: b\n", encoding="utf-8")
+    second = batch.generate(targets, Index(str(tmp_path / "index.json")))
+    assert second["generated"] == [targets[1].outfile]
+    assert len(second["skipped"]) == 2
+    assert "filevers=(1,2,4,0)" in Path(targets[1].outfile).read_text(encoding="utf-8")
+
+
+def test_generate_continues_after_failure(tmp_path, metadata_files):
+    metadata_files[0].write_text("Version: not a version\n", encoding="utf-8")
+    targets, _ = batch.collect_targets([str(tmp_path)])
+    result = batch.generate(targets)
+    assert list(result["failed"]) == [targets[0].outfile]
+    assert len(result["generated"]) == 2
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_generate_reports_unexpected_errors_per_target(tmp_path, metadata_files, workers):
+    metadata_files[0].write_text("Version: 1.2\n", encoding="utf-8")  # a float
+    metadata_files[1].write_text("Version: 1.2.3\nTranslation: [1033]\n", encoding="utf-8")
+    targets, _ = batch.collect_targets([str(tmp_path)])
+    metadata_files[2].rename(metadata_files[2].parent / ("c" * 239 + ".versionfile.yml"))  # output name too long
+    (tmp_path / "packages" / "d").mkdir()
+    (tmp_path / "packages" / "d" / "d.versionfile.yml").write_text("Version: 1.2.3\n", encoding="utf-8")
+    targets, _ = batch.collect_targets([str(tmp_path)])
+
+    result = batch.generate(targets, workers=workers)
+    assert result["generated"] == [targets[3].outfile]
+    assert list(result["failed"]) == [target.outfile for target in targets[:3]]
+    assert result["failed"][targets[0].outfile].startswith("TypeError: ")
+    assert result["failed"][targets[1].outfile].startswith("TypeError: ")
+    assert result["failed"][targets[2].outfile].startswith("OSError: ")
+
+
+def test_generate_with_workers_matches_sequential_run(tmp_path, metadata_files):
+    metadata_files[0].write_text("Version: not a version\n", encoding="utf-8")
+    targets, _ = batch.collect_targets([str(tmp_path)])
+    sequential = batch.generate(targets)
+    contents = {target.outfile: Path(target.outfile).read_bytes() for target in targets[1:]}
+
+    parallel = batch.generate(targets, Index(str(tmp_path / "index.json")), workers=4)
+    assert parallel["generated"] == sequential["generated"]
+    assert parallel["failed"] == sequential["failed"]
+    assert {target.outfile: Path(target.outfile).read_bytes() for target in targets[1:]} == contents
+    assert batch.generate(targets, Index(str(tmp_path / "index.json")), workers=4)["skipped"] == [
+        target.outfile for target in targets[1:]
+    ]
+
+
+def test_profiling_requires_a_single_worker(tmp_path, metadata_files):
+    targets, _ = batch.collect_targets([str(tmp_path)])
+    with pytest.raises(exceptions.UsageError):
+        batch.generate(targets, profile_dir=str(tmp_path / "profiles"), workers=2)
+    with pytest.raises(SystemExit):
+        batch.main([str(tmp_path), "--workers", "2", "--profile", str(tmp_path / "profiles")])
+
+
+@pytest.mark.parametrize("value", ["0", "many"])
+def test_invalid_workers_argument(tmp_path, value):
+    with pytest.raises(SystemExit):
+        batch.main([str(tmp_path), "--workers", value])
+
+
+def test_main_reports_walk_time_and_skipped_files(tmp_path, metadata_files, capsys):
+    args = [str(tmp_path), "--index", str(tmp_path / "index.json")]
+    batch.main(args)
+    batch.main(args)
+    output = capsys.readouterr().out.splitlines()
+    assert "3 generated, 0 skipped" in output[0]
+    assert "0 generated, 3 skipped" in output[1]
+
+
+def test_main_fails_if_a_target_fails(tmp_path, metadata_files):
+    metadata_files[0].write_text("- not a mapping\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        batch.main([str(tmp_path)])
+
+
+def test_shard_assignment_is_stable_when_targets_are_added():
+    targets = [batch.Target(f"{i}.yml", f"out/{i}/version_file.txt") for i in range(200)]
+    assignment = {t: batch.shard_of(t, 16) for t in targets}
+    more_targets = targets + [batch.Target(f"{i}.yml", f"out/{i}/version_file.txt") for i in range(200, 300)]
+    assert all(batch.shard_of(t, 16) == shard for t, shard in assignment.items())
+    assert set(assignment.values()) == set(range(1, 17))
+    shards = [batch.select_shard(more_targets, shard, 16) for shard in range(1, 17)]
+    assert sorted(t for shard in shards for t in shard) == sorted(more_targets)
+
+
+def test_shard_assignment_does_not_depend_on_the_location_of_the_batch(tmp_path, monkeypatch):
+    relative_targets = [batch.Target(f"{i}.yml", os.path.join("out", str(i), "version_file.txt")) for i in range(50)]
+    assignments = []
+    for checkout in ["checkout1", os.path.join("ci", "checkout2")]:
+        root = str(tmp_path / checkout)
+        targets = [batch.Target(t.source, os.path.join(root, t.outfile)) for t in relative_targets]
+        assignments.append([batch.shard_of(t, 16, root) for t in targets])
+    (tmp_path / "checkout1").mkdir()
+    monkeypatch.chdir(tmp_path / "checkout1")
+    assert assignments[0] == assignments[1] == [batch.shard_of(t, 16) for t in relative_targets]
+
+
+def test_batch_root(tmp_path, metadata_files):
+    assert batch.batch_root([str(tmp_path)]) == str(tmp_path)
+    assert batch.batch_root([str(path) for path in metadata_files]) == str(tmp_path / "packages")
+
+
+@pytest.mark.parametrize("value", ["0/4", "5/4", "1", "a/b"])
+def test_invalid_shard_argument(value):
+    with pytest.raises(SystemExit):
+        batch.parse_args([".", "--shard", value])
+
+
+def test_sharded_runs_are_merged(tmp_path, metadata_files, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    reports = [str(tmp_path / f"shard{i}.json") for i in (1, 2)]
+    for index, report in enumerate(reports, start=1):
+        batch.main(["packages", "--shard", f"{index}/2", "--report", report])
+    merged = tmp_path / "merged.json"
+
+    batch.merge_shards([*reports, "--output", str(merged)])
+
+    assert "All 3 targets covered exactly once: 3 generated" in capsys.readouterr().out.splitlines()[-1]
+    assert len(json.loads(merged.read_text(encoding="utf-8"))["generated"]) == 3
+
+
+def test_merge_detects_missing_shard(tmp_path, metadata_files, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    batch.main(["packages", "--shard", "1/2", "--report", "shard1.json"])
+    with pytest.raises(SystemExit) as exc_info:
+        batch.merge_shards(["shard1.json"])
+    assert exc_info.value.code == 2
+
+
+def test_merge_detects_duplicate_coverage():
+    targets = [batch.Target("a.yml", "a.txt"), batch.Target("b.yml", "b.txt")]
+    result = batch.BatchResult(
+        targets=2, generated=["a.txt", "b.txt"], skipped=[], failed={}, walk_seconds=0.0, seconds=0.0
+    )
+    reports = [batch.shard_report(result, targets, shard, 2) for shard in (1, 2)]
+    with pytest.raises(exceptions.UsageError):
+        batch.merge_reports(reports)
@@ -0,0 +1,74 @@
+"""
+Unit tests for pyinstaller_versionfile.bench
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+from pyinstaller_versionfile import bench
+from pyinstaller_versionfile.metadata import MetaData
+
+
+@pytest.mark.parametrize("entry_point", bench.ENTRY_POINTS)
+@pytest.mark.parametrize("source_format", bench.SOURCE_FORMATS)
+def test_run_in_process(entry_point, source_format):
+    results = bench.run(3, entry_points=[entry_point], source_formats=[source_format], modes=["inprocess"])
+    assert len(results) == 1
+    assert results[0]["files"] == 3
+    assert results[0]["files_per_second"] > 0
+    assert results[0]["p50_ms"] <= results[0]["p99_ms"]
+
+
+def test_run_scenario_as_subprocess_with_workers(tmp_path):
+    sources = bench.synthesize_yaml(tmp_path / "yaml", 2)
+    result = bench.run_scenario("pyivf-make_version", "yaml", "subprocess", 2, sources, tmp_path / "out")
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["version_file0.txt", "version_file1.txt"]
+    assert result["workers"] == 2
+
+
+def test_run_scenario_in_threads(tmp_path):
+    sources = bench.synthesize_yaml(tmp_path / "yaml", 4)
+    result = bench.run_scenario("create-version-file", "yaml", "threads", 4, sources, tmp_path / "out")
+    assert len(list((tmp_path / "out").iterdir())) == 4
+    assert (result["mode"], result["workers"]) == ("threads", 4)
+    assert result["gil_enabled"] == bench.gil_enabled()
+
+
+def test_main_writes_table_and_json(tmp_path, capsys):
+    json_file = tmp_path / "results.json"
+    bench.main([
+        "--count", "2", "--mode", "inprocess", "--source-format", "yaml", "--json", str(json_file)
+    ])
+    output = capsys.readouterr().out
+    assert "files/s" in output
+    assert "GIL enabled" in output or "free-threaded" in output
+    assert len(json.loads(json_file.read_text(encoding="utf-8"))) == len(bench.ENTRY_POINTS)
+
+
+def test_main_cold_start(capsys):
+    bench.main(["--cold-start", "1"])
+    output = capsys.readouterr().out
+    assert "with the precompiled template" in output and "when compiling it at runtime" in output
+
+
+def test_main_overlays(capsys):
+    bench.main(["--overlays", "3"])
+    output = capsys.readouterr().out
+    assert "from files extending a shared base file" in output and "from complete files" in output
+
+
+def test_synthesize_product_shares_base_file(tmp_path):
+    sources = bench.synthesize_product(tmp_path, 2, extends=True)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["app0.yml", "app1.yml", "product.yml"]
+    assert all(MetaData.from_file(source).company_name == "Benchmark Company" for source in sources)
+
+
+@pytest.mark.skipif(bench.resource is None, reason="peak RSS is not available")
+def test_isolated_scenario_reports_its_own_peak_rss(tmp_path):
+    # an earlier scenario with a high peak RSS, like a subprocess scenario
+    subprocess.run([sys.executable, "-c", "bytearray(256 * 1024 * 1024)"], check=True)
+    sources = bench.synthesize_yaml(tmp_path / "yaml", 1)
+    result = bench.run_isolated_scenario("create-version-file", "yaml", "inprocess", 1, sources, tmp_path / "out")
+    assert result["peak_rss_kb"] < 256 * 1024 < bench._peak_rss_kb()  # pylint: disable=protected-access
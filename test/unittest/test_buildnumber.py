@@ -0,0 +1,92 @@
+"""
+Unit tests for pyinstaller_versionfile.buildnumber
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from pyinstaller_versionfile import exceptions
+from pyinstaller_versionfile.__main__ import make_version
+from pyinstaller_versionfile.buildnumber import MAX_BUILD_NUMBER, BuildNumberCounter
+from pyinstaller_versionfile.metadata import MetaData
+
+
+def draw_build_numbers(filepath: str, count: int, batch_size: int) -> tuple[list[int], int, float]:
+    counter = BuildNumberCounter(filepath, batch_size)
+    numbers = [counter.next() for _ in range(count)]
+    return numbers, counter.lock_acquisitions, counter.lock_wait_seconds
+
+
+def test_numbers_increase(tmp_path):
+    counter = BuildNumberCounter(str(tmp_path / "build_number"))
+    assert [counter.next() for _ in range(3)] == [1, 2, 3]
+    assert (tmp_path / "build_number").read_text(encoding="utf-8") == "3"
+    assert BuildNumberCounter(str(tmp_path / "build_number")).next() == 4
+
+
+def test_batch_reserves_blocks(tmp_path):
+    counter = BuildNumberCounter(str(tmp_path / "build_number"), batch_size=10)
+    assert [counter.next() for _ in range(12)] == list(range(1, 13))
+    assert counter.lock_acquisitions == 2
+    assert BuildNumberCounter(str(tmp_path / "build_number")).next() == 21  # rest of the block is skipped
+
+
+def test_overflow_raises_validation_error(tmp_path):
+    (tmp_path / "build_number").write_text(str(MAX_BUILD_NUMBER), encoding="utf-8")
+    with pytest.raises(exceptions.ValidationError):
+        BuildNumberCounter(str(tmp_path / "build_number")).next()
+
+
+@pytest.mark.parametrize("batch_size", [1, 25])
+def test_parallel_processes_get_unique_numbers(tmp_path, batch_size):
+    """
+    Many processes drawing build numbers at the same time never get the same number.
+    Reserving blocks reduces the number of lock acquisitions, i.e. the contention on the counter file.
+    """
+    processes, per_process = 16, 50
+    filepath = str(tmp_path / "build_number")
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = list(
+            executor.map(draw_build_numbers, [filepath] * processes, [per_process] * processes,
+                         [batch_size] * processes)
+        )
+    numbers = [number for result in results for number in result[0]]
+    acquisitions = sum(result[1] for result in results)
+
+    assert len(set(numbers)) == processes * per_process
+    assert all(result[0] == sorted(result[0]) for result in results)
+    assert acquisitions == processes * per_process // batch_size
+    if batch_size == 1:
+        assert sorted(numbers) == list(range(1, processes * per_process + 1))
+
+
+def test_parallel_threads_share_a_counter(tmp_path):
+    counter = BuildNumberCounter(str(tmp_path / "build_number"), batch_size=7)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        numbers = list(executor.map(lambda _: counter.next(), range(200)))
+    assert sorted(numbers) == list(range(1, 201))
+
+
+@pytest.mark.parametrize(
+    "version, expected", [("1.2", "1.2.0.1"), ("1.2.3", "1.2.3.1"), ("1.2.3.4", "1.2.3.4")]
+)
+def test_sanitize_sets_build_number(tmp_path, version, expected):
+    metadata = MetaData(version=version)
+    metadata.sanitize(BuildNumberCounter(str(tmp_path / "build_number")))
+    assert metadata.version == expected
+
+
+def test_set_version_with_build_number(tmp_path):
+    counter = BuildNumberCounter(str(tmp_path / "build_number"))
+    metadata = MetaData()
+    metadata.set_version("2.0", counter)
+    metadata.set_version("2.0", counter)
+    assert metadata.version == "2.0.0.2"
+
+
+def test_make_version_with_build_number_file(tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    args = ["--version", "1.2.3", "--build-number-file", str(tmp_path / "build_number"), "--outfile", str(outfile)]
+    make_version(args)
+    make_version(args)
+    assert "filevers=(1,2,3,2)" in outfile.read_text(encoding="utf-8")
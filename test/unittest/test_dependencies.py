@@ -0,0 +1,89 @@
+"""
+Unit tests for pyinstaller_versionfile.dependencies
+"""
+from pathlib import Path
+from unittest import mock
+
+from pyinstaller_versionfile import dependencies
+from pyinstaller_versionfile.__main__ import make_version
+from pyinstaller_versionfile.metadata import MetaData
+from pyinstaller_versionfile.writer import OUTPUT_FORMATS, TEMPLATE_FILE
+
+TEST_DATA = Path(__file__).parent.parent / "resources"
+
+
+def test_collect_contains_yaml_version_file_and_template():
+    """
+    All files read while creating the MetaData, including the referenced version file, are dependencies.
+    """
+    testfile = TEST_DATA / "metadata_reference_to_other_file.yml"
+    metadata = MetaData.from_file(str(testfile))
+    assert dependencies.collect(metadata) == [
+        str(testfile),
+        str(TEST_DATA / "VERSION.txt"),
+        TEMPLATE_FILE,
+    ]
+
+
+def test_collect_contains_distribution_metadata():
+    metadata = MetaData.from_distribution("pytest")
+    assert any(Path(dep).name == "METADATA" for dep in dependencies.collect(metadata))
+
+
+def test_write_depfile_escapes_special_characters(tmp_path):
+    depfile = tmp_path / "out.d"
+    dependencies.write_depfile(str(depfile), ["out file.txt", "out.rc"], ["in $1.yml", "template#.txt"])
+    assert depfile.read_text(encoding="utf-8") == (
+        "out\\ file.txt out.rc: \\\n in\\ $$1.yml \\\n template\\#.txt\n"
+    )
+
+
+def test_collect_contains_templates_of_all_output_formats():
+    assert dependencies.collect(MetaData(), ["pyinstaller", "rc"]) == [TEMPLATE_FILE, OUTPUT_FORMATS["rc"]]
+
+
+def test_fingerprint_depends_on_output_formats():
+    assert dependencies.fingerprint(MetaData()) != dependencies.fingerprint(MetaData(), ["pyinstaller", "rc"])
+
+
+def test_fingerprint_is_stable():
+    assert dependencies.fingerprint(MetaData(version="1.2.3.4")) == dependencies.fingerprint(
+        MetaData(version="1.2.3.4")
+    )
+
+
+def test_package_version_is_looked_up_once():
+    dependencies._package_version.cache_clear()  # pylint: disable=protected-access
+    with mock.patch("importlib.metadata.version", return_value="1.0") as version:
+        first = dependencies.fingerprint(MetaData(version="1.2.3.4"))
+        assert dependencies.fingerprint(MetaData(version="1.2.3.4")) == first
+    dependencies._package_version.cache_clear()  # pylint: disable=protected-access
+    version.assert_called_once_with("pyinstaller_versionfile")
+
+
+def test_fingerprint_changes_with_metadata():
+    assert dependencies.fingerprint(MetaData(version="1.2.3.4")) != dependencies.fingerprint(
+        MetaData(version="1.2.3.5")
+    )
+
+
+def test_make_version_writes_depfile(tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    depfile = tmp_path / "version_file.d"
+    make_version([
+        "--source-format", "yaml",
+        "--metadata-source", str(TEST_DATA / "metadata_reference_to_other_file.yml"),
+        "--outfile", str(outfile),
+        "--depfile", str(depfile),
+    ])
+    assert outfile.is_file()
+    content = depfile.read_text(encoding="utf-8")
+    assert content.startswith(f"{outfile.as_posix()}:")
+    assert "VERSION.txt" in content
+
+
+def test_make_version_print_fingerprint_does_not_render(tmp_path, capsys):
+    outfile = tmp_path / "version_file.txt"
+    make_version(["--outfile", str(outfile), "--version", "1.2", "--print-fingerprint"])
+    assert not outfile.exists()
+    assert capsys.readouterr().out.strip() == dependencies.fingerprint(MetaData(version="1.2.0.0"))
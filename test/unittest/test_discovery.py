@@ -0,0 +1,73 @@
+"""
+Unit tests for pyinstaller_versionfile.discovery
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+from pyinstaller_versionfile.discovery import Index, discover
+
+
+@pytest.fixture(name="source_tree")
+def fixture_source_tree(tmp_path: Path) -> Path:
+    for relative_path in [
+        "app.versionfile.yml",
+        "packages/a/a.versionfile.yml",
+        "packages/b/deep/b.versionfile.yml",
+        "packages/b/other.yml",
+        "packages/c/build/c.versionfile.yml",
+        ".git/stale.versionfile.yml",
+        "node_modules/x/x.versionfile.yml",
+    ]:
+        path = tmp_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("CompanyName: Test\n", encoding="utf-8")
+    return tmp_path
+
+
+def test_discover_finds_matching_files_and_skips_ignored_directories(source_tree):
+    found = discover([str(source_tree)], ignore=[".git", "node_modules", "packages/c/build"])
+    assert [Path(f).relative_to(source_tree).as_posix() for f in found] == [
+        "app.versionfile.yml",
+        "packages/a/a.versionfile.yml",
+        "packages/b/deep/b.versionfile.yml",
+    ]
+
+
+def test_discover_custom_pattern(source_tree):
+    found = discover([str(source_tree / "packages")], pattern="other.yml")
+    assert found == [str(source_tree / "packages" / "b" / "other.yml")]
+
+
+def test_index_detects_changes(tmp_path):
+    source = tmp_path / "app.versionfile.yml"
+    output = tmp_path / "version_file.txt"
+    source.write_text("CompanyName: Test\n", encoding="utf-8")
+    output.write_text("output", encoding="utf-8")
+    index = Index(str(tmp_path / "index.json"))
+    assert not index.is_up_to_date(str(source), str(output))
+
+    index.update(str(source), str(output), [str(source)])
+    index.save()
+    reloaded = Index(str(tmp_path / "index.json"))
+    assert reloaded.is_up_to_date(str(source), str(output))
+    assert not reloaded.is_up_to_date(str(source), str(tmp_path / "other_output.txt"))
+
+    source.write_text("CompanyName: Changed\n", encoding="utf-8")
+    assert not reloaded.is_up_to_date(str(source), str(output))
+
+
+def test_index_missing_output_is_not_up_to_date(tmp_path):
+    source = tmp_path / "app.versionfile.yml"
+    source.write_text("CompanyName: Test\n", encoding="utf-8")
+    index = Index()
+    index.update(str(source), str(tmp_path / "version_file.txt"), [str(source)])
+    assert not index.is_up_to_date(str(source), str(tmp_path / "version_file.txt"))
+
+
+def test_broken_index_is_ignored(tmp_path):
+    index_file = tmp_path / "index.json"
+    index_file.write_text("{ not json", encoding="utf-8")
+    assert not Index(str(index_file)).entries
+    assert os.path.isfile(index_file)
@@ -5,12 +5,14 @@ from pathlib import Path
 import pytest
 
 import pyinstaller_versionfile
+from pyinstaller_versionfile import exceptions, verify
 from pyinstaller_versionfile.metadata import MetadataKwargs
 
-vi = pytest.importorskip(
-    "PyInstaller.utils.win32.versioninfo",
-    reason="PyInstaller is not installed",
-)
+try:
+    # outside of Windows, PyInstaller's versioninfo module can only be imported with a stub for win32api
+    vi = verify._import_versioninfo()  # pylint: disable=protected-access
+except exceptions.UsageError:
+    pytest.skip("PyInstaller is not installed", allow_module_level=True)
 
 
 def read_versionfile(
@@ -35,7 +37,8 @@ def read_versionfile(
 
     for info in versioninfo.kids:
         if type(info) is vi.StringFileInfo:
-            for kid in filter(lambda x: x.name == "040904B0", info.kids):
+            # there is one StringTable per translation, the first one belongs to the first translation
+            for kid in info.kids[:1]:
                 for item in kid.kids:
                     try:
                         kwargs[item.name] = item.val
@@ -46,7 +49,7 @@ def read_versionfile(
             else:
                 if lazy is False:
                     raise ValueError(
-                        f"Expected '040904B0' StringTable in StringFileInfo, but not found: {info!r}"
+                        f"Expected a StringTable in StringFileInfo, but not found: {info!r}"
                     )
         elif type(info) is vi.VarFileInfo:
             for kid in filter(lambda x: x.name == "Translation", info.kids):
@@ -0,0 +1,104 @@
+"""
+Unit tests for pyinstaller_versionfile.hatch_hook
+"""
+import zipfile
+from importlib import metadata as importlib_metadata
+from unittest import mock
+
+import pytest
+
+from pyinstaller_versionfile import exceptions
+from pyinstaller_versionfile.metadata import MetaData
+
+pytest.importorskip("hatchling")
+hatch_hook = pytest.importorskip("pyinstaller_versionfile.hatch_hook")
+
+from hatchling.builders.wheel import WheelBuilder  # pylint: disable=wrong-import-position,wrong-import-order
+from hatchling.metadata.core import ProjectMetadata  # pylint: disable=wrong-import-position,wrong-import-order
+
+PROJECT = {
+    "name": "demo",
+    "version": "2.1.0.post3",
+    "description": "Demo application",
+    "authors": [{"name": "Jane Doe"}],
+    "license": {"text": "MIT"},
+}
+
+
+def _hook(root, config):
+    metadata = ProjectMetadata(str(root), None, {"project": PROJECT})
+    return hatch_hook.VersionFileBuildHook(str(root), config, None, metadata, str(root / "dist"), "wheel")
+
+
+def test_initialize_creates_version_file(tmp_path):
+    hook = _hook(tmp_path, {"outfile": "src/demo/version_file.txt", "metadata": {"company_name": "Example Inc."}})
+    build_data = {"artifacts": []}
+    with mock.patch.object(importlib_metadata, "distribution", side_effect=AssertionError("must not be called")):
+        hook.initialize("standard", build_data)
+    content = (tmp_path / "src" / "demo" / "version_file.txt").read_text(encoding="utf-8")
+    assert "filevers=(2,1,0,3)" in content
+    assert "StringStruct(u'CompanyName', u'Example Inc.')" in content
+    assert "StringStruct(u'ProductName', u'demo')" in content
+    assert not build_data["artifacts"]
+
+
+def test_output_formats_version_policy_and_artifacts(tmp_path):
+    hook = _hook(
+        tmp_path,
+        {"output-formats": {"rc": "build/app.rc"}, "version-policy": {"post": "drop"}, "artifacts": True},
+    )
+    build_data = {"artifacts": []}
+    hook.initialize("standard", build_data)
+    assert "FILEVERSION 2,1,0,0" in (tmp_path / "build" / "app.rc").read_text(encoding="utf-8")
+    assert build_data["artifacts"] == ["/version_file.txt", "/build/app.rc"]
+
+
+def test_metadata_matches_core_metadata_of_the_wheel(tmp_path):
+    project = {
+        **PROJECT,
+        "authors": [{"name": "Jane Doe"}, {"name": "John Roe", "email": "john@example.com"}],
+        "maintainers": [{"email": "team@example.com"}],
+    }
+    (tmp_path / "demo").mkdir()
+    (tmp_path / "demo" / "__init__.py").write_text("", encoding="utf-8")
+    config = {"project": project, "tool": {"hatch": {"build": {"targets": {"wheel": {"packages": ["demo"]}}}}}}
+    (wheel,) = WheelBuilder(str(tmp_path), config=config).build(directory=str(tmp_path / "dist"), versions=["standard"])
+    with zipfile.ZipFile(wheel) as archive:
+        core_metadata = archive.read("demo-2.1.0.post3.dist-info/METADATA").decode("utf-8")
+    hook = hatch_hook.VersionFileBuildHook(
+        str(tmp_path), {}, None, ProjectMetadata(str(tmp_path), None, {"project": project}), str(tmp_path), "wheel"
+    )
+    assert hook.version_file_metadata().to_dict() == MetaData.from_core_metadata(core_metadata).to_dict()
+
+
+@pytest.mark.parametrize(
+    "config",
+    [{"output-formats": {"exe": "app.exe"}}, {"version-policy": {"epoch": "drop"}}],
+    ids=["output-format", "version-policy"],
+)
+def test_invalid_config(tmp_path, config):
+    with pytest.raises(exceptions.UsageError):
+        _hook(tmp_path, config).initialize("standard", {"artifacts": []})
+
+
+def test_wheel_build_includes_version_file(tmp_path):
+    """The hook is found through its entry point, like in an isolated build."""
+    (tmp_path / "demo").mkdir()
+    (tmp_path / "demo" / "__init__.py").write_text("", encoding="utf-8")
+    config = {
+        "project": PROJECT,
+        "tool": {
+            "hatch": {
+                "build": {
+                    "hooks": {"pyinstaller-versionfile": {"outfile": "demo/version_file.txt", "artifacts": True}},
+                    "targets": {"wheel": {"packages": ["demo"]}},
+                }
+            }
+        },
+    }
+    if not importlib_metadata.entry_points(group="hatch", name="pyinstaller-versionfile"):
+        pytest.skip("pyinstaller_versionfile is not installed with its entry points")
+    builder = WheelBuilder(str(tmp_path), config=config)
+    (wheel,) = builder.build(directory=str(tmp_path / "dist"), versions=["standard"])
+    with zipfile.ZipFile(wheel) as archive:
+        assert "filevers=(2,1,0,3)" in archive.read("demo/version_file.txt").decode("utf-8")
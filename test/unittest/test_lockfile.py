@@ -0,0 +1,89 @@
+"""
+Unit tests for pyinstaller_versionfile.lockfile
+"""
+from unittest import mock
+
+import pytest
+
+from pyinstaller_versionfile import exceptions, lockfile
+from pyinstaller_versionfile.__main__ import make_version
+from pyinstaller_versionfile.metadata import MetaData
+
+
+@pytest.fixture(name="lockfile_path")
+def fixture_lockfile_path(tmp_path):
+    path = tmp_path / "pyivf-dist.lock"
+    lockfile.main(["pytest", "PyYAML", "--output", str(path)])
+    return path
+
+
+def test_snapshot_records_distribution_fields():
+    data = lockfile.snapshot(["pytest"])
+    assert list(data["distributions"]) == ["pytest"]
+    assert set(data["distributions"]["pytest"]) <= set(lockfile.DISTRIBUTION_FIELDS)
+
+
+def test_snapshot_unknown_distribution_raises_input_error():
+    with pytest.raises(exceptions.InputError):
+        lockfile.snapshot(["this-distribution-does-not-exist"])
+
+
+@pytest.mark.parametrize("distname", ["pytest", "pyyaml", "PyYAML"])
+def test_from_lockfile_matches_from_distribution(lockfile_path, distname):
+    expected = MetaData.from_distribution(distname)
+    with mock.patch("importlib.metadata.distribution") as distribution:
+        metadata = MetaData.from_lockfile(str(lockfile_path), distname)
+    distribution.assert_not_called()
+    assert metadata.to_dict() == expected.to_dict()
+    assert metadata.source_files == [str(lockfile_path)]
+
+
+def test_from_lockfile_overrides(lockfile_path):
+    metadata = MetaData.from_lockfile(str(lockfile_path), "pytest", company_name="Override")
+    assert metadata.company_name == "Override"
+
+
+def test_from_lockfile_unknown_distribution_raises_input_error(lockfile_path):
+    with pytest.raises(exceptions.InputError):
+        MetaData.from_lockfile(str(lockfile_path), "pip")
+
+
+def test_missing_lockfile_raises_input_error(tmp_path):
+    with pytest.raises(exceptions.InputError):
+        MetaData.from_lockfile(str(tmp_path / "missing.lock"), "pytest")
+
+
+def test_make_version_from_lockfile(lockfile_path, tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    make_version([
+        "--source-format", "dist-lock",
+        "--metadata-source", "pytest",
+        "--lockfile", str(lockfile_path),
+        "--outfile", str(outfile),
+        "--version", "1.2.3.4",
+    ])
+    assert "u'ProductName', u'pytest'" in outfile.read_text(encoding="utf-8")
+
+
+def test_from_lockfile_maps_pep440_versions(tmp_path):
+    """
+    A batch of distributions with pre-, post- and development releases can be processed without failures.
+    """
+    versions = {"rc": "2.1.0rc1", "post": "1.0.post3", "dev": "0.9.dev4+g1234"}
+    path = tmp_path / "pyivf-dist.lock"
+    lockfile.write(str(path), {
+        "version": lockfile.LOCKFILE_VERSION,
+        "distributions": {name: {"Name": name, "Version": version} for name, version in versions.items()},
+    })
+    results = {name: MetaData.from_lockfile(str(path), name) for name in versions}
+    for metadata in results.values():
+        metadata.validate()
+    assert {name: metadata.version for name, metadata in results.items()} == {
+        "rc": "2.1.0", "post": "1.0.0.3", "dev": "0.9"
+    }
+    outfile = tmp_path / "version_file.txt"
+    make_version([
+        "--source-format", "dist-lock", "--lockfile", str(path), "--metadata-source", "rc",
+        "--version-policy", "pre=build", "--outfile", str(outfile),
+    ])
+    assert "filevers=(2,1,0,1)" in outfile.read_text(encoding="utf-8")
@@ -3,9 +3,18 @@ Author: Andreas Finkler
 
 Unit tests for pyinstaller_versionfile.main
 """
+import subprocess
+import sys
+
 import pytest
 
-from pyinstaller_versionfile.__main__ import parse_args_create_version_file
+from pyinstaller_versionfile import exceptions
+from pyinstaller_versionfile.__main__ import (
+    create_version_file,
+    make_version,
+    parse_args_create_version_file,
+    parse_args_make_version,
+)
 
 
 @pytest.mark.parametrize(
@@ -53,3 +62,117 @@ def test_parser_missing_filename():
 
     with pytest.raises(SystemExit):
         _ = parse_args_create_version_file(args)
+
+
+@pytest.mark.parametrize(
+    "args, expected_outputs", [
+        ([], {"pyinstaller": "./version_file.txt"}),
+        (["--outfile", "out.txt", "--output-format", "rc"], {"rc": "out.txt"}),
+        (
+            ["--output-format", "pyinstaller", "rc=app.rc", "nuitka=nuitka.txt"],
+            {"pyinstaller": "./version_file.txt", "rc": "app.rc", "nuitka": "nuitka.txt"},
+        ),
+    ]
+)
+def test_parser_output_formats(args, expected_outputs):
+    parsed = parse_args_make_version(args)
+    assert parsed.outputs == expected_outputs
+
+
+@pytest.mark.parametrize(
+    "args", [
+        ["--output-format", "unknown"],
+        ["--output-format", "rc", "rc=app.rc"],
+        ["--output-format", "rc", "nuitka"],
+    ]
+)
+def test_parser_invalid_output_formats(args):
+    with pytest.raises(SystemExit):
+        _ = parse_args_make_version(args)
+
+
+def test_env_source_does_not_require_metadata_source():
+    parsed = parse_args_make_version(["--source-format", "env"])
+    assert parsed.metadata_source is None
+
+
+def test_make_version_from_env(tmp_path, monkeypatch):
+    """
+    The env source format neither imports yaml nor importlib.metadata, which take longer to import than
+    creating the version file itself. A fresh interpreter is used, because other tests already imported them.
+    """
+    outfile = tmp_path / "version_file.txt"
+    code = (
+        "import sys\n"
+        "from pyinstaller_versionfile.__main__ import make_version\n"
+        f"make_version(['--source-format', 'env', '--outfile', {str(outfile)!r}])\n"
+        "print(sorted(m for m in ('yaml', 'importlib.metadata') if m in sys.modules))\n"
+    )
+    monkeypatch.setenv("PYIVF_VERSION", "1.2.3")
+    monkeypatch.setenv("PYIVF_PRODUCT_NAME", "Env App")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+    content = outfile.read_text(encoding="utf-8")
+    assert "filevers=(1,2,3,0)" in content
+    assert "StringStruct(u'ProductName', u'Env App')" in content
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        (["--source-format", "dist", "--metadata-source", "pip"], False),
+        (["--source-format", "dist", "--metadata-source", "ourcorp-*", "--outfile", "{name}/v.txt"], True),
+        (["--source-format", "dist", "--metadata-source", "ourcorp", "--regex", "--outfile", "{name}.txt"], True),
+    ],
+)
+def test_parser_distribution_selector(args, expected):
+    assert parse_args_make_version(args).select_distributions is expected
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--source-format", "dist", "--metadata-source", "ourcorp-*"],
+        ["--source-format", "dist", "--metadata-source", "ourcorp-*", "--outfile", "{name}.txt", "--depfile", "v.d"],
+        ["--source-format", "yaml", "--metadata-source", "meta.yml", "--regex", "--outfile", "{name}.txt"],
+    ],
+)
+def test_parser_invalid_distribution_selector(args):
+    with pytest.raises(SystemExit):
+        _ = parse_args_make_version(args)
+
+
+def test_yaml_path_with_glob_characters_is_not_a_pattern(tmp_path):
+    metadata_file = tmp_path / "proj [v2]" / "meta.yml"
+    metadata_file.parent.mkdir()
+    metadata_file.write_text("Version: 1.2.3\n", encoding="utf-8")
+    outfile = tmp_path / "version_file.txt"
+    make_version(["--source-format", "yaml", "--metadata-source", str(metadata_file), "--outfile", str(outfile)])
+    create_version_file([str(metadata_file), "--outfile", str(tmp_path / "version_file2.txt")])
+    assert "filevers=(1,2,3,0)" in outfile.read_text(encoding="utf-8")
+    assert (tmp_path / "version_file2.txt").read_text(encoding="utf-8") == outfile.read_text(encoding="utf-8")
+
+
+def test_make_version_for_selected_distributions(tmp_path, installed_distributions):
+    make_version(
+        [
+            "--source-format", "dist",
+            "--metadata-source", "ourcorp-.*",
+            "--regex",
+            "--output-format", f"pyinstaller={tmp_path}/{{name}}/version_file.txt", f"rc={tmp_path}/{{name}}.rc",
+        ]
+    )
+    installed_distributions.assert_called_once_with()
+    assert "filevers=(2,0,0,1)" in (tmp_path / "ourcorp-plugin-b" / "version_file.txt").read_text(encoding="utf-8")
+    assert (tmp_path / "OurCorp.Plugin_A.rc").is_file()
+    assert not (tmp_path / "other").exists()
+
+
+def test_make_version_no_selected_distribution_raises_input_error(tmp_path, installed_distributions):
+    with pytest.raises(exceptions.InputError):
+        make_version(["--source-format", "dist", "--metadata-source", "none-*", "--outfile", f"{tmp_path}/{{name}}"])
+
+
+def test_create_version_file_for_selected_distributions(tmp_path, installed_distributions):
+    create_version_file(["ourcorp-*", "--source-format", "dist", "--outfile", f"{tmp_path}/{{name}}.txt"])
+    assert sorted(path.name for path in tmp_path.glob("*.txt")) == ["OurCorp.Plugin_A.txt", "ourcorp-plugin-b.txt"]
@@ -0,0 +1,147 @@
+"""
+Unit tests for pyinstaller_versionfile.manifest_cache
+"""
+import json
+import os
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from pyinstaller_versionfile import bench, exceptions, manifest_cache
+from pyinstaller_versionfile.__main__ import make_version
+from pyinstaller_versionfile.metadata import MetaData
+
+
+@pytest.fixture(autouse=True)
+def fixture_disable_cache() -> Iterator[None]:
+    yield
+    manifest_cache.disable()
+
+
+@pytest.fixture(name="metadata_file")
+def fixture_metadata_file(tmp_path: Path) -> Path:
+    (tmp_path / "base.yml").write_text("CompanyName: Company\nProductName: Product\n", encoding="utf-8")
+    metadata_file = tmp_path / "app.yml"
+    metadata_file.write_text(
+        "Extends: base.yml\nVersion: 1.2.3\nProductName: App\nExtraStrings:\n  Comments: compiled\n", encoding="utf-8"
+    )
+    return metadata_file
+
+
+@pytest.fixture(name="yaml_parser")
+def fixture_yaml_parser(monkeypatch) -> list[str]:
+    """
+    Record the names of the files parsed as YAML.
+    """
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    parsed = []
+    original_load = yaml.load
+
+    def load(stream, Loader):  # pylint: disable=invalid-name
+        parsed.append(Path(stream.name).name)
+        return original_load(stream, Loader=Loader)
+
+    monkeypatch.setattr(yaml, "load", load)
+    return parsed
+
+
+def _load(metadata_file: Path) -> MetaData:
+    from pyinstaller_versionfile import metadata  # pylint: disable=import-outside-toplevel
+
+    metadata._load_yaml_cached.cache_clear()  # pylint: disable=protected-access
+    return MetaData.from_file(str(metadata_file))
+
+
+@pytest.mark.parametrize("directory", ["compiled", ""])
+def test_unchanged_files_are_not_parsed(tmp_path, metadata_file, yaml_parser, directory):
+    manifest_cache.enable(str(tmp_path / directory) if directory else "")
+    expected = _load(metadata_file).to_dict()
+    assert sorted(yaml_parser) == ["app.yml", "base.yml"]
+
+    yaml_parser.clear()
+    metadata = _load(metadata_file)
+    assert not yaml_parser
+    assert metadata.to_dict() == expected
+    assert metadata.source_files == [str(metadata_file), str(tmp_path / "base.yml")]
+    if directory:
+        assert len(list((tmp_path / directory).glob(f"*{manifest_cache.SUFFIX}"))) == 2
+    else:
+        assert (tmp_path / f".app.yml{manifest_cache.SUFFIX}").is_file()
+
+
+def test_modified_file_is_parsed_again(tmp_path, metadata_file, yaml_parser):
+    manifest_cache.enable(str(tmp_path / "compiled"))
+    _load(metadata_file)
+    metadata_file.write_text("Extends: base.yml\nVersion: 1.2.4\n", encoding="utf-8")
+    yaml_parser.clear()
+    assert _load(metadata_file).version == "1.2.4"
+    assert yaml_parser == ["app.yml"]
+
+
+def test_touched_file_with_same_content_is_not_parsed(tmp_path, metadata_file, yaml_parser):
+    manifest_cache.enable(str(tmp_path / "compiled"))
+    _load(metadata_file)
+    stat = metadata_file.stat()
+    os.utime(metadata_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))  # e.g. a fresh checkout
+    yaml_parser.clear()
+    assert _load(metadata_file).version == "1.2.3"
+    assert not yaml_parser
+
+
+def test_compiled_manifest_is_json(metadata_file):
+    manifest_cache.enable()
+    _load(metadata_file)
+    record = json.loads(Path(manifest_cache.compiled_path(str(metadata_file))).read_text(encoding="utf-8"))
+    assert record["format"] == manifest_cache.FORMAT_VERSION
+    assert record["manifest"]["values"]["extra_strings"] == {"Comments": "compiled"}
+
+
+@pytest.mark.parametrize(
+    "content", [b"\x00not json", b'{"format": 2, "path": "other.yml"}', b"[1, 2]", b'{"format": 2', b"\xff\xfe"]
+)
+def test_corrupt_compiled_manifest_is_replaced(metadata_file, content):
+    manifest_cache.enable()
+    _load(metadata_file)
+    compiled = Path(manifest_cache.compiled_path(str(metadata_file)))
+    compiled.write_bytes(content)
+    assert _load(metadata_file).product_name == "App"
+    assert compiled.read_bytes() != content
+
+
+@pytest.mark.parametrize("extra_strings", ["  Date: 2024-01-01\n", "  1031: numeric key\n"])
+def test_values_json_cannot_store_are_parsed_every_time(tmp_path, yaml_parser, extra_strings):
+    manifest_cache.enable(str(tmp_path / "compiled"))
+    metadata_file = tmp_path / "app.yml"
+    metadata_file.write_text("Version: 1.2.3\nExtraStrings:\n" + extra_strings, encoding="utf-8")
+    _load(metadata_file)
+    _load(metadata_file)
+    assert yaml_parser == ["app.yml", "app.yml"]
+    assert not list((tmp_path / "compiled").glob("*"))
+
+
+def test_errors_are_reported_as_without_cache(tmp_path):
+    manifest_cache.enable(str(tmp_path / "compiled"))
+    with pytest.raises(exceptions.InputError, match="does not exist"):
+        MetaData.from_file(str(tmp_path / "missing.yml"))
+
+
+def test_disabled_cache_writes_nothing(tmp_path, metadata_file):
+    _load(metadata_file)
+    assert manifest_cache.compiled_path(str(metadata_file)) is None
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["app.yml", "base.yml"]
+
+
+def test_make_version_with_manifest_cache(tmp_path, metadata_file):
+    outfile = tmp_path / "version_file.txt"
+    args = ["--source-format", "yaml", "--metadata-source", str(metadata_file), "--outfile", str(outfile)]
+    make_version(args + ["--manifest-cache"])
+    assert (tmp_path / f".app.yml{manifest_cache.SUFFIX}").is_file()
+    assert "filevers=(1,2,3,0)" in outfile.read_text(encoding="utf-8")
+
+
+def test_measure_manifest_load():
+    parsed, compiled = bench.measure_manifest_load(1000, repetitions=1)
+    assert compiled < parsed
+    assert not manifest_cache.is_enabled()
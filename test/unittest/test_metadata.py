@@ -3,10 +3,14 @@ Author: Andreas Finkler
 
 Unit tests for pyinstaller_versionfile.metadata
 """
+import importlib.metadata
 from pathlib import Path
+from unittest import mock
 
 import pytest
+import yaml
 
+from pyinstaller_versionfile import metadata as metadata_module
 from pyinstaller_versionfile.metadata import MetaData
 from pyinstaller_versionfile import exceptions
 
@@ -243,3 +247,271 @@ def test_set_translations():
         1033,  # langID: U.S. English
         1252,  # charsetID: Multilingual
     ]
+
+
+@pytest.mark.parametrize(
+    "testfile, overlays",
+    [
+        ("product_binary_extends.yml", None),
+        ("product_base.yml", ["product_binary_overlay.yml"]),
+    ],
+)
+def test_load_base_and_per_binary_values(testfile, overlays):
+    """
+    Product-wide values can be shared in a base file, either referenced with 'Extends' or by passing overlays.
+    """
+    metadata = MetaData.from_file(
+        TEST_DATA / testfile, overlays=[TEST_DATA / o for o in overlays or []]
+    )
+    assert metadata.version == "4.5.6.7"  # version file is relative to the base file
+    assert metadata.company_name == "My Imaginary Company"
+    assert metadata.product_name == "Imaginary Product"
+    assert metadata.file_description == "Imaginary Tool"
+    assert metadata.original_filename == "imaginary_tool.exe"
+    assert metadata.translations == [1033, 1200]
+    assert str(TEST_DATA / "product_base.yml") in metadata.source_files
+
+
+def test_overlay_values_take_precedence(tmp_path):
+    overlay = tmp_path / "overlay.yml"
+    overlay.write_text("ProductName: Overlay Product\n", encoding="utf-8")
+    metadata = MetaData.from_file(TEST_DATA / "product_binary_extends.yml", overlays=[overlay])
+    assert metadata.product_name == "Overlay Product"
+    assert metadata.file_description == "Imaginary Tool"
+
+
+def test_circular_extends_raises_input_error(tmp_path):
+    (tmp_path / "a.yml").write_text("Extends: b.yml\n", encoding="utf-8")
+    (tmp_path / "b.yml").write_text("Extends: a.yml\n", encoding="utf-8")
+    with pytest.raises(exceptions.InputError):
+        _ = MetaData.from_file(tmp_path / "a.yml")
+
+
+def test_version_file_is_read_relative_to_file_naming_it(tmp_path):
+    (tmp_path / "product").mkdir()
+    (tmp_path / "product" / "base.yml").write_text("Version: VERSION\n", encoding="utf-8")
+    (tmp_path / "product" / "VERSION").write_text("1.2.3\n", encoding="utf-8")
+    (tmp_path / "VERSION").write_text("9.9.9\n", encoding="utf-8")
+    (tmp_path / "app.yml").write_text("Extends: product/base.yml\n", encoding="utf-8")
+    metadata = MetaData.from_file(tmp_path / "app.yml")
+    assert metadata.version == "1.2.3"
+    assert str(tmp_path / "VERSION") not in metadata.source_files
+    assert MetaData.from_file(tmp_path / "app.yml", version="VERSION").version == "9.9.9"
+
+    (tmp_path / "product" / "VERSION").unlink()
+    with pytest.raises(exceptions.ValidationError):
+        MetaData.from_file(tmp_path / "app.yml").validate()
+
+
+def test_shared_base_file_is_parsed_once(tmp_path):
+    """
+    Generating metadata for many binaries of one product only parses the shared base file once.
+    """
+    base = tmp_path / "base.yml"
+    base.write_text("CompanyName: My Imaginary Company\n", encoding="utf-8")
+    binaries = []
+    for index in range(40):
+        binary = tmp_path / f"binary{index}.yml"
+        binary.write_text(f"Extends: base.yml\nInternalName: binary{index}\n", encoding="utf-8")
+        binaries.append(binary)
+    metadata_module._load_yaml_cached.cache_clear()  # pylint: disable=protected-access
+
+    with mock.patch.object(yaml, "load", wraps=yaml.load) as load:
+        results = [MetaData.from_file(binary) for binary in binaries]
+
+    assert load.call_count == len(binaries) + 1
+    assert all(m.company_name == "My Imaginary Company" for m in results)
+    assert results[-1].internal_name == "binary39"
+
+
+def test_shared_base_file_is_resolved_and_validated_once(tmp_path):
+    (tmp_path / "base.yml").write_text(
+        "Version: VERSION\nExtraStrings:\n  Comments: shared\n"
+        "Translation:\n  - langID: 1033\n    charsetID: 1200\n  - langID: 1031\n    charsetID: 1200\n"
+        "LocalizedStrings:\n  040704B0:\n    Comments: geteilt\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "VERSION").write_text("1.2.3\n", encoding="utf-8")
+    binaries = []
+    for index in range(3):
+        binary = tmp_path / f"binary{index}.yml"
+        binary.write_text(f"Extends: base.yml\nInternalName: binary{index}\n", encoding="utf-8")
+        binaries.append(binary)
+
+    # pylint: disable=protected-access
+    with mock.patch.object(MetaData, "_read_file", wraps=MetaData._read_file) as read_file, mock.patch.object(
+        MetaData, "_MetaData__validate_strings", wraps=MetaData._MetaData__validate_strings
+    ) as validate_strings:
+        results = [MetaData.from_file(binary) for binary in binaries]
+        for result in results:
+            result.validate()
+    assert read_file.call_count == 1
+    assert validate_strings.call_count == 2  # extra and localized strings of the base file
+    assert [m.internal_name for m in results] == ["binary0", "binary1", "binary2"]
+    assert all(m.version == "1.2.3" and m.localized_strings == {"040704B0": {"Comments": "geteilt"}} for m in results)
+    assert results[0].source_files == [str(binaries[0]), str(tmp_path / "base.yml"), str(tmp_path / "VERSION")]
+
+    results[0].extra_strings["Comments"] = "changed"
+    assert results[1].extra_strings == {"Comments": "shared"}
+
+    (tmp_path / "VERSION").write_text("1.2.30\n", encoding="utf-8")
+    assert MetaData.from_file(binaries[0]).version == "1.2.30"
+
+
+def test_file_with_overlays_is_resolved_once(tmp_path):
+    (tmp_path / "product.yml").write_text("CompanyName: Company\nVersion: 1.2.3\n", encoding="utf-8")
+    overlays = []
+    for index in range(3):
+        overlay = tmp_path / f"binary{index}.yml"
+        overlay.write_text(f"InternalName: binary{index}\n", encoding="utf-8")
+        overlays.append(str(overlay))
+
+    # pylint: disable=protected-access
+    with mock.patch.object(MetaData, "_read_file", wraps=MetaData._read_file) as read_file:
+        results = [MetaData.from_file(tmp_path / "product.yml", overlays=[overlay]) for overlay in overlays]
+    assert [call.args[0] for call in read_file.call_args_list] == [str(tmp_path / "product.yml"), *overlays]
+    assert [(m.company_name, m.internal_name) for m in results] == [("Company", f"binary{i}") for i in range(3)]
+
+
+def test_values_overriding_the_base_file_are_validated(tmp_path):
+    (tmp_path / "base.yml").write_text("Version: 1.2.3\nExtraStrings:\n  Comments: shared\n", encoding="utf-8")
+    (tmp_path / "valid.yml").write_text("Extends: base.yml\n", encoding="utf-8")
+    (tmp_path / "invalid.yml").write_text("Extends: base.yml\nExtraStrings:\n  Comments: [1]\n", encoding="utf-8")
+    MetaData.from_file(tmp_path / "valid.yml").validate()
+    with pytest.raises(exceptions.ValidationError):
+        MetaData.from_file(tmp_path / "invalid.yml").validate()
+    with pytest.raises(exceptions.ValidationError):
+        MetaData.from_file(tmp_path / "valid.yml", version="1.x").validate()
+
+
+def test_base_file_only_valid_with_the_file_extending_it(tmp_path):
+    (tmp_path / "base.yml").write_text("LocalizedStrings:\n  040704B0:\n    Comments: Deutsch\n", encoding="utf-8")
+    (tmp_path / "app.yml").write_text(
+        "Extends: base.yml\nTranslation:\n  - langID: 1031\n    charsetID: 1200\n", encoding="utf-8"
+    )
+    metadata = MetaData.from_file(tmp_path / "app.yml")
+    metadata.validate()
+    assert metadata.translations == [1031, 1200]
+
+
+def test_modified_file_is_parsed_again(tmp_path):
+    testfile = tmp_path / "metadata.yml"
+    testfile.write_text("CompanyName: First\n", encoding="utf-8")
+    assert MetaData.from_file(testfile).company_name == "First"
+    testfile.write_text("CompanyName: Second Company\n", encoding="utf-8")
+    assert MetaData.from_file(testfile).company_name == "Second Company"
+
+
+def test_from_env():
+    environ = {
+        "PYIVF_VERSION": "1.2.3",
+        "PYIVF_COMPANY_NAME": "Test Company Name",
+        "PYIVF_PRODUCT_NAME": "",
+        "PYIVF_TRANSLATIONS": "1033:1200, 0x0407:0x04B0",
+        "OTHER_VERSION": "9.9.9.9",
+    }
+    metadata = MetaData.from_env(environ=environ)
+    assert metadata.version == "1.2.3"
+    assert metadata.company_name == "Test Company Name"
+    assert metadata.product_name == MetaData.placeholder_value
+    assert metadata.translations == [1033, 1200, 1031, 1200]
+    assert metadata.source_format == "env"
+    assert not metadata.source_files
+
+
+def test_from_env_prefix_and_overrides():
+    environ = {"APP_VERSION": "1.2.3.4", "APP_INTERNAL_NAME": "app", "PYIVF_INTERNAL_NAME": "other"}
+    metadata = MetaData.from_env("APP_", environ=environ, version="5.6.7.8")
+    assert metadata.version == "5.6.7.8"
+    assert metadata.internal_name == "app"
+    assert metadata.translations == list(MetaData.default_translations)
+
+
+@pytest.mark.parametrize("translations", ["1033", "1033:1200:1", "en:utf16", "1033:1200,"])
+def test_from_env_invalid_translations(translations):
+    with pytest.raises(exceptions.InputError):
+        MetaData.from_env(environ={"PYIVF_TRANSLATIONS": translations})
+
+
+def test_from_file_extra_and_localized_strings():
+    metadata = MetaData.from_file(TEST_DATA / "metadata_with_extra_strings.yml")
+    metadata.validate()
+    assert metadata.extra_strings == {"Comments": "Built by CI", "PrivateBuild": "nightly"}
+    assert metadata.localized_strings == {
+        "040704B0": {"FileDescription": "Lokalisierte Anwendung", "Comments": "Vom CI erstellt"}
+    }
+    assert metadata.string_table_ids() == ["040904B0", "040704B0"]
+
+
+@pytest.mark.parametrize(
+    "extra_strings, localized_strings", [
+        ({"Comments": 1}, None),
+        (None, {"040704B0": {"Comments": "not a translation of the metadata"}}),
+        (None, {"040904B0": ["not", "a", "mapping"]}),
+    ]
+)
+def test_validate_invalid_strings_raises_validation_error(extra_strings, localized_strings):
+    metadata = MetaData(extra_strings=extra_strings, localized_strings=localized_strings)
+    with pytest.raises(exceptions.ValidationError):
+        metadata.validate()
+
+
+@pytest.mark.parametrize(
+    "pattern, regex, expected",
+    [
+        ("ourcorp-*", False, ["OurCorp.Plugin_A", "ourcorp-plugin-b"]),
+        ("OURCORP_PLUGIN_?", False, ["OurCorp.Plugin_A", "ourcorp-plugin-b"]),
+        ("*-b", False, ["ourcorp-plugin-b"]),
+        ("other", False, ["other"]),
+        ("nothing-*", False, []),
+        (r"ourcorp-plugin-[ab]", True, ["OurCorp.Plugin_A", "ourcorp-plugin-b"]),
+        (r"our", True, []),  # the whole name must match
+    ],
+)
+def test_from_distributions_selects_by_pattern(installed_distributions, pattern, regex, expected):
+    assert list(MetaData.from_distributions(pattern, regex)) == expected
+    installed_distributions.assert_called_once_with()
+
+
+def test_from_distributions_maps_metadata_like_from_distribution(installed_distributions, tmp_path):
+    selected = MetaData.from_distributions("ourcorp-*", company_name="Our Corp")
+    plugin_b = selected["ourcorp-plugin-b"]
+    assert plugin_b.version == "2.0.0.1"
+    assert plugin_b.file_description == "ourcorp-plugin-b summary"
+    assert plugin_b.company_name == "Our Corp"
+    assert plugin_b.source_format == "dist"
+    dist_info = tmp_path / "site-packages" / "ourcorp_plugin_b-2.0.post1.dist-info"
+    assert plugin_b.source_files == [str(dist_info / "METADATA")]
+
+
+def test_distribution_files_are_located_on_first_access(installed_distributions, tmp_path):
+    read_files = []
+    original_read_text = importlib.metadata.PathDistribution.read_text
+
+    def read_text(self, filename):
+        read_files.append(filename)
+        return original_read_text(self, filename)
+
+    with mock.patch.object(importlib.metadata.PathDistribution, "read_text", read_text):
+        metadata = MetaData.from_distributions("other")["other"]
+        assert "RECORD" not in read_files
+        dist_info = tmp_path / "site-packages" / "other-3.0.dist-info"
+        assert metadata.source_files == [str(dist_info / "METADATA")]
+        assert metadata.source_files == [str(dist_info / "METADATA")]
+    assert read_files.count("RECORD") == 1
+
+
+def test_from_distributions_invalid_regex_raises_usage_error(installed_distributions):
+    with pytest.raises(exceptions.UsageError):
+        MetaData.from_distributions("ourcorp-(", regex=True)
+
+
+def test_from_distributions_matches_the_name_in_the_metadata(installed_distributions, tmp_path):
+    dist_info = tmp_path / "site-packages" / "renamed-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: OurCorp_Plugin.C\nVersion: 1.0\n", encoding="utf-8"
+    )
+    installed_distributions.return_value.append(importlib.metadata.PathDistribution(dist_info))
+    assert list(MetaData.from_distributions("ourcorp-plugin-c")) == ["OurCorp_Plugin.C"]
+    assert not MetaData.from_distributions("renamed")
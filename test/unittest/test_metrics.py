@@ -0,0 +1,113 @@
+"""
+Unit tests for pyinstaller_versionfile.metrics
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+import pyinstaller_versionfile
+from pyinstaller_versionfile import metrics
+from pyinstaller_versionfile.__main__ import make_version
+
+TEST_DATA = Path(__file__).parent.parent / "resources"
+
+
+@pytest.fixture(name="enabled_metrics")
+def fixture_enabled_metrics():
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    yield metrics.REGISTRY
+    metrics.disable()
+    metrics.REGISTRY.reset()
+
+
+def test_nothing_is_recorded_while_disabled(tmp_path):
+    metrics.REGISTRY.reset()
+    pyinstaller_versionfile.create_versionfile(str(tmp_path / "version_file.txt"))
+    assert not metrics.REGISTRY.counters["files_generated_total"].values
+    assert not metrics.REGISTRY.histograms["generation_seconds"].counts
+
+
+def test_generation_is_counted_per_source_format(enabled_metrics, tmp_path):
+    pyinstaller_versionfile.create_versionfile(str(tmp_path / "a.txt"))
+    pyinstaller_versionfile.create_versionfile_from_input_file(
+        str(tmp_path / "b.txt"), str(TEST_DATA / "acceptancetest_metadata.yml")
+    )
+    generated = enabled_metrics.counters["files_generated_total"].values
+    assert generated == {(("source", "none"),): 1, (("source", "yaml"),): 1}
+    assert enabled_metrics.histograms["load_seconds"].counts[(("source", "yaml"),)]
+
+
+def test_failed_generation_is_counted(enabled_metrics, tmp_path):
+    with pytest.raises(pyinstaller_versionfile.exceptions.ValidationError):
+        pyinstaller_versionfile.create_versionfile(str(tmp_path / "a.txt"), version="a.b")
+    assert enabled_metrics.counters["files_failed_total"].values == {(("source", "none"),): 1}
+
+
+@pytest.mark.parametrize("input_file", ["not_a_yaml_file.txt", "does_not_exist.yml", "not_a_mapping.yml"])
+def test_failed_loading_is_counted(enabled_metrics, tmp_path, input_file):
+    with pytest.raises(pyinstaller_versionfile.exceptions.InputError):
+        pyinstaller_versionfile.create_versionfile_from_input_file(str(tmp_path / "a.txt"), str(TEST_DATA / input_file))
+    assert enabled_metrics.counters["files_failed_total"].values == {(("source", "yaml"),): 1}
+    assert not enabled_metrics.counters["files_generated_total"].values
+
+
+def test_make_version_counts_failed_loading(tmp_path):
+    metrics_file = tmp_path / "metrics.json"
+    with pytest.raises(pyinstaller_versionfile.exceptions.InputError):
+        make_version([
+            "--source-format", "yaml",
+            "--metadata-source", str(tmp_path / "does_not_exist.yml"),
+            "--outfile", str(tmp_path / "version_file.txt"),
+            "--metrics", str(metrics_file),
+        ])
+    metrics.disable()
+    data = json.loads(metrics_file.read_text(encoding="utf-8"))
+    metrics.REGISTRY.reset()
+    assert data["files_failed_total"] == [{"labels": {"source": "yaml"}, "value": 1}]
+    assert data["files_generated_total"] == []
+
+
+def test_reset_starts_cache_statistics_over(enabled_metrics, tmp_path):
+    pyinstaller_versionfile.create_versionfile(str(tmp_path / "a.txt"))
+    pyinstaller_versionfile.create_versionfile(str(tmp_path / "b.txt"))
+    enabled_metrics.reset()
+    assert {"labels": {"cache": "template"}, "value": 0} in enabled_metrics.to_dict()["cache_hits_total"]
+    pyinstaller_versionfile.create_versionfile(str(tmp_path / "c.txt"))
+    assert {"labels": {"cache": "template"}, "value": 1} in enabled_metrics.to_dict()["cache_hits_total"]
+
+
+def test_histogram_buckets_are_cumulative_in_prometheus_format():
+    registry = metrics.Registry()
+    registry.histogram("test_seconds", "Test histogram.")
+    registry.observe("test_seconds", 0.001, source="yaml")
+    registry.observe("test_seconds", 0.3, source="yaml")
+    text = registry.to_prometheus()
+    assert '# TYPE pyivf_test_seconds histogram' in text
+    assert 'pyivf_test_seconds_bucket{source="yaml",le="0.001"} 1' in text
+    assert 'pyivf_test_seconds_bucket{source="yaml",le="0.25"} 1' in text
+    assert 'pyivf_test_seconds_bucket{source="yaml",le="0.5"} 2' in text
+    assert 'pyivf_test_seconds_bucket{source="yaml",le="+Inf"} 2' in text
+    assert 'pyivf_test_seconds_count{source="yaml"} 2' in text
+
+
+@pytest.mark.parametrize("filename", ["metrics.json", "metrics.prom"])
+def test_make_version_exports_metrics(tmp_path, filename):
+    metrics_file = tmp_path / filename
+    make_version([
+        "--source-format", "yaml",
+        "--metadata-source", str(TEST_DATA / "acceptancetest_metadata.yml"),
+        "--outfile", str(tmp_path / "version_file.txt"),
+        "--metrics", str(metrics_file),
+    ])
+    metrics.disable()
+    content = metrics_file.read_text(encoding="utf-8")
+    if filename.endswith(".json"):
+        data = json.loads(content)
+        assert {"labels": {"source": "yaml"}, "value": 1} in data["files_generated_total"]
+        assert any(entry["labels"] == {"cache": "template"} for entry in data["cache_hits_total"])
+    else:
+        assert 'pyivf_files_generated_total{source="yaml"}' in content
+        assert 'pyivf_cache_misses_total{cache="yaml"}' in content
+    metrics.REGISTRY.reset()
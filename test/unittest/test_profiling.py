@@ -0,0 +1,103 @@
+"""
+Unit tests for pyinstaller_versionfile.profiling
+"""
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from pyinstaller_versionfile import batch, profiling
+from pyinstaller_versionfile.__main__ import create_version_file, make_version
+from pyinstaller_versionfile.metadata import MetaData
+
+
+@pytest.mark.parametrize(
+    "output_path, expected", [
+        (os.path.join("build", "app", "version_file.txt"), "build_app_version_file.txt"),
+        ("version_file.txt", "version_file.txt"),
+    ]
+)
+def test_profile_name(output_path, expected):
+    assert profiling.profile_name(output_path) == expected
+
+
+def test_profile_saves_profile_and_allocation_report(tmp_path):
+    profile_dir = tmp_path / "profiles"
+    with profiling.profile(str(profile_dir), "version_file.txt", top=5):
+        data = [bytearray(1024) for _ in range(100)]
+        MetaData(version="1.2.3").validate()
+
+    stats = pstats.Stats(str(profile_dir / "version_file.txt.prof"))
+    assert any(function == "validate" for _, _, function in stats.stats)  # type: ignore[attr-defined]
+    report = (profile_dir / "version_file.txt.alloc.txt").read_text(encoding="utf-8").splitlines()
+    assert report[0].startswith("Peak traced memory:")
+    assert report[2] == "Top 5 allocations by line:"
+    assert len(report) == 8
+    assert "test_profiling.py" in report[3]
+    assert len(data) == 100
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_keeps_tracing_started_by_caller(tmp_path):
+    tracemalloc.start()
+    try:
+        with profiling.profile(str(tmp_path), "version_file.txt"):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_make_version_profile(tmp_path):
+    profile_dir = tmp_path / "profiles"
+    outfile = tmp_path / "out" / "version_file.txt"
+    outfile.parent.mkdir()
+    make_version(["--version", "1.2.3", "--outfile", str(outfile), "--profile", str(profile_dir)])
+    assert outfile.is_file()
+    name = profiling.profile_name(str(outfile))
+    assert sorted(path.name for path in profile_dir.iterdir()) == [f"{name}.alloc.txt", f"{name}.prof"]
+
+
+def test_create_version_file_profile(tmp_path):
+    profile_dir = tmp_path / "profiles"
+    metadata_file = tmp_path / "metadata.yml"
+    metadata_file.write_text("Version: 1.2.3\n", encoding="utf-8")
+    outfile = str(tmp_path / "version_file.txt")
+    create_version_file([str(metadata_file), "--outfile", outfile, "--profile", str(profile_dir)])
+    assert os.path.isfile(outfile)
+    name = profiling.profile_name(outfile)
+    assert sorted(path.name for path in profile_dir.iterdir()) == [f"{name}.alloc.txt", f"{name}.prof"]
+
+
+def test_create_version_file_profiles_selected_distributions_together(tmp_path, installed_distributions):
+    profile_dir = tmp_path / "profiles"
+    outfile = str(tmp_path / "out" / "{name}" / "version_file.txt")
+    create_version_file(["ourcorp-*", "--source-format", "dist", "--outfile", outfile, "--profile", str(profile_dir)])
+    installed_distributions.assert_called_once_with()
+    assert os.path.isfile(outfile.format(name="ourcorp-plugin-b"))
+    name = profiling.profile_name(outfile)
+    assert sorted(path.name for path in profile_dir.iterdir()) == [f"{name}.alloc.txt", f"{name}.prof"]
+
+
+def test_make_version_profile_per_selected_distribution(tmp_path, installed_distributions):
+    profile_dir = tmp_path / "profiles"
+    outfile = str(tmp_path / "out" / "{name}" / "version_file.txt")
+    make_version([
+        "--source-format", "dist", "--metadata-source", "ourcorp-*", "--outfile", outfile, "--profile", str(profile_dir)
+    ])
+    installed_distributions.assert_called_once_with()
+    names = [profiling.profile_name(outfile.format(name=name)) for name in ["OurCorp.Plugin_A", "ourcorp-plugin-b"]]
+    assert sorted(path.name for path in profile_dir.iterdir()) == sorted(
+        f"{name}{suffix}" for name in names for suffix in [".alloc.txt", ".prof"]
+    )
+
+
+def test_batch_profile_per_target(tmp_path):
+    for name in ["a", "b"]:
+        (tmp_path / f"{name}.versionfile.yml").write_text("Version: 1.2.3\n", encoding="utf-8")
+    profile_dir = tmp_path / "profiles"
+    batch.main([str(tmp_path), "--profile", str(profile_dir)])
+    names = sorted(path.name for path in profile_dir.iterdir())
+    assert len(names) == 4
+    assert names[0].endswith("a_version_file.txt.alloc.txt") and names[1].endswith("a_version_file.txt.prof")
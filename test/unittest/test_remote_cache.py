@@ -0,0 +1,268 @@
+"""
+Unit tests for pyinstaller_versionfile.remote_cache, against a cache server running in the test process.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import pyinstaller_versionfile
+from pyinstaller_versionfile import batch, exceptions
+from pyinstaller_versionfile.__main__ import make_version
+from pyinstaller_versionfile.metadata import MetaData
+from pyinstaller_versionfile.remote_cache import SECRET_ENV, RemoteCache
+
+SECRET = "test-secret"
+
+
+class CacheServer(ThreadingHTTPServer):
+    """Minimal HTTP cache server keeping the entries in memory."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), CacheHandler)
+        self.entries: dict[str, bytes] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.delay = 0.0
+        self.status = 0
+        self.truncate = False
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/cache"
+
+
+class CacheHandler(BaseHTTPRequestHandler):
+    server: CacheServer
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        content = self._handle("GET")
+        if content is None:
+            self.send_response(404)
+            self.end_headers()
+        else:
+            self.send_response(200)
+            # a truncated response makes the client raise http.client.IncompleteRead
+            self.send_header("Content-Length", str(len(content) + (100 if self.server.truncate else 0)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    def do_PUT(self) -> None:  # pylint: disable=invalid-name
+        self._handle("PUT")
+        self.send_response(201)
+        self.end_headers()
+
+    def _handle(self, method: str) -> bytes | None:
+        with self.server.lock:
+            self.server.requests.append((method, self.path))
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+        try:
+            time.sleep(self.server.delay)
+            if method == "PUT":
+                self.server.entries[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+            if self.server.status:
+                self.send_error(self.server.status)
+                return None
+            return self.server.entries.get(self.path)
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture(name="server")
+def fixture_server() -> Iterator[CacheServer]:
+    server = CacheServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _metadata(name: str = "app") -> MetaData:
+    metadata = MetaData(version="1.2.3", internal_name=name)
+    metadata.validate()
+    metadata.sanitize()
+    return metadata
+
+
+def test_miss_generates_locally_and_uploads(server, tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    with RemoteCache(server.url, secret=SECRET) as cache:
+        pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), _metadata(), remote_cache=cache)
+    assert (cache.hits, cache.misses, cache.uploads) == (0, 1, 1)
+    key = RemoteCache.key(_metadata(), "pyinstaller")
+    assert server.requests == [("GET", f"/cache/{key}"), ("PUT", f"/cache/{key}")]
+    assert server.entries[f"/cache/{key}"].endswith(b"\n" + outfile.read_bytes())
+
+
+def test_hit_is_downloaded_instead_of_rendered(server, tmp_path):
+    key = RemoteCache.key(_metadata(), "pyinstaller")
+    with RemoteCache(server.url, secret=SECRET) as cache:
+        server.entries[f"/cache/{key}"] = cache._seal(key, b"cached content")  # pylint: disable=protected-access
+    outfile = tmp_path / "version_file.txt"
+    with RemoteCache(server.url, secret=SECRET) as cache:
+        pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), _metadata(), remote_cache=cache)
+    assert outfile.read_bytes() == b"cached content"
+    assert (cache.hits, cache.misses, cache.uploads) == (1, 0, 0)
+
+
+def test_key_depends_on_metadata_and_output_format():
+    keys = {
+        RemoteCache.key(_metadata("app"), "pyinstaller"),
+        RemoteCache.key(_metadata("other"), "pyinstaller"),
+        RemoteCache.key(_metadata("app"), "rc"),
+    }
+    assert len(keys) == 3
+
+
+@pytest.mark.parametrize("write_policy, expected_uploads", [("sync", 1), ("async", 1), ("never", 0)])
+def test_write_policy(server, tmp_path, write_policy, expected_uploads):
+    with RemoteCache(server.url, write_policy, secret=SECRET) as cache:
+        pyinstaller_versionfile.create_versionfile_from_metadata(
+            str(tmp_path / "version_file.txt"), _metadata(), remote_cache=cache
+        )
+    assert cache.uploads == expected_uploads
+    assert len(server.entries) == expected_uploads
+
+
+def test_invalid_write_policy_raises_usage_error(server):
+    with pytest.raises(exceptions.UsageError):
+        RemoteCache(server.url, "sometimes", secret=SECRET)
+
+
+def test_timeout_falls_back_to_local_generation(server, tmp_path):
+    server.delay = 0.5
+    outfile = tmp_path / "version_file.txt"
+    start = time.perf_counter()
+    with RemoteCache(server.url, timeout=0.1, secret=SECRET) as cache:
+        pyinstaller_versionfile.create_output_files(
+            _metadata(), {"pyinstaller": str(outfile), "rc": str(tmp_path / "app.rc")}, cache
+        )
+    assert time.perf_counter() - start < 0.5 + 1.0
+    assert "filevers=(1,2,3,0)" in outfile.read_text(encoding="utf-8")
+    assert not cache.available
+    assert cache.uploads == 0  # not attempted after the server timed out
+
+
+def test_unreachable_server_falls_back_to_local_generation(tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    with RemoteCache("http://127.0.0.1:9/cache", timeout=0.5, secret=SECRET) as cache:
+        pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), _metadata(), remote_cache=cache)
+    assert outfile.is_file()
+    assert cache.errors == 1
+    assert not cache.available
+
+
+def test_server_error_is_a_miss(server, tmp_path):
+    server.status = 500
+    outfile = tmp_path / "version_file.txt"
+    with RemoteCache(server.url, secret=SECRET) as cache:
+        pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), _metadata(), remote_cache=cache)
+    assert outfile.is_file()
+    assert cache.misses == 1
+    assert cache.errors == 2  # GET and PUT, the server stays available
+    assert cache.available
+
+
+def test_prefetch_reads_concurrently(server):
+    server.delay = 0.1
+    keys = [RemoteCache.key(_metadata(f"app{index}"), "pyinstaller") for index in range(8)]
+    with RemoteCache(server.url, max_workers=8, secret=SECRET) as cache:
+        cache.prefetch(keys)
+    assert server.max_active > 1
+    assert len(server.requests) == 8
+
+
+def test_batch_uses_remote_cache(server, tmp_path):
+    for name in ["a", "b", "c"]:
+        path = tmp_path / name / f"{name}.versionfile.yml"
+        path.parent.mkdir()
+        path.write_text(f"Version: 1.2.3\nInternalName: {name}\n", encoding="utf-8")
+    targets, _ = batch.collect_targets([str(tmp_path)])
+
+    with RemoteCache(server.url, secret=SECRET) as cache:
+        first = batch.generate(targets, remote_cache=cache)
+    assert len(first["generated"]) == 3
+    assert (cache.hits, cache.misses, cache.uploads) == (0, 3, 3)
+    expected = {target.outfile: Path(target.outfile).read_bytes() for target in targets}
+
+    for target in targets:
+        Path(target.outfile).unlink()
+    with RemoteCache(server.url, secret=SECRET) as cache:
+        second = batch.generate(targets, remote_cache=cache)
+    assert len(second["generated"]) == 3
+    assert (cache.hits, cache.misses, cache.uploads) == (3, 0, 0)
+    assert {target.outfile: Path(target.outfile).read_bytes() for target in targets} == expected
+    assert [method for method, _ in server.requests].count("GET") == 6
+
+
+def test_http_requires_secret(server):
+    with pytest.raises(exceptions.UsageError):
+        RemoteCache(server.url)
+    RemoteCache(server.url.replace("http://", "https://")).close()
+
+
+def test_tampered_entry_is_a_miss(server, tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    key = RemoteCache.key(_metadata(), "pyinstaller")
+    with RemoteCache(server.url, secret=SECRET) as cache:
+        pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), _metadata(), remote_cache=cache)
+    expected = outfile.read_bytes()
+    signature, _, _ = server.entries[f"/cache/{key}"].partition(b"\n")
+    server.entries[f"/cache/{key}"] = signature + b"\nraise SystemExit('poisoned')\n"
+    other_key = RemoteCache.key(_metadata("other"), "pyinstaller")
+    server.entries[f"/cache/{other_key}"] = server.entries[f"/cache/{key}"]
+
+    outfile.unlink()
+    with RemoteCache(server.url, "never", secret="other secret") as cache:
+        pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), _metadata(), remote_cache=cache)
+    with RemoteCache(server.url, "never", secret=SECRET) as cache:
+        pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), _metadata(), remote_cache=cache)
+        assert cache.get(other_key) is None  # signed for another key
+    assert outfile.read_bytes() == expected
+    assert (cache.hits, cache.misses, cache.errors) == (0, 2, 2)
+
+
+def test_incomplete_response_falls_back_to_local_generation(server, tmp_path):
+    key = RemoteCache.key(_metadata(), "pyinstaller")
+    server.entries[f"/cache/{key}"] = b"truncated"
+    server.truncate = True
+    outfile = tmp_path / "version_file.txt"
+    with RemoteCache(server.url, timeout=1.0, secret=SECRET) as cache:
+        pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), _metadata(), remote_cache=cache)
+    assert "filevers=(1,2,3,0)" in outfile.read_text(encoding="utf-8")
+    assert (cache.errors, cache.available) == (1, False)
+
+
+def test_make_version_with_remote_cache(server, tmp_path, monkeypatch):
+    monkeypatch.setenv(SECRET_ENV, SECRET)
+    outfile = tmp_path / "version_file.txt"
+    args = ["--outfile", str(outfile), "--version", "1.2.3", "--remote-cache", server.url]
+    make_version(args)
+    outfile.unlink()
+    make_version(args + ["--remote-cache-write", "never"])
+    assert outfile.is_file()
+    assert [method for method, _ in server.requests] == ["GET", "PUT", "GET"]
+
+
+def test_make_version_rejects_invalid_url(tmp_path):
+    with pytest.raises(SystemExit):
+        make_version(["--outfile", str(tmp_path / "version_file.txt"), "--remote-cache", "cache.example.com"])
+
+
+@pytest.mark.parametrize("main", [make_version, batch.main])
+def test_cli_rejects_http_without_secret(tmp_path, monkeypatch, main):
+    monkeypatch.delenv(SECRET_ENV, raising=False)
+    args = ["--outfile", str(tmp_path / "version_file.txt")] if main is make_version else [str(tmp_path)]
+    with pytest.raises(SystemExit):
+        main(args + ["--remote-cache", "http://cache.example.com"])
@@ -0,0 +1,80 @@
+"""
+Unit tests for pyinstaller_versionfile.setuptools_command
+"""
+from importlib import metadata as importlib_metadata
+from unittest import mock
+
+import pytest
+
+from pyinstaller_versionfile import exceptions
+from pyinstaller_versionfile.metadata import MetaData
+
+setuptools = pytest.importorskip("setuptools")
+setuptools_command = pytest.importorskip("pyinstaller_versionfile.setuptools_command")
+
+
+@pytest.fixture(name="command")
+def fixture_command(tmp_path):
+    distribution = setuptools.Distribution(
+        {
+            "name": "demo",
+            "version": "2.1.0.post3",
+            "description": "Demo application",
+            "author": "Jane Doe",
+            "license": "MIT",
+        }
+    )
+    command = setuptools_command.BuildVersionFile(distribution)
+    command.initialize_options()
+    distribution.get_command_obj("build").build_base = str(tmp_path / "build")
+    return command
+
+
+def test_creates_version_file_in_build_directory(command, tmp_path):
+    command.finalize_options()
+    with mock.patch.object(importlib_metadata, "distribution", side_effect=AssertionError("must not be called")):
+        command.run()
+    content = (tmp_path / "build" / "version_file.txt").read_text(encoding="utf-8")
+    assert "filevers=(2,1,0,3)" in content
+    assert "StringStruct(u'FileDescription', u'Demo application')" in content
+    assert "StringStruct(u'CompanyName', u'Jane Doe')" in content
+    assert command.get_outputs() == [str(tmp_path / "build" / "version_file.txt")]
+
+
+def test_metadata_matches_installed_distribution(command, tmp_path):
+    """The values are the same as from_distribution returns after installing the distribution."""
+    command.finalize_options()
+    dist_info = tmp_path / "demo-2.1.0.post3.dist-info"
+    dist_info.mkdir()
+    with open(dist_info / "METADATA", "w", encoding="utf-8") as file_handle:
+        command.distribution.metadata.write_pkg_file(file_handle)
+    with mock.patch.object(
+        importlib_metadata, "distribution", return_value=importlib_metadata.PathDistribution(dist_info)
+    ):
+        expected = MetaData.from_distribution("demo")
+    assert command.metadata().to_dict() == expected.to_dict()
+
+
+def test_output_formats_and_version_policy(command, tmp_path):
+    command.output_formats = "rc=app.rc, nuitka=nuitka.txt"
+    command.version_policy = "post=drop"
+    command.finalize_options()
+    command.run()
+    assert "FILEVERSION 2,1,0,0" in (tmp_path / "build" / "app.rc").read_text(encoding="utf-8")
+    assert (tmp_path / "build" / "nuitka.txt").is_file()
+
+
+def test_unknown_output_format(command):
+    command.output_formats = "exe=app.exe"
+    command.finalize_options()
+    with pytest.raises(exceptions.UsageError):
+        command.run()
+
+
+def test_parse_entries():
+    assert setuptools_command.parse_entries("post=error, dev=build pre=drop") == {
+        "post": "error",
+        "dev": "build",
+        "pre": "drop",
+    }
+    assert setuptools_command.parse_entries(None) == {}
@@ -0,0 +1,94 @@
+"""
+Unit tests for pyinstaller_versionfile.tracing
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from pyinstaller_versionfile import batch, tracing
+from pyinstaller_versionfile.__main__ import make_version
+
+
+@pytest.fixture(autouse=True)
+def fixture_reset_tracer() -> Iterator[None]:
+    tracing.TRACER.reset()
+    yield
+    tracing.disable()
+    tracing.TRACER.reset()
+
+
+def _spans(trace_file: Path) -> list[dict[str, Any]]:
+    return [event for event in json.loads(trace_file.read_text(encoding="utf-8"))["traceEvents"] if event["ph"] == "X"]
+
+
+def _contains(outer: dict[str, Any], inner: dict[str, Any]) -> bool:
+    return (
+        outer["tid"] == inner["tid"]
+        and outer["ts"] <= inner["ts"]
+        and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    )
+
+
+def test_spans_are_only_recorded_while_enabled():
+    with tracing.span("ignored"):
+        pass
+    assert not tracing.TRACER.events
+
+    tracing.enable()
+    with tracing.span("outer", key="value"):
+        with tracing.span("inner"):
+            pass
+    inner, outer = tracing.TRACER.events
+    assert (outer["name"], outer["args"], inner["name"]) == ("outer", {"key": "value"}, "inner")
+    assert _contains(outer, inner)
+
+
+def test_spans_record_threads():
+    tracing.enable()
+
+    def work() -> None:
+        with tracing.span("work"):
+            pass
+
+    thread = threading.Thread(target=work, name="worker")
+    thread.start()
+    thread.join()
+    thread_name, span = tracing.TRACER.to_dict()["traceEvents"]
+    assert (thread_name["ph"], thread_name["tid"], thread_name["args"]) == ("M", thread.native_id, {"name": "worker"})
+    assert (span["name"], span["tid"]) == ("work", thread.native_id)
+
+
+def test_span_is_recorded_for_exceptions():
+    tracing.enable()
+    with pytest.raises(ValueError):
+        with tracing.span("failing"):
+            raise ValueError("failed")
+    assert [event["name"] for event in tracing.TRACER.events] == ["failing"]
+
+
+def test_batch_trace_has_nested_spans_per_target(tmp_path):
+    for name in ["a", "b", "c", "d"]:
+        path = tmp_path / name / f"{name}.versionfile.yml"
+        path.parent.mkdir()
+        path.write_text(f"Version: 1.2.3\nInternalName: {name}\n", encoding="utf-8")
+    trace_file = tmp_path / "trace.json"
+    batch.main([str(tmp_path), "--workers", "2", "--trace", str(trace_file)])
+
+    spans = _spans(trace_file)
+    targets = [span for span in spans if span["name"] == "target"]
+    assert sorted(Path(span["args"]["source"]).parent.name for span in targets) == ["a", "b", "c", "d"]
+    for target in targets:
+        nested = sorted(span["name"] for span in spans if span is not target and _contains(target, span))
+        assert nested == ["from_file", "render", "sanitize", "save", "template_load", "validate"]
+    assert len({span["tid"] for span in targets}) <= 2
+
+
+def test_make_version_trace(tmp_path):
+    trace_file = tmp_path / "trace.json"
+    make_version(["--outfile", str(tmp_path / "version_file.txt"), "--trace", str(trace_file)])
+    names = [span["name"] for span in _spans(trace_file)]
+    assert names[0] == "pyivf-make_version"
+    assert sorted(names[1:]) == ["render", "sanitize", "save", "template_load", "validate"]
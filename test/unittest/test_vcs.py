@@ -0,0 +1,116 @@
+"""
+Unit tests for pyinstaller_versionfile.vcs and pyivf-batch --since, using throwaway git repositories.
+"""
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from pyinstaller_versionfile import batch, exceptions, vcs
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def _git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip()
+
+
+def _commit(repo: Path, message: str) -> str:
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", message)
+    return _git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture(name="repo")
+def fixture_repo(tmp_path: Path) -> Path:
+    """
+    Repository with three applications, one using a shared base file and one a referenced VERSION file.
+    """
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    (repo / ".gitignore").write_text("*_version_file.txt\n", encoding="utf-8")
+    (repo / "base.yml").write_text("CompanyName: Company\n", encoding="utf-8")
+    for name in ["a", "b", "c"]:
+        (repo / name).mkdir()
+    (repo / "a" / "a.versionfile.yml").write_text("Extends: ../base.yml\nVersion: 1.0.0\n", encoding="utf-8")
+    (repo / "b" / "b.versionfile.yml").write_text("Version: VERSION\n", encoding="utf-8")
+    (repo / "b" / "VERSION").write_text("2.0.0\n", encoding="utf-8")
+    (repo / "c" / "c.versionfile.yml").write_text("Version: 3.0.0\n", encoding="utf-8")
+    _commit(repo, "initial")
+    return repo
+
+
+def _generate_since(repo: Path, revision: str) -> list[str]:
+    targets, _ = batch.collect_targets([str(repo)])
+    result = batch.generate(targets, changed=vcs.changed_files(revision, str(repo)))
+    return sorted(Path(outfile).parent.name for outfile in result["generated"])
+
+
+def test_changed_files(repo):
+    base = _git(repo, "rev-parse", "HEAD")
+    (repo / "c" / "c.versionfile.yml").write_text("Version: 3.0.1\n", encoding="utf-8")
+    _commit(repo, "change c")
+    (repo / "base.yml").write_text("CompanyName: Other\n", encoding="utf-8")  # not committed
+    (repo / "new.yml").write_text("Version: 4.0.0\n", encoding="utf-8")  # untracked
+    (repo / "ignored_version_file.txt").write_text("", encoding="utf-8")
+
+    changed = vcs.changed_files(base, str(repo / "a"))
+    assert changed == {vcs.normalize_path(str(repo / path)) for path in ["c/c.versionfile.yml", "base.yml", "new.yml"]}
+
+
+def test_only_affected_targets_are_generated(repo):
+    assert _generate_since(repo, "HEAD") == ["a", "b", "c"]  # no version files yet
+    base = _git(repo, "rev-parse", "HEAD")
+    assert not _generate_since(repo, base)
+
+    (repo / "base.yml").write_text("CompanyName: Other\n", encoding="utf-8")
+    assert _generate_since(repo, base) == ["a"]
+    _commit(repo, "change base")
+    (repo / "b" / "VERSION").write_text("2.0.1\n", encoding="utf-8")
+    assert _generate_since(repo, base) == ["a", "b"]
+    assert "filevers=(2,0,1,0)" in (repo / "b" / "b_version_file.txt").read_text(encoding="utf-8")
+
+
+def test_deleted_output_is_generated(repo):
+    _generate_since(repo, "HEAD")
+    (repo / "c" / "c_version_file.txt").unlink()
+    assert _generate_since(repo, "HEAD") == ["c"]
+
+
+@pytest.mark.parametrize("revision", ["does-not-exist", "HEAD~5"])
+def test_unknown_revision_raises_input_error(repo, revision):
+    with pytest.raises(exceptions.InputError):
+        vcs.changed_files(revision, str(repo))
+
+
+def test_directory_outside_of_repository_raises_input_error(tmp_path):
+    with pytest.raises(exceptions.InputError):
+        vcs.changed_files("HEAD", str(tmp_path))
+
+
+def test_main_since(repo, monkeypatch, capsys):
+    monkeypatch.chdir(repo)
+    batch.main([".", "--since", "HEAD"])
+    (repo / "c" / "c.versionfile.yml").write_text("Version: 3.0.1\n", encoding="utf-8")
+    batch.main([".", "--since", "HEAD"])
+    output = capsys.readouterr().out.splitlines()
+    assert "3 generated, 0 skipped" in output[0]
+    assert "1 generated, 2 skipped" in output[1]
+
+
+def test_main_falls_back_to_full_generation_without_history(repo, monkeypatch, capsys):
+    monkeypatch.chdir(repo)
+    batch.main([".", "--since", "HEAD"])
+    batch.main([".", "--since", "HEAD~5"])
+    captured = capsys.readouterr()
+    assert "3 generated, 0 skipped" in captured.out.splitlines()[1]
+    assert "generating all targets" in captured.err
@@ -0,0 +1,92 @@
+"""
+Unit tests for pyinstaller_versionfile.verify
+"""
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+import pyinstaller_versionfile
+from pyinstaller_versionfile import batch, exceptions, verify
+from pyinstaller_versionfile.__main__ import make_version, parse_args_make_version
+from pyinstaller_versionfile.metadata import MetaData
+
+TEST_DATA = Path(__file__).parent.parent / "resources"
+
+
+@pytest.fixture(autouse=True)
+def fixture_requires_pyinstaller(tmp_path):
+    outfile = tmp_path / "requirements_check.txt"
+    pyinstaller_versionfile.create_versionfile(str(outfile), version="1.0.0.0")
+    try:
+        verify.read_version_file(str(outfile))
+    except exceptions.UsageError as err:
+        pytest.skip(str(err))
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="PyInstaller defines win32api on Windows")
+def test_pyinstaller_compat_is_not_modified(tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    pyinstaller_versionfile.create_versionfile(str(outfile), version="1.2.3.4")
+    assert verify.verify_version_file(str(outfile), MetaData(version="1.2.3.4")) == {}
+    compat = importlib.import_module("PyInstaller.compat")
+    assert not hasattr(compat, "win32api")
+
+
+@pytest.mark.parametrize(
+    "metadata_file",
+    ["acceptancetest_metadata.yml", "metadata_with_extra_strings.yml", "metadata_reference_to_other_file.yml"],
+)
+def test_created_version_files_match_metadata(tmp_path, metadata_file):
+    metadata = MetaData.from_file(TEST_DATA / metadata_file)
+    outfile = tmp_path / "version_file.txt"
+    pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), metadata)
+    assert verify.verify_version_file(str(outfile), metadata) == {}
+    verify.check_version_file(str(outfile), metadata)
+
+
+def test_strings_with_quotes_and_backslashes_are_read_back(tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    metadata = MetaData(company_name="Bob's Tools", extra_strings={"Comments": "C:\\build\\"})
+    pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), metadata)
+    assert verify.verify_version_file(str(outfile), metadata) == {}
+
+
+def test_differences_are_reported(tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    pyinstaller_versionfile.create_versionfile_from_metadata(str(outfile), MetaData(version="1.2.3.4"))
+    expected = MetaData(version="1.2.3.5")
+    assert verify.verify_version_file(str(outfile), expected) == {
+        "Version": {"expected": "1.2.3.5", "actual": "1.2.3.4"}
+    }
+    with pytest.raises(exceptions.ValidationError, match="Version"):
+        verify.check_version_file(str(outfile), expected)
+
+
+def test_unparsable_version_file_raises_validation_error(tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    outfile.write_text("VSVersionInfo(", encoding="utf-8")
+    with pytest.raises(exceptions.ValidationError):
+        verify.read_version_file(str(outfile))
+
+
+def test_make_version_verify(tmp_path):
+    outfile = tmp_path / "version_file.txt"
+    make_version([
+        "--source-format", "yaml", "--metadata-source", str(TEST_DATA / "acceptancetest_metadata.yml"),
+        "--outfile", str(outfile), "--verify",
+    ])
+    assert outfile.is_file()
+
+
+def test_verify_requires_pyinstaller_output():
+    with pytest.raises(SystemExit):
+        parse_args_make_version(["--output-format", "rc", "--verify"])
+
+
+def test_batch_verify(tmp_path):
+    (tmp_path / "a.versionfile.yml").write_text("Version: 1.2.3\nProductName: A\n", encoding="utf-8")
+    targets, _ = batch.collect_targets([str(tmp_path)])
+    result = batch.generate(targets, verify=True)
+    assert len(result["generated"]) == 1 and not result["failed"]
@@ -0,0 +1,87 @@
+"""
+Unit tests for pyinstaller_versionfile.versions
+"""
+import pytest
+
+from pyinstaller_versionfile import exceptions, versions
+from pyinstaller_versionfile.__main__ import parse_args_make_version
+from pyinstaller_versionfile.metadata import MetaData
+from pyinstaller_versionfile.versions import VersionPolicy, to_windows_version
+
+
+@pytest.mark.parametrize(
+    "version, expected", [
+        ("1.2.3", "1.2.3"),
+        ("1.2.3.4", "1.2.3.4"),
+        ("2.1.0rc1", "2.1.0"),
+        ("1.0.post3", "1.0.0.3"),
+        ("0.9.dev4+g1234", "0.9"),
+        ("1!2.0", "2.0"),
+        ("v1.2", "1.2"),
+    ]
+)
+def test_default_policy(version, expected):
+    assert to_windows_version(version) == expected
+
+
+@pytest.mark.parametrize(
+    "version, policy, expected", [
+        ("2.1.0rc1", VersionPolicy(pre="build"), "2.1.0.1"),
+        ("2.1rc1", VersionPolicy(pre="build"), "2.1.0.1"),
+        ("1.0.post3", VersionPolicy(post="drop"), "1.0"),
+        ("0.9.dev4+g1234", VersionPolicy(dev="build"), "0.9.0.4"),
+        ("1.0rc1.post2", VersionPolicy(pre="drop", post="build"), "1.0.0.2"),
+    ]
+)
+def test_policies(version, policy, expected):
+    assert to_windows_version(version, policy) == expected
+
+
+@pytest.mark.parametrize(
+    "version, policy", [
+        ("2.1.0rc1", VersionPolicy(pre="error")),
+        ("1.0.post3", VersionPolicy(post="error")),
+        ("0.9.dev4", VersionPolicy(dev="error")),
+        ("0.9+g1234", VersionPolicy(local="error")),
+        ("1.0rc1.post2", VersionPolicy(pre="build", post="build")),  # two build numbers
+        ("1.2.3.4.post1", VersionPolicy()),  # no place left for the build number
+        ("1.2.3.4.5", VersionPolicy()),
+        ("1.70000", VersionPolicy()),
+        ("1.0.post70000", VersionPolicy()),
+        ("not a version", VersionPolicy()),
+    ]
+)
+def test_invalid_versions_raise_validation_error(version, policy):
+    with pytest.raises(exceptions.ValidationError):
+        to_windows_version(version, policy)
+
+
+@pytest.mark.parametrize("policy", [VersionPolicy(pre="keep"), VersionPolicy(local="build")])
+def test_invalid_policy_raises_usage_error(policy):
+    with pytest.raises(exceptions.UsageError):
+        to_windows_version("1.0", policy)
+
+
+def test_parse_is_cached():
+    versions.parse.cache_clear()
+    for _ in range(100):
+        versions.parse("2.1.0rc1")
+    assert versions.parse.cache_info().misses == 1
+
+
+def test_validate_rejects_places_exceeding_16_bit():
+    with pytest.raises(exceptions.ValidationError):
+        MetaData(version="1.2.3.65536").validate()
+    MetaData(version="1.2.3.65535").validate()
+
+
+def test_parser_version_policy():
+    assert parse_args_make_version([]).version_policy == VersionPolicy()
+    parsed = parse_args_make_version(["--version-policy", "pre=build", "local=error"])
+    assert parsed.version_policy == VersionPolicy(pre="build", local="error")
+
+
+@pytest.mark.parametrize("policy", ["unknown=drop", "pre=keep", "local=build"])
+def test_parser_invalid_version_policy(policy):
+    with pytest.raises(SystemExit):
+        parse_args_make_version(["--version-policy", policy])
@@ -3,12 +3,22 @@ Author: Andreas Finkler
 
 Unit tests for pyinstaller_versionfile.writer.
 """
+import ast
+import hashlib
+import importlib
+import io
+import itertools
+import json
+import tracemalloc
 from pathlib import Path
 from unittest import mock
 
 import pytest
 
-from pyinstaller_versionfile.writer import Writer
+from pyinstaller_versionfile import precompile
+from pyinstaller_versionfile.writer import (
+    COMPILED_TEMPLATES_PACKAGE, OUTPUT_FORMATS, TEMPLATE_FILE, Writer, compiled_module_name, load_template
+)
 from pyinstaller_versionfile.exceptions import InternalUsageError, UsageError
 
 TEST_VERSION = "0.8.1.5"
@@ -20,6 +30,15 @@ TEST_ORIGINAL_FILENAME = "TestOriginalFilename"
 TEST_PRODUCT_NAME = "TestProductName"
 
 
+def rendered(writer: Writer) -> str:
+    """
+    Return the content the writer creates.
+    """
+    buffer = io.StringIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
 @pytest.fixture(name="metadata_mock")
 def fixture_metadata_mock():
     """
@@ -71,7 +90,7 @@ def test_render_valid_parameters_creates_correct_content(metadata_mock, attribut
 
     writer.render()
 
-    assert "StringStruct(u'{}', u'{}')".format(attribute, value) in writer._content  # pylint: disable=protected-access
+    assert "StringStruct(u'{}', u'{}')".format(attribute, value) in rendered(writer)
 
 
 @pytest.mark.parametrize(
@@ -126,7 +145,7 @@ def test_save_valid_filepath_saves_content(prepared_writer, tmpdir, filename):
 
     prepared_writer.save(str(filepath))
 
-    assert filepath.read_text("utf-8") == prepared_writer._content  # pylint: disable=protected-access
+    assert filepath.read_text("utf-8") == rendered(prepared_writer)
 
 
 def test_save_file_exists_overwrites_file(prepared_writer, tmpdir):
@@ -138,7 +157,7 @@ def test_save_file_exists_overwrites_file(prepared_writer, tmpdir):
 
     prepared_writer.save(str(filepath))
 
-    assert filepath.read_text("utf-8") == prepared_writer._content  # pylint: disable=protected-access
+    assert filepath.read_text("utf-8") == rendered(prepared_writer)
 
 
 def test_save_directory_passed_raises_usageerror(prepared_writer, tmpdir):
@@ -173,3 +192,168 @@ def test_versionfile_tailingwhitespaces(
     assert not any(
         line.endswith(" ") for line in lines
     ), "No line should end with a space character."
+
+
+def test_template_is_compiled_once():
+    """
+    The compiled template is reused for all version files rendered in the same process.
+    """
+    assert load_template(TEMPLATE_FILE) is load_template(TEMPLATE_FILE)
+
+
+@pytest.mark.parametrize(
+    "output_format, expected_lines",
+    [
+        ("rc", ['FILEVERSION 0,8,1,5', 'VALUE "CompanyName", "TestCompany"', 'VALUE "Translation", 1033, 1200']),
+        ("nuitka", ["--company-name=TestCompany", "--file-version=0.8.1.5", "--copyright=TestLegalCopyright"]),
+        ("cx_freeze", ['"version": "0.8.1.5"', '"target_name": "TestOriginalFilename"']),
+    ]
+)
+def test_render_output_formats(metadata_mock, output_format, expected_lines):
+    metadata_mock.params["Translation"] = [1033, 1200]
+    writer = Writer(metadata_mock, output_format)
+
+    writer.render()
+
+    for line in expected_lines:
+        assert line in rendered(writer)
+
+
+def test_render_cx_freeze_is_valid_json(metadata_mock):
+    metadata_mock.params["Translation"] = [1033, 1200]
+    metadata_mock.params["CompanyName"] = 'Company "with quotes"'
+    writer = Writer(metadata_mock, "cx_freeze")
+
+    writer.render()
+
+    assert json.loads(rendered(writer))["author"] == 'Company "with quotes"'
+
+
+def test_unknown_output_format_raises_usage_error():
+    with pytest.raises(UsageError):
+        Writer(metadata=mock.Mock(), output_format="unknown")
+
+
+def test_render_string_table_per_translation(metadata_mock):
+    metadata_mock.params["Translation"] = [1033, 1200, 1031, 1200, 1033, 1200]
+    metadata_mock.params["ExtraStrings"] = {"Comments": "Built by CI"}
+    metadata_mock.params["LocalizedStrings"] = {
+        "040704B0": {"FileDescription": "Beschreibung", "Comments": "Vom CI erstellt", "SpecialBuild": "de"}
+    }
+
+    writer = Writer(metadata_mock)
+    writer.render()
+    content = rendered(writer)
+
+    tables = content.split("StringTable(")[1:]
+    assert len(tables) == 2  # duplicate translations share one table
+    assert "u'040904B0'" in tables[0]
+    assert f"StringStruct(u'FileDescription', u'{TEST_FILE_DESCRIPTION}')" in tables[0]
+    assert "StringStruct(u'Comments', u'Built by CI')])" in tables[0]
+    assert "u'040704B0'" in tables[1]
+    assert "StringStruct(u'FileDescription', u'Beschreibung')" in tables[1]
+    assert f"StringStruct(u'ProductName', u'{TEST_PRODUCT_NAME}')" in tables[1]
+    assert "StringStruct(u'Comments', u'Vom CI erstellt'),\n        StringStruct(u'SpecialBuild', u'de')])" in tables[1]
+
+
+def test_render_escapes_strings_for_python(metadata_mock):
+    metadata_mock.params["CompanyName"] = "Bob's Tools"
+    metadata_mock.params["ExtraStrings"] = {"Build\\Path": "C:\\build\\", "Comments": "first line\nsecond line"}
+
+    writer = Writer(metadata_mock)
+    writer.render()
+    content = rendered(writer)
+
+    assert "StringStruct(u'CompanyName', u'Bob\\'s Tools')" in content
+    strings = {
+        ast.literal_eval(node.args[0]): ast.literal_eval(node.args[1])
+        for node in ast.walk(ast.parse(content))
+        if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "StringStruct"
+    }
+    assert strings["CompanyName"] == "Bob's Tools"
+    assert strings["Build\\Path"] == "C:\\build\\"
+    assert strings["Comments"] == "first line\nsecond line"
+
+
+def test_render_rc_string_table_per_translation(metadata_mock):
+    metadata_mock.params["Translation"] = [1033, 1200, 1031, 1200]
+    metadata_mock.params["ExtraStrings"] = {"Comments": 'Say "hi"'}
+
+    writer = Writer(metadata_mock, "rc")
+    writer.render()
+    content = rendered(writer)
+
+    assert 'BLOCK "040904B0"' in content and 'BLOCK "040704B0"' in content
+    assert content.count('VALUE "Comments", "Say ""hi"""') == 2
+
+
+def test_save_streams_large_string_tables_with_flat_memory(metadata_mock, tmp_path):
+    """
+    The content is written while it is rendered, so the memory needed to save a version file does not grow with
+    the size of the string tables.
+    """
+    metadata_mock.params["Translation"] = list(itertools.chain(*((lang, 1200) for lang in range(1024, 1124))))
+    metadata_mock.params["ExtraStrings"] = {f"Custom{index}": "x" * 100 for index in range(500)}
+    writer = Writer(metadata_mock)
+    writer.render()
+    outfile = tmp_path / "version_file.txt"
+    writer.save(str(outfile))  # warm up the template cache
+
+    tracemalloc.start()
+    try:
+        writer.save(str(outfile))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    size = outfile.stat().st_size
+    assert size > 5_000_000
+    assert peak < size / 20
+
+
+@pytest.mark.parametrize("template_file", OUTPUT_FORMATS.values())
+def test_precompiled_templates_are_up_to_date(template_file):
+    """
+    Run 'python -m pyinstaller_versionfile.precompile' if this fails after changing a template.
+    """
+    module = importlib.import_module(f"{COMPILED_TEMPLATES_PACKAGE}.{compiled_module_name(template_file)}")
+    assert module.SOURCE_SHA256 == hashlib.sha256(Path(template_file).read_bytes()).hexdigest()
+
+
+@pytest.mark.parametrize("output_format", OUTPUT_FORMATS)
+def test_precompiled_template_renders_like_runtime_compiled(metadata_mock, output_format):
+    metadata_mock.params["Translation"] = [1033, 1200, 1031, 1200]
+    writer = Writer(metadata_mock, output_format)
+    writer.render()
+    load_template.cache_clear()
+    precompiled = rendered(writer)
+    assert load_template(OUTPUT_FORMATS[output_format]).root_render_func.__module__.startswith(
+        COMPILED_TEMPLATES_PACKAGE
+    )
+    load_template.cache_clear()
+    with mock.patch("pyinstaller_versionfile.writer._load_compiled_template", return_value=None):
+        assert rendered(writer) == precompiled
+    load_template.cache_clear()
+
+
+def test_custom_template_is_compiled_at_runtime(tmp_path):
+    template_file = tmp_path / "custom_template.txt"
+    template_file.write_text("{{ ProductName }} {{ Version }}\n", encoding="utf-8")
+    template = load_template(str(template_file))
+    assert template.render(ProductName="App", Version="1.2.3.4") == "App 1.2.3.4\n"
+
+
+def test_outdated_precompiled_template_is_not_used(tmp_path):
+    template_file = tmp_path / "version_file_template.txt"
+    template_file.write_text("changed {{ Version }}", encoding="utf-8")
+    with mock.patch("pyinstaller_versionfile.writer.TEMPLATE_DIR", str(tmp_path)):
+        template = load_template(str(template_file))
+    assert template.render(Version="1.2.3.4") == "changed 1.2.3.4"
+
+
+def test_precompile_writes_modules(tmp_path):
+    modules = precompile.precompile(str(tmp_path))
+    assert sorted(Path(module).name for module in modules) == sorted(
+        compiled_module_name(template_file) + ".py" for template_file in OUTPUT_FORMATS.values()
+    )
+    assert "SOURCE_SHA256 = " in Path(modules[0]).read_text(encoding="utf-8")